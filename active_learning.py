@@ -0,0 +1,224 @@
+import logging
+from collections.abc import Mapping
+
+import numpy as np
+from scipy.stats import norm
+try:
+    from sklearn.base import clone
+    from sklearn.gaussian_process import GaussianProcessRegressor
+    from sklearn.gaussian_process.kernels import ConstantKernel, Matern, WhiteKernel
+    from sklearn.model_selection import KFold, cross_val_predict
+    from sklearn.metrics import r2_score
+except ImportError:  # optional dependency
+    GaussianProcessRegressor = None
+
+from build_scenarios import build_scenarios, matrix_to_scenarios, sample_parameters, scenarios_to_matrix, to_unit
+
+logger = logging.getLogger(__name__)
+
+
+def _require_sklearn():
+    if GaussianProcessRegressor is None:
+        raise ImportError("Active learning needs scikit-learn for its Gaussian-process surrogate: "
+                          "pip install scikit-learn")
+
+
+def output_value(analysis, key="Fmax"):
+    """Target reading ``scenario["Output"][analysis][key]`` (None if the run produced no output)."""
+    def target(scenario):
+        value = scenario.get("Output", {}).get(analysis, {}).get(key)
+        return float(value) if value is not None else None
+    return target
+
+
+def default_surrogate(n_params, seed=None):
+    """Gaussian process on unit-cube inputs, as in surrogate.ipynb (Matérn kernel, one length scale per parameter)."""
+    _require_sklearn()
+    kernel = ConstantKernel(1.0, (1e-3, 1e3)) \
+        * Matern(length_scale=np.full(n_params, 0.5), length_scale_bounds=(1e-2, 1e2), nu=2.5) \
+        + WhiteKernel(noise_level=1e-3, noise_level_bounds=(1e-8, 1e0))
+    return GaussianProcessRegressor(kernel=kernel, normalize_y=True, n_restarts_optimizer=3, random_state=seed)
+
+
+def expected_improvement(mean, std, best, maximize=True, xi=0.01):
+    improvement = (mean - best - xi) if maximize else (best - mean - xi)
+    std = np.maximum(std, 1e-12)
+    z = improvement / std
+    return improvement * norm.cdf(z) + std * norm.pdf(z)
+
+
+class SequentialDesign:
+    """
+    Sequential (active-learning) scenario design: instead of one large Latin
+    Hypercube, run a small initial design, fit a Gaussian-process surrogate to
+    the results so far and propose each next batch where the surrogate is
+    most uncertain (``criterion="variance"``) or most promising
+    (``criterion="ei"``, expected improvement of ``target``).
+
+        design = SequentialDesign(param_ranges, "NewAnalysis", correlations, batch_size=4)
+        batch = design.initial(8)
+        while ...:
+            run_campaign(input_path, batch, max_workers=4)
+            design.tell(batch)
+            batch = design.ask()
+
+    Scenarios are in the ``build_scenarios`` format. Candidates are drawn with
+    ``sample_parameters``, so proposals respect ``correlations``; a batch is
+    filled greedily, refitting the surrogate on its own predictions ("kriging
+    believer") so the points of one batch do not pile up in the same region.
+    """
+
+    def __init__(self, param_ranges, analysis, correlations=None, batch_size=4, target=None,
+                 criterion="variance", maximize=True, n_candidates=2000, surrogate=None, seed=None):
+        if criterion not in ("variance", "ei"):
+            raise ValueError(f"Invalid criterion '{criterion}'. Must be 'variance' or 'ei'.")
+        _require_sklearn()
+        self.param_ranges = param_ranges
+        self.keys = list(param_ranges)
+        self.analysis = analysis
+        self.correlations = correlations
+        self.batch_size = batch_size
+        self.target = target or output_value(analysis)
+        self.criterion = criterion
+        self.maximize = maximize
+        self.n_candidates = n_candidates
+        self.surrogate = surrogate if surrogate is not None else default_surrogate(len(self.keys), seed)
+        self.rng = np.random.default_rng(seed)
+        self.X = np.empty((0, len(self.keys)))
+        self.y = np.empty(0)
+        self.model = None
+        self.history = []
+
+    def _unit(self, X):
+        return to_unit(self.param_ranges, X)
+
+    def _seed(self):
+        return int(self.rng.integers(2 ** 32))
+
+    def initial(self, n_scenarios=None):
+        """Space-filling start: a Latin Hypercube of ``n_scenarios`` (two batches by default)."""
+        return build_scenarios(self.param_ranges, n_scenarios or 2 * self.batch_size, self.analysis,
+                               self.correlations, seed=self._seed())
+
+    def tell(self, scenarios):
+        """Add finished scenarios to the training data (those without a target value are skipped)."""
+        X = scenarios_to_matrix(scenarios, self.keys)
+        y = np.array([self.target(s) if "Output" in s else None for s in scenarios], dtype=float)
+        ok = np.isfinite(y) & np.isfinite(X).all(axis=1)
+        if not ok.all():
+            logger.warning("Skipping %d scenarios without inputs or target", int((~ok).sum()))
+        self.X = np.vstack([self.X, X[ok]])
+        self.y = np.concatenate([self.y, y[ok]])
+        self.model = None
+        return int(ok.sum())
+
+    def fit(self):
+        if len(self.y) < 2:
+            raise ValueError("At least two finished scenarios are needed to fit the surrogate")
+        self.model = clone(self.surrogate).fit(self._unit(self.X), self.y)
+        return self.model
+
+    def predict(self, X, return_std=True):
+        """Surrogate mean (and standard deviation) at parameter rows ``X``."""
+        if self.model is None:
+            self.fit()
+        return self.model.predict(self._unit(np.atleast_2d(X)), return_std=return_std)
+
+    def score(self, n_splits=5):
+        """
+        Cross-validated R² of the surrogate on the data so far, the accuracy
+        to compare against a stopping target. Kernel hyperparameters are kept
+        from the full fit, so this costs n_splits GP solves, not optimizations.
+        """
+        if self.model is None:
+            self.fit()
+        n_splits = min(n_splits, len(self.y))
+        if n_splits < 2:
+            return np.nan
+        fixed = GaussianProcessRegressor(kernel=self.model.kernel_, optimizer=None, normalize_y=True)
+        pred = cross_val_predict(fixed, self._unit(self.X), self.y,
+                                 cv=KFold(n_splits, shuffle=True, random_state=0))
+        return r2_score(self.y, pred)
+
+    def _acquisition(self, model, candidates, best):
+        mean, std = model.predict(candidates, return_std=True)
+        if self.criterion == "variance":
+            return std
+        return expected_improvement(mean, std, best, self.maximize)
+
+    def ask(self, batch_size=None):
+        """The next batch of scenarios, where the acquisition criterion is highest."""
+        batch_size = batch_size or self.batch_size
+        if self.model is None:
+            self.fit()
+
+        candidates = sample_parameters(self.param_ranges, self.n_candidates, self.correlations, seed=self._seed())
+        unit = self._unit(candidates)
+        best = self.y.max() if self.maximize else self.y.min()
+
+        X, y = self._unit(self.X), self.y
+        model = self.model
+        believer = GaussianProcessRegressor(kernel=self.model.kernel_, optimizer=None, normalize_y=True)
+        chosen = []
+        for k in range(batch_size):
+            score = self._acquisition(model, unit, best)
+            score[chosen] = -np.inf
+            i = int(np.argmax(score))
+            chosen.append(i)
+            if k + 1 < batch_size:
+                # Pretend the surrogate's prediction was observed at the chosen point
+                X = np.vstack([X, unit[i]])
+                y = np.append(y, model.predict(unit[i:i + 1]))
+                model = clone(believer).fit(X, y)
+
+        return matrix_to_scenarios(self.keys, candidates[chosen], self.analysis)
+
+
+def run_active_learning(input_path, param_ranges, analysis, correlations=None, max_workers=4, n_initial=None,
+                        max_scenarios=100, target_r2=None, prepare=None, design=None, journal=None, **kwargs):
+    """
+    Run a campaign in batches of ``max_workers`` scenarios chosen by a
+    SequentialDesign until ``max_scenarios`` have run or the surrogate's
+    cross-validated R² reaches ``target_r2``.
+
+    ``prepare(scenario)`` completes each new scenario before it runs: the
+    designed scenarios name the analysis only, and ``processing`` needs
+    ``"Analysis": {analysis: {pier: material}}`` (the scour configuration). Keyword arguments go to ``SequentialDesign``
+    (``target``, ``criterion``, ``seed``...) when they are its parameters and
+    to ``run_campaign`` otherwise. With a ``journal`` every batch is
+    appended to the same journal, so it keeps the whole sequence.
+
+    Returns (scenarios, design).
+    """
+    from scheduler import run_campaign
+
+    design_kwargs = {k: kwargs.pop(k) for k in ("target", "criterion", "maximize", "n_candidates",
+                                                "surrogate", "seed") if k in kwargs}
+    if design is None:
+        design = SequentialDesign(param_ranges, analysis, correlations, batch_size=max_workers, **design_kwargs)
+
+    scenarios = []
+    batch = design.initial(n_initial)
+    while batch:
+        for scenario in batch:
+            if prepare is not None:
+                prepare(scenario)
+            if not isinstance(scenario.get("Analysis"), Mapping):
+                raise ValueError("Scenarios need 'Analysis' as {analysis: {pier: material}} before they run; "
+                                 "pass a prepare(scenario) that sets it")
+        scenarios += batch
+        # The journal indexes scenarios by position: give it the whole sequence
+        run_campaign(input_path, scenarios if journal is not None else batch, max_workers=max_workers,
+                     journal=journal, **kwargs)
+        design.tell(batch)
+
+        score = design.score() if len(design.y) >= 2 else np.nan
+        logger.info("Active learning: %d scenarios run, %d usable, surrogate CV R² %.3f",
+                    len(scenarios), len(design.y), score)
+        design.history.append({"n_scenarios": len(scenarios), "n_train": len(design.y), "r2": score})
+        if target_r2 is not None and score >= target_r2:
+            logger.info("Surrogate reached R² %.3f >= %.3f", score, target_r2)
+            break
+        remaining = max_scenarios - len(scenarios)
+        batch = design.ask(min(max_workers, remaining)) if remaining > 0 and len(design.y) >= 2 else []
+    return scenarios, design
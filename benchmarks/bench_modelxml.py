@@ -0,0 +1,189 @@
+"""
+Benchmarks of modelxml I/O, selectors and mutations on synthetic models
+(``modelxml.synthetic``) of increasing size.
+
+    python -m benchmarks.bench_modelxml
+    python -m benchmarks.bench_modelxml --sizes tiny small medium --repeat 5 --json bench.json
+
+For each operation the best time per size is printed with the log-log slope
+of time against model size: about 1 is linear, clearly above 1 means the
+operation stops scaling as models grow. The smallest size is left out of the
+slope (its millisecond timings are mostly overhead and noise), and slopes
+are only flagged with at least FLAG_MIN_SIZES sizes and FLAG_MIN_REPEAT
+repeats.
+"""
+import os
+import copy
+import json
+import time
+import inspect
+import logging
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+from modelxml import selectors, mutations
+from modelxml.backend import get_backend
+from modelxml.index import invalidate_index
+from modelxml.xmlio import read_xml, read_xml_tags, save_xml
+from modelxml.synthetic import SIZES, write_synthetic_model
+
+# A slope above this is flagged as superlinear...
+SUPERLINEAR_SLOPE = 1.2
+# ...when it is fitted on enough data to tell it from timer noise
+FLAG_MIN_SIZES = 3
+FLAG_MIN_REPEAT = 3
+
+
+def _first_node_key(root):
+    return next(root.iter("Node")).get("Key")
+
+def _pier_1_bottom(root):
+    return list(selectors.foundation_interfaces(root)["pier_1"][1])
+
+# name -> (function(root, path, tmp), mutates the root)
+CASES = {
+    # I/O
+    "read_xml": (lambda root, path, tmp: read_xml(path), False),
+    "read_xml_tags[geometry]": (lambda root, path, tmp: read_xml_tags(path, selectors.GEOMETRY_TAGS), False),
+    "save_xml": (lambda root, path, tmp: save_xml(root, os.path.join(tmp, "out.hrx")), False),
+
+    # selectors
+    "interfaces": (lambda root, path, tmp: selectors.interfaces(root), False),
+    "quads": (lambda root, path, tmp: selectors.quads(root), False),
+    "masonry_materials": (lambda root, path, tmp: selectors.masonry_materials(root), False),
+    "analysis_state": (lambda root, path, tmp: selectors.analysis_state(root, "Vert"), False),
+    "analysis_key": (lambda root, path, tmp: selectors.analysis_key(root, "Vert"), False),
+    "restrain": (lambda root, path, tmp: selectors.restrain(root), False),
+    "restraint_interface_centroids": (lambda root, path, tmp: selectors.restraint_interface_centroids(root), False),
+    "foundation_interfaces": (lambda root, path, tmp: selectors.foundation_interfaces(root), False),
+    "nodes": (lambda root, path, tmp: selectors.nodes(root), False),
+    "model_points_location_map": (lambda root, path, tmp: selectors.model_points_location_map(root), False),
+    "nodec": (lambda root, path, tmp: selectors.nodec(root), False),
+    "geometry": (lambda root, path, tmp: selectors.geometry(root), False),
+
+    # mutations (each run on a fresh copy, so lookups include building the index)
+    "set_all_analysis_to_not_run": (lambda root, path, tmp: mutations.set_all_analysis_to_not_run(root), True),
+    "set_analysis_to_run": (lambda root, path, tmp: mutations.set_analysis_to_run(root, "Vert"), True),
+    "update_node_to_model_point": (
+        lambda root, path, tmp: mutations.update_node_to_model_point(root, _first_node_key(root)), True),
+    "set_model_points": (lambda root, path, tmp: mutations.set_model_points(root), True),
+    "create_start_mesh": (lambda root, path, tmp: mutations.create_start_mesh(root), True),
+    "create_start_mesh_analysis": (lambda root, path, tmp: mutations.create_start_mesh_analysis(root), True),
+    "update_material": (lambda root, path, tmp: mutations.update_material(root, {"Name": "Damaged", "Ehor": 10}), True),
+    "update_materials": (
+        lambda root, path, tmp: mutations.update_materials(
+            root, [{"Name": "Masonry", "Ehor": 1500}, {"Name": "Damaged", "Ehor": 10}]), True),
+    "set_material_to_interfaces": (
+        lambda root, path, tmp: mutations.set_material_to_interfaces(root, _pier_1_bottom(root), "3"), True),
+    "update_foundation_interfaces": (
+        lambda root, path, tmp: mutations.update_foundation_interfaces(root, {"pier_1": "Damaged"}), True),
+}
+
+
+def uncovered_functions():
+    """Public selectors/mutations without a benchmark case."""
+    missing = []
+    for module in (selectors, mutations):
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if fn.__module__ == module.__name__ and not name.startswith("_") and name not in CASES:
+                missing.append(f"{module.__name__}.{name}")
+    return missing
+
+
+def time_case(fn, root, path, tmp, mutates, repeat):
+    """
+    Best and median time of ``repeat`` runs, each starting cold: mutating
+    cases get a fresh copy, the others a dropped model index (so the lookup
+    tables and NodeLocator of an earlier case or repeat are rebuilt).
+    """
+    times = []
+    for _ in range(repeat):
+        if mutates:
+            target = copy.deepcopy(root)
+        else:
+            target = root
+            invalidate_index(root)
+        start = time.perf_counter()
+        fn(target, path, tmp)
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def run(sizes, repeat=3, cases=None):
+    """Returns ``{size: {"elements": n, "cases": {name: {"best": s, "median": s}}}}``."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"{size}.hrx")
+            write_synthetic_model(path, size)
+            root = read_xml(path)
+            entry = {"elements": sum(1 for _ in root.iter()), "cases": {}}
+            for name, (fn, mutates) in CASES.items():
+                if cases and name not in cases:
+                    continue
+                best, median = time_case(fn, root, path, tmp, mutates, repeat)
+                entry["cases"][name] = {"best": best, "median": median}
+            results[size] = entry
+    return results
+
+
+def scaling_slope(results, name):
+    """
+    Log-log slope of best time against element count, leaving out the
+    smallest size when there are three or more (None with fewer than two).
+    """
+    points = sorted((r["elements"], r["cases"][name]["best"]) for r in results.values() if name in r["cases"])
+    if len(points) >= FLAG_MIN_SIZES:
+        points = points[1:]
+    if len(points) < 2:
+        return None
+    n, t = np.log(np.array(points)).T
+    return float(np.polyfit(n, t, 1)[0])
+
+
+def report(results, repeat=FLAG_MIN_REPEAT):
+    sizes = list(results)
+    flagging = len(sizes) >= FLAG_MIN_SIZES and repeat >= FLAG_MIN_REPEAT
+    header = f"{'operation':34s}" + "".join(f"{s:>12s}" for s in sizes) + f"{'slope':>8s}"
+    print(f"backend: {get_backend().name}; elements: "
+          + ", ".join(f"{s}={results[s]['elements']}" for s in sizes))
+    print(header)
+    print("-" * len(header))
+    names = dict.fromkeys(name for r in results.values() for name in r["cases"])
+    for name in names:
+        cells = "".join(f"{results[s]['cases'][name]['best'] * 1e3:10.2f}ms" for s in sizes)
+        slope = scaling_slope(results, name)
+        flag = "  <-- superlinear" if flagging and slope is not None and slope > SUPERLINEAR_SLOPE else ""
+        print(f"{name:34s}{cells}{slope if slope is not None else float('nan'):8.2f}{flag}")
+    if not flagging:
+        print(f"(superlinear scaling is only flagged with at least {FLAG_MIN_SIZES} sizes "
+              f"and --repeat {FLAG_MIN_REPEAT})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "small", "medium"], choices=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--case", action="append", dest="cases", help="only run this case (repeatable)")
+    parser.add_argument("--json", help="write the raw timings to this file")
+    args = parser.parse_args(argv)
+
+    # mutations logs every step at DEBUG
+    logging.getLogger().setLevel(logging.WARNING)
+
+    missing = uncovered_functions()
+    if missing:
+        print("WARNING: no benchmark for", ", ".join(missing))
+
+    results = run(args.sizes, args.repeat, args.cases)
+    report(results, args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"backend": get_backend().name, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,612 @@
+import logging
+from collections.abc import MutableMapping
+
 import numpy as np
 from scipy.stats import qmc, norm
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
 
-def build_scenarios(param_ranges, n_scenarios, analysis, correlations=None):
-    if not param_ranges:
-        return [{"Analysis": [analysis]} for _ in range(n_scenarios)]
-    
-    keys = list(param_ranges.keys())
+logger = logging.getLogger(__name__)
+
+# Third element of a param_ranges entry for a log-uniform range, e.g.
+# "Masonry_Ehor": (1 * GPa, 30 * GPa, "log")
+LOG = "log"
+
+# maximin optimization keeps an n × n distance matrix
+MAXIMIN_MAX_SAMPLES = 5000
+
+def nearest_correlation(corr, max_iter=200, tol=1e-10, min_eigenvalue=1e-8):
+    """
+    Nearest correlation matrix to ``corr`` (Higham's alternating projections
+    with Dykstra's correction), with eigenvalues of at least
+    ``min_eigenvalue`` so that its Cholesky factor exists.
+    """
+    Y = np.array(corr, dtype=float)
+    correction = np.zeros_like(Y)
+    for _ in range(max_iter):
+        R = Y - correction
+        w, V = np.linalg.eigh((R + R.T) / 2)
+        X = (V * np.maximum(w, 0)) @ V.T
+        correction = X - R
+        previous, Y = Y, X.copy()
+        np.fill_diagonal(Y, 1.0)
+        if np.linalg.norm(Y - previous) <= tol * np.linalg.norm(Y):
+            break
+    w, V = np.linalg.eigh(Y)
+    Y = (V * np.maximum(w, min_eigenvalue)) @ V.T
+    d = np.sqrt(np.diag(Y))
+    return Y / np.outer(d, d)
+
+def _is_positive_definite(matrix):
+    try:
+        np.linalg.cholesky(matrix)
+        return True
+    except np.linalg.LinAlgError:
+        return False
+
+def correlation_matrix(keys, correlations=None):
     n_params = len(keys)
     key_index = {k: i for i, k in enumerate(keys)}
-
-    # --- Build correlation matrix ---
     corr_matrix = np.eye(n_params)
 
     if correlations:
         for (a, b), rho in correlations.items():
             if a not in key_index or b not in key_index:
                 raise KeyError(f"Unknown parameter(s): {a}, {b}")
+            if not -1 <= rho <= 1:
+                raise ValueError(f"Correlation of {a} and {b} must be in [-1, 1], got {rho}")
             i, j = key_index[a], key_index[b]
             corr_matrix[i, j] = corr_matrix[j, i] = rho
 
-    # Add a small jitter to diagonal to ensure positive definiteness
-    corr_matrix += np.eye(n_params) * 1e-8
-    
-    
-    # --- Latin Hypercube Sampling ---
-    sampler = qmc.LatinHypercube(d=n_params)
-    sample = sampler.random(n=n_scenarios)
+    # Inconsistent pairwise correlations do not form a valid matrix:
+    # use the closest one that does
+    if not _is_positive_definite(corr_matrix):
+        repaired = nearest_correlation(corr_matrix)
+        logger.warning("Correlations are not positive definite; using the nearest correlation matrix "
+                       "(largest change %.3f)", np.abs(repaired - corr_matrix).max())
+        corr_matrix = repaired
+    return corr_matrix
+
+def iman_conover(sample, corr_matrix, seed=None):
+    """
+    Reorder each column of ``sample`` so that its rank correlation follows
+    ``corr_matrix`` (Iman & Conover, 1982). Only the pairing of values
+    changes, so every column keeps its values, and an LHS its strata.
+    """
+    rng = np.random.default_rng(seed)
+    n, d = sample.shape
+    scores = norm.ppf(np.arange(1, n + 1) / (n + 1))
+    S = np.column_stack([rng.permutation(scores) for _ in range(d)])
+    # Remove the accidental correlation of the scores, then impose the target
+    E = np.corrcoef(S, rowvar=False)
+    if not _is_positive_definite(E):
+        E = nearest_correlation(E)
+    T = np.linalg.solve(np.linalg.cholesky(E), S.T).T @ np.linalg.cholesky(corr_matrix).T
+
+    out = np.empty_like(sample, dtype=float)
+    for j in range(d):
+        out[np.argsort(T[:, j]), j] = np.sort(sample[:, j])
+    return out
+
+def _lhs(n_samples, d, seed):
+    return qmc.LatinHypercube(d=d, seed=seed).random(n=n_samples)
+
+def _sobol(n_samples, d, seed):
+    m = int(np.ceil(np.log2(max(n_samples, 1))))
+    if n_samples != 2 ** m:
+        # A truncated Sobol sequence loses its balance properties
+        logger.warning("Sobol designs are balanced for powers of 2 samples; %d is not one "
+                       "(use %d or %d)", n_samples, 2 ** (m - 1), 2 ** m)
+    return qmc.Sobol(d, scramble=True, seed=seed).random_base2(m)[:n_samples]
+
+def _maximin_lhs(n_samples, d, seed, corr_matrix=None):
+    if n_samples > MAXIMIN_MAX_SAMPLES:
+        raise ValueError(f"method='maximin' is limited to {MAXIMIN_MAX_SAMPLES} samples; "
+                         f"use 'iman-conover', 'lhs' or 'sobol'")
+    return _maximin_lhs_extension(np.empty((0, d)), n_samples, np.random.default_rng(seed),
+                                  corr_matrix=corr_matrix)
+
+# name: (unit-cube design, how correlations are induced); "design" engines
+# take the correlation matrix and induce it themselves
+ENGINES = {
+    "lhs": (_lhs, "copula"),
+    "sobol": (_sobol, "copula"),
+    "maximin": (_maximin_lhs, "design"),
+    "iman-conover": (_lhs, "rank"),
+}
+
+def sample_parameters(param_ranges, n_samples, correlations=None, seed=None, method="lhs"):
+    """
+    Sample of ``param_ranges``: an (n_samples, n_params) array in parameter
+    units, columns in ``param_ranges`` order. A range given as
+    ``(low, high, "log")`` is sampled log-uniformly.
+
+    ``method``:
+    - "lhs": Latin Hypercube, correlations through a Gaussian copula (which
+      bends the strata)
+    - "sobol": scrambled Sobol points, correlations through the copula;
+      balanced only when ``n_samples`` is a power of 2 (a warning is logged
+      otherwise)
+    - "maximin": Latin Hypercube optimized for the smallest distance between
+      points (up to MAXIMIN_MAX_SAMPLES); with correlations it starts from
+      Iman–Conover ranks and only makes swaps that keep them
+    - "iman-conover": Latin Hypercube with Iman–Conover rank correlations,
+      which keep every marginal stratified
+    """
+    if method not in ENGINES:
+        raise ValueError(f"Invalid method '{method}'. Must be one of {sorted(ENGINES)}.")
+    keys = list(param_ranges.keys())
+    corr_matrix = correlation_matrix(keys, correlations)
+    design, correlation = ENGINES[method]
+
+    if correlation == "design":
+        return to_parameters(param_ranges, design(n_samples, len(keys), seed,
+                                                  corr_matrix if correlations else None))
+    sample = design(n_samples, len(keys), seed)
+
+    if correlations:
+        if correlation == "copula":
+            sample = correlate(sample, corr_matrix)
+        else:
+            sample = iman_conover(sample, corr_matrix, seed)
+    return to_parameters(param_ranges, sample)
+
+def correlate(sample, corr_matrix, chunk_size=100_000):
+    """Gaussian copula: independent uniforms → uniforms with the correlation of ``corr_matrix``."""
+    L = np.linalg.cholesky(corr_matrix)
+    out = np.empty_like(sample, dtype=float)
+    # In chunks: the normal temporaries of a 10^6-row design would not fit in memory comfortably
+    for start in range(0, len(sample), chunk_size):
+        # Convert uniform [0,1] → normal (0,1)
+        normal_sample = norm.ppf(sample[start:start + chunk_size])
+
+        # Apply correlation
+        correlated_normals = normal_sample @ L.T
 
-    # Convert uniform [0,1] → normal (0,1)
-    normal_sample = norm.ppf(sample)
+        # Convert back to uniform [0,1]
+        out[start:start + chunk_size] = norm.cdf(correlated_normals)
+    return out
 
-    # Apply correlation
+def decorrelate(uniform, corr_matrix):
+    """Inverse of ``correlate``."""
+    normals = norm.ppf(np.clip(uniform, 1e-12, 1 - 1e-12))
     L = np.linalg.cholesky(corr_matrix)
-    correlated_normals = normal_sample @ L.T
-
-    # Convert back to uniform [0,1]
-    correlated_uniform = norm.cdf(correlated_normals)
-    
-    
-    # --- Scale to parameter ranges ---
-    l_bounds = [param_ranges[k][0] for k in keys]
-    u_bounds = [param_ranges[k][1] for k in keys]
-    scaled_sample = qmc.scale(correlated_uniform, l_bounds, u_bounds)
-
-    # Helper to split "Material_Property"
-    def parse_param_name(param):
-        parts = param.split("_", 1)
-        return parts if len(parts) == 2 else (parts[0], None)
-
-    # --- Build scenarios ---
+    return norm.cdf(np.linalg.solve(L, normals.T).T)
+
+def _bounds(param_ranges):
+    """Lower and upper bounds (logarithms for log ranges) and the log-range mask."""
+    keys = list(param_ranges.keys())
+    log = np.array([len(param_ranges[k]) > 2 and param_ranges[k][2] == LOG for k in keys], dtype=bool)
+    l_bounds = np.array([param_ranges[k][0] for k in keys], dtype=float)
+    u_bounds = np.array([param_ranges[k][1] for k in keys], dtype=float)
+    if log.any():
+        if (l_bounds[log] <= 0).any():
+            bad = [k for k, lg, lo in zip(keys, log, l_bounds) if lg and lo <= 0]
+            raise ValueError(f"Log-uniform ranges must be positive: {bad}")
+        l_bounds[log], u_bounds[log] = np.log(l_bounds[log]), np.log(u_bounds[log])
+    return l_bounds, u_bounds, log
+
+def to_parameters(param_ranges, unit):
+    """Scale unit-cube rows to parameter units."""
+    l_bounds, u_bounds, log = _bounds(param_ranges)
+    unit = np.asarray(unit, dtype=float)
+    if not ((unit >= 0) & (unit <= 1)).all():
+        raise ValueError("Sample is out of the unit hypercube")
+    # Same as qmc.scale, without its temporaries
+    out = unit * (u_bounds - l_bounds)
+    out += l_bounds
+    if log.any():
+        out[:, log] = np.exp(out[:, log])
+    return out
+
+def to_unit(param_ranges, sample):
+    """
+    Parameter rows → unit cube (the normalized space of ``filter_data``'s
+    minmax scale; log ranges are normalized on the log scale).
+    """
+    l_bounds, u_bounds, log = _bounds(param_ranges)
+    sample = np.array(sample, dtype=float)
+    if log.any():
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sample[:, log] = np.log(sample[:, log])
+    return (sample - l_bounds) / (u_bounds - l_bounds)
+
+# Helper to split "Material_Property"
+def parse_param_name(param):
+    parts = param.split("_", 1)
+    return parts if len(parts) == 2 else (parts[0], None)
+
+def matrix_to_scenarios(keys, sample, analysis):
+    """One scenario per row of ``sample`` (columns in ``keys`` order)."""
     scenarios = []
-    for row in scaled_sample:
-        material_values = dict(zip(keys, row))
+    for row in sample:
         materials = {}
-        for param, val in material_values.items():
+        for param, val in zip(keys, row):
             mat, prop = parse_param_name(param)
             if mat not in materials:
                 materials[mat] = {"Name": mat}
             if prop:
-                materials[mat][prop] = val
+                materials[mat][prop] = float(val)
         scenarios.append({"Materials": list(materials.values()), "Analysis": [analysis]})
-    
-    return scenarios
\ No newline at end of file
+    return scenarios
+
+def scenarios_to_matrix(scenarios, keys):
+    """The ``keys`` parameters of each scenario as an array (NaN where missing)."""
+    if isinstance(scenarios, ScenarioSet):
+        return scenarios.matrix(keys)
+    X = np.full((len(scenarios), len(keys)), np.nan)
+    for i, scenario in enumerate(scenarios):
+        values = {}
+        for material in scenario.get("Materials", []):
+            for prop, val in material.items():
+                if prop != "Name":
+                    values[f"{material['Name']}_{prop}"] = val
+        for j, key in enumerate(keys):
+            if key in values:
+                X[i, j] = values[key]
+    return X
+
+def build_scenarios(param_ranges, n_scenarios, analysis, correlations=None, seed=None, method="lhs"):
+    if not param_ranges:
+        return [{"Analysis": [analysis]} for _ in range(n_scenarios)]
+
+    sample = sample_parameters(param_ranges, n_scenarios, correlations, seed, method)
+    return matrix_to_scenarios(list(param_ranges.keys()), sample, analysis)
+
+
+# -------------------------------------------------------------------
+# Array-backed scenarios
+# -------------------------------------------------------------------
+
+_DELETED = object()
+
+
+class ScenarioSet:
+    """
+    Columnar scenarios: one parameter matrix (rows = scenarios, columns =
+    ``<Material>_<Property>`` keys) instead of a list of nested dicts, so
+    10^6 candidates take n × d floats and no Python loop to build.
+
+    Indexing with an int gives a ScenarioView, a dict-like scenario whose
+    ``Materials`` list is built from its row only when read (e.g. by
+    ``pre_processing``). Anything assigned to a view (``Output``, the
+    ``Materials`` written back after pre-processing...) is kept per
+    scenario. Indexing with a slice, mask or index array gives a subset
+    sharing the same rows, so outputs attached through a subset show up in
+    the full set as well.
+
+        candidates = build_scenario_set(param_ranges, 1_000_000, "NewAnalysis")
+        X = candidates.matrix()                # for screening / surrogates
+        run_campaign(input_path, candidates[best])
+    """
+
+    def __init__(self, keys, values, analysis, extra=None, rows=None):
+        self.keys = list(keys)
+        self.schema = {key: j for j, key in enumerate(self.keys)}
+        values = np.asarray(values, dtype=float)
+        # Without parameters the row count cannot be inferred from the size
+        self.values = values.reshape(len(values), 0) if not self.keys else values.reshape(-1, len(self.keys))
+        self.analysis = analysis
+        self._extra = extra if extra is not None else {}
+        self._rows = None if rows is None else np.asarray(rows, dtype=np.intp)
+
+        groups = {}
+        for key, j in self.schema.items():
+            mat, prop = parse_param_name(key)
+            props = groups.setdefault(mat, [])
+            if prop:
+                props.append((prop, j))
+        self._groups = list(groups.items())
+
+    @classmethod
+    def from_scenarios(cls, scenarios, keys, analysis=None):
+        """Pack dict scenarios (their ``keys`` parameters; other entries are kept per scenario)."""
+        scenarios = list(scenarios)
+        if analysis is None and scenarios:
+            analysis = (scenarios[0].get("Analysis") or [None])[0]
+        extra = {}
+        for i, scenario in enumerate(scenarios):
+            rest = {k: v for k, v in scenario.items() if k != "Materials"}
+            if rest.get("Analysis") == [analysis]:
+                del rest["Analysis"]
+            if rest:
+                extra[i] = rest
+        return cls(keys, scenarios_to_matrix(scenarios, keys), analysis, extra)
+
+    def _row(self, position):
+        return int(self._rows[position]) if self._rows is not None else position
+
+    def __len__(self):
+        return len(self._rows) if self._rows is not None else len(self.values)
+
+    def __iter__(self):
+        return (ScenarioView(self, self._row(i)) for i in range(len(self)))
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            n = len(self)
+            if not -n <= item < n:
+                raise IndexError(f"scenario index {item} out of range")
+            return ScenarioView(self, self._row(int(item) % n))
+        rows = np.arange(len(self.values)) if self._rows is None else self._rows
+        return ScenarioSet(self.keys, self.values, self.analysis, self._extra, rows[item])
+
+    def __repr__(self):
+        return f"ScenarioSet({len(self)} scenarios, {len(self.keys)} parameters)"
+
+    def matrix(self, keys=None):
+        """Parameter matrix of the set, optionally for other ``keys`` (NaN where unknown)."""
+        values = self.values if self._rows is None else self.values[self._rows]
+        if keys is None or list(keys) == self.keys:
+            return values
+        out = np.full((len(values), len(keys)), np.nan)
+        for j, key in enumerate(keys):
+            if key in self.schema:
+                out[:, j] = values[:, self.schema[key]]
+        return out
+
+    def materials(self, row):
+        values = self.values[row]
+        return [{"Name": mat, **{prop: float(values[j]) for prop, j in props}} for mat, props in self._groups]
+
+    def to_list(self):
+        """Plain dict scenarios (the ``build_scenarios`` format plus anything attached)."""
+        return [dict(view) for view in self]
+
+
+class ScenarioView(MutableMapping):
+    """One scenario of a ScenarioSet, usable wherever a scenario dict is."""
+
+    __slots__ = ("_set", "_row")
+
+    def __init__(self, scenario_set, row):
+        self._set = scenario_set
+        self._row = row
+
+    def _base(self, key):
+        if key == "Materials":
+            return self._set.materials(self._row)
+        if key == "Analysis":
+            return [self._set.analysis]
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        extra = self._set._extra.get(self._row)
+        if extra is not None and key in extra:
+            if extra[key] is _DELETED:
+                raise KeyError(key)
+            return extra[key]
+        return self._base(key)
+
+    def __setitem__(self, key, value):
+        self._set._extra.setdefault(self._row, {})[key] = value
+
+    def __delitem__(self, key):
+        self[key]  # KeyError if absent
+        if key in ("Materials", "Analysis"):
+            self._set._extra.setdefault(self._row, {})[key] = _DELETED
+        else:
+            del self._set._extra[self._row][key]
+
+    def __iter__(self):
+        extra = self._set._extra.get(self._row, {})
+        for key in ("Materials", "Analysis"):
+            if extra.get(key) is not _DELETED:
+                yield key
+        for key in extra:
+            if key not in ("Materials", "Analysis"):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"ScenarioView({dict(self)!r})"
+
+
+def build_scenario_set(param_ranges, n_scenarios, analysis, correlations=None, seed=None, method="lhs"):
+    """``build_scenarios`` as a ScenarioSet."""
+    if not param_ranges:
+        return ScenarioSet([], np.empty((n_scenarios, 0)), analysis)
+    sample = sample_parameters(param_ranges, n_scenarios, correlations, seed, method)
+    return ScenarioSet(list(param_ranges.keys()), sample, analysis)
+
+
+# -------------------------------------------------------------------
+# Extending an executed design
+# -------------------------------------------------------------------
+
+def _nearest(points, others):
+    """Distance from each row of ``points`` to the nearest row of ``others`` (inf if there are none)."""
+    if not len(others):
+        return np.full(len(points), np.inf)
+    return cKDTree(others).query(points)[0]
+
+def min_distance(unit, others=None):
+    """Smallest distance between rows of ``unit`` and to rows of ``others``."""
+    d = cdist(unit, unit)
+    np.fill_diagonal(d, np.inf)
+    nearest = d.min(axis=1, initial=np.inf)
+    if others is not None:
+        nearest = np.minimum(nearest, _nearest(unit, others))
+    return nearest.min(initial=np.inf)
+
+def _greedy_maximin(candidates, existing, n_new):
+    """Farthest-point selection of ``n_new`` candidates, given the existing points."""
+    nearest = _nearest(candidates, existing)
+    if not len(existing):
+        nearest[0] = 0.0  # start from the first point of the sequence
+    chosen = []
+    for _ in range(n_new):
+        i = int(np.argmax(nearest))
+        chosen.append(i)
+        nearest = np.minimum(nearest, cdist(candidates, candidates[i:i + 1])[:, 0])
+        nearest[i] = -np.inf
+    return candidates[chosen]
+
+def _qmc_extension(existing, n_new, engine, rng, oversample=16):
+    """Pick ``n_new`` points of a scrambled Sobol/Halton sequence far from the existing ones."""
+    d = existing.shape[1]
+    n_pool = max(oversample * n_new, 256)
+    if engine == "sobol":
+        pool = qmc.Sobol(d, scramble=True, seed=rng).random_base2(int(np.ceil(np.log2(n_pool))))
+    else:
+        pool = qmc.Halton(d, scramble=True, seed=rng).random(n_pool)
+    return _greedy_maximin(pool, existing, n_new)
+
+def _lhs_augmentation(existing, n_new, rng):
+    """
+    New points in the strata left empty by ``existing`` when every axis is
+    split into len(existing) + n_new intervals, so existing + new is as close
+    to a Latin Hypercube as the existing points allow.
+    """
+    n, d = existing.shape
+    m = n + n_new
+    new = np.empty((n_new, d))
+    for j in range(d):
+        empty = np.setdiff1d(np.arange(m), np.floor(existing[:, j] * m).astype(int))
+        strata = rng.choice(empty, n_new, replace=False)  # at least n_new strata are empty
+        new[:, j] = (strata + rng.random(n_new)) / m
+    return new
+
+class _RankCorrelation:
+    """
+    Spearman matrix of a design, updated in O(d) when two rows swap one
+    coordinate, so swaps that would move it away from its start can be
+    rejected before any distance is computed.
+    """
+
+    def __init__(self, sample, tol):
+        n = len(sample)
+        ranks = np.argsort(np.argsort(sample, axis=0), axis=0).astype(float)
+        self.centered = ranks - (n - 1) / 2
+        self.scale = n * (n * n - 1) / 12
+        self.cross = self.centered.T @ self.centered
+        self.start = self.cross / self.scale
+        self.tol = tol
+
+    def swap_delta(self, a, b, j):
+        """Change of row/column ``j`` of the cross products if rows a and b swap coordinate j."""
+        c = self.centered
+        delta = (c[b, j] - c[a, j]) * (c[a] - c[b])
+        delta[j] = 0.0
+        return delta
+
+    def allows(self, delta, j):
+        trial = (self.cross[j] + delta) / self.scale
+        return np.abs(trial - self.start[j]).max() <= self.tol
+
+    def swap(self, a, b, j, delta):
+        self.centered[[a, b], j] = self.centered[[b, a], j]
+        self.cross[j] += delta
+        self.cross[:, j] += delta
+
+    def matrix(self):
+        return self.cross / self.scale
+
+
+def _maximin_lhs_extension(existing, n_new, rng, n_restarts=20, n_swaps=1000, corr_matrix=None,
+                           rank_tol=0.01):
+    """
+    Best of ``n_restarts`` LHS augmentations by minimum distance, improved by
+    swapping coordinates between new points (which keeps the strata).
+
+    With ``corr_matrix`` every restart is reordered by Iman–Conover first,
+    and swaps that move any rank correlation of the new points by more than
+    ``rank_tol`` from there are rejected.
+    """
+    tree = cKDTree(existing) if len(existing) else None
+    def to_old(points):
+        return tree.query(points)[0] if tree is not None else np.full(len(points), np.inf)
+
+    best, best_score = None, -np.inf
+    for _ in range(n_restarts):
+        new = _lhs_augmentation(existing, n_new, rng)
+        if corr_matrix is not None:
+            new = iman_conover(new, corr_matrix, rng)
+        score = min(min_distance(new), to_old(new).min())
+        if score > best_score:
+            best, best_score = new, score
+    if n_new < 2:
+        return best
+
+    new = best
+    ranks = _RankCorrelation(new, rank_tol) if corr_matrix is not None else None
+    to_new = cdist(new, new)
+    np.fill_diagonal(to_new, np.inf)
+    old = to_old(new)
+    score = min(to_new.min(), old.min())
+    for _ in range(n_swaps):
+        # Move the worst point: swap one coordinate with another new point
+        a = int(np.argmin(np.minimum(to_new.min(axis=1), old)))
+        b = int(rng.integers(n_new - 1))
+        b += b >= a
+        j = int(rng.integers(new.shape[1]))
+        if ranks is not None:
+            delta = ranks.swap_delta(a, b, j)
+            if not ranks.allows(delta, j):
+                continue
+        pair = [a, b]
+        new[pair, j] = new[[b, a], j]
+        saved = to_new[pair].copy(), old[pair].copy()
+        rows = cdist(new[pair], new)
+        rows[0, a] = rows[1, b] = np.inf
+        to_new[pair, :] = rows
+        to_new[:, pair] = rows.T
+        old[pair] = to_old(new[pair])
+        trial = min(to_new.min(), old.min())
+        if trial >= score:
+            score = trial
+            if ranks is not None:
+                ranks.swap(a, b, j, delta)
+        else:
+            new[pair, j] = new[[b, a], j]
+            to_new[pair, :] = saved[0]
+            to_new[:, pair] = saved[0].T
+            old[pair] = saved[1]
+    return new
+
+EXTENSIONS = {
+    "maximin": _maximin_lhs_extension,
+    "sobol": lambda existing, n_new, rng: _qmc_extension(existing, n_new, "sobol", rng),
+    "halton": lambda existing, n_new, rng: _qmc_extension(existing, n_new, "halton", rng),
+}
+
+def extend_design(param_ranges, existing, n_new, method="maximin", correlations=None, seed=None):
+    """
+    ``n_new`` parameter rows that keep away from the ``existing`` ones (an
+    array in ``param_ranges`` order, e.g. ``scenarios_to_matrix`` of the
+    executed scenarios): the minimum distance to all existing and new points
+    in the normalized space is maximized, instead of drawing an independent
+    LHS that overlaps earlier batches.
+
+    ``method``: "maximin" augments the existing points to a Latin Hypercube
+    of len(existing) + n_new strata and optimizes it for maximin distance;
+    "sobol" / "halton" select the points of a scrambled sequence farthest
+    from the existing ones. With ``correlations`` the design is made in the
+    independent space of the Gaussian copula and then correlated.
+    """
+    if method not in EXTENSIONS:
+        raise ValueError(f"Invalid method '{method}'. Must be one of {sorted(EXTENSIONS)}.")
+    keys = list(param_ranges.keys())
+    corr_matrix = correlation_matrix(keys, correlations)
+    existing = np.asarray(existing, dtype=float).reshape(-1, len(keys))
+    existing = existing[np.isfinite(existing).all(axis=1)]
+
+    unit = np.clip(to_unit(param_ranges, existing), 0.0, 1.0 - 1e-12)
+    if correlations:
+        unit = decorrelate(unit, corr_matrix)
+    rng = np.random.default_rng(seed)
+    new = EXTENSIONS[method](unit, n_new, rng)
+    if correlations:
+        new = correlate(new, corr_matrix)
+    return to_parameters(param_ranges, new)
+
+def extend_scenarios(param_ranges, scenarios, n_new, analysis, correlations=None, method="maximin", seed=None):
+    """``n_new`` scenarios extending the design of ``scenarios`` (see ``extend_design``)."""
+    if not param_ranges:
+        return build_scenarios(param_ranges, n_new, analysis)
+    keys = list(param_ranges.keys())
+    existing = scenarios_to_matrix(scenarios, keys)
+    sample = extend_design(param_ranges, existing, n_new, method, correlations, seed)
+    return matrix_to_scenarios(keys, sample, analysis)
@@ -0,0 +1,202 @@
+import json
+import time
+import hashlib
+import sqlite3
+import datetime
+from contextlib import closing, contextmanager
+
+from json_utils import json_default
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    idx             INTEGER PRIMARY KEY,
+    key             TEXT NOT NULL,
+    inputs          TEXT NOT NULL,
+    scenario        TEXT NOT NULL,
+    status          TEXT NOT NULL DEFAULT 'pending',
+    stage           TEXT,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    xml_file        TEXT,
+    db_path         TEXT,
+    updated_at      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_status ON scenarios (status, idx);
+"""
+
+# status values
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def scenario_key(scenario):
+    """Stable hash of a scenario's inputs, used to detect a journal/campaign mismatch."""
+    inputs = {k: v for k, v in scenario.items() if k != "Output"}
+    text = json.dumps(inputs, sort_keys=True, default=json_default)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class CampaignJournal:
+    """
+    On-disk record of a campaign: every scenario's inputs, the last stage it
+    reached (``scheduler.STAGES``), its attempts and, once finished, its
+    outputs. A campaign restarted with the same journal skips finished
+    scenarios, retries failed ones until ``max_attempts`` is reached and
+    resumes solved ones at post-processing.
+
+    Failed attempts are retried after ``backoff * backoff_factor**(n-1)``
+    seconds, where n is the number of failed attempts so far.
+    """
+
+    def __init__(self, path, max_attempts=3, backoff=30.0, backoff_factor=2.0):
+        self.path = str(path)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    # ------------------------------------------------------------------
+    # Campaign
+    # ------------------------------------------------------------------
+
+    def register(self, scenarios):
+        """
+        Record the campaign's scenarios. Scenarios already in the journal must
+        have the same inputs at the same position, otherwise ValueError is
+        raised (e.g. a rebuilt random design reusing an old journal).
+
+        Scenarios left ``running`` by a crashed session become ``pending``
+        again; the interrupted attempt does not count against the limit.
+        """
+        with self._connect() as conn:
+            known = {idx: (key, text) for idx, key, text in conn.execute("SELECT idx, key, scenario FROM scenarios")}
+            rows = []
+            for i, scenario in enumerate(scenarios):
+                key = scenario_key(scenario)
+                if i in known:
+                    # The same dicts after a run carry pre-processing info as well
+                    if key != known[i][0] and key != scenario_key(json.loads(known[i][1])):
+                        raise ValueError(
+                            f"Scenario {i + 1} differs from the one recorded in {self.path}; "
+                            f"use a new journal or load the scenarios from this one"
+                        )
+                    continue
+                text = json.dumps(scenario, default=json_default)
+                rows.append((i, key, text, text, _now()))
+            conn.executemany(
+                "INSERT INTO scenarios (idx, key, inputs, scenario, updated_at) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            conn.execute(
+                "UPDATE scenarios SET status = ?, updated_at = ? WHERE status = ?",
+                (PENDING, _now(), RUNNING),
+            )
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
+
+    def inputs(self):
+        """The scenarios as registered, e.g. to restart a campaign after the kernel died."""
+        with self._connect() as conn:
+            return [json.loads(row[0]) for row in conn.execute("SELECT inputs FROM scenarios ORDER BY idx")]
+
+    def scenarios(self):
+        """All scenarios in campaign order, with outputs for the finished ones."""
+        with self._connect() as conn:
+            return [json.loads(row[0]) for row in conn.execute("SELECT scenario FROM scenarios ORDER BY idx")]
+
+    def entry(self, index):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM scenarios WHERE idx = ?", (index,)).fetchone()
+        if row is None:
+            raise KeyError(f"Scenario {index + 1} is not in the journal")
+        entry = dict(row)
+        entry["inputs"] = json.loads(entry["inputs"])
+        entry["scenario"] = json.loads(entry["scenario"])
+        return entry
+
+    def todo(self):
+        """Indices still to run: pending, or failed with attempts left."""
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT idx FROM scenarios WHERE status = ? OR (status = ? AND attempts < ?) ORDER BY idx",
+                (PENDING, FAILED, self.max_attempts),
+            )]
+
+    def summary(self):
+        """Scenario count per status, plus 'exhausted' for failed ones out of attempts."""
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0, "exhausted": 0}
+        with self._connect() as conn:
+            for status, attempts in conn.execute("SELECT status, attempts FROM scenarios"):
+                counts[status] += 1
+                if status == FAILED and attempts >= self.max_attempts:
+                    counts["exhausted"] += 1
+        return counts
+
+    # ------------------------------------------------------------------
+    # Progress
+    # ------------------------------------------------------------------
+
+    def retry_delay(self, index):
+        """Seconds to wait before the next attempt of scenario ``index`` may start."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT next_attempt_at FROM scenarios WHERE idx = ?", (index,)).fetchone()
+        return max(row[0] - time.time(), 0.0) if row else 0.0
+
+    def start(self, index, xml_file=None, db_path=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE scenarios SET status = ?, xml_file = ?, db_path = ?, updated_at = ? WHERE idx = ?",
+                (RUNNING, xml_file, db_path, _now(), index),
+            )
+
+    def record(self, index, stage, scenario=None):
+        """Mark ``stage`` as reached; ``scenario`` (with its outputs) is stored when given."""
+        status = DONE if stage == "finished" else RUNNING
+        sql = "UPDATE scenarios SET stage = ?, status = ?, last_error = NULL, updated_at = ?"
+        params = [stage, status, _now()]
+        if scenario is not None:
+            sql += ", scenario = ?"
+            params.append(json.dumps(scenario, default=json_default))
+        with self._connect() as conn:
+            conn.execute(sql + " WHERE idx = ?", params + [index])
+
+    def fail(self, index, error):
+        """
+        Record a failed attempt and schedule the next one. Returns True when
+        the scenario still has attempts left.
+        """
+        with self._connect() as conn:
+            attempts = conn.execute(
+                "SELECT attempts FROM scenarios WHERE idx = ?", (index,)
+            ).fetchone()[0] + 1
+            delay = self.backoff * self.backoff_factor ** (attempts - 1)
+            conn.execute(
+                "UPDATE scenarios SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, "
+                "updated_at = ? WHERE idx = ?",
+                (FAILED, attempts, time.time() + delay, f"{type(error).__name__}: {error}", _now(), index),
+            )
+        return attempts < self.max_attempts
+
+    def interrupt(self, index):
+        """Return a cancelled scenario to ``pending`` without counting an attempt."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE scenarios SET status = ?, updated_at = ? WHERE idx = ? AND status = ?",
+                (PENDING, _now(), index, RUNNING),
+            )
@@ -1,70 +1,138 @@
+import re
 import sqlite3
+import logging
+from contextlib import closing, contextmanager
 import pandas as pd
-import gc
-import time
+
+logger = logging.getLogger(__name__)
+
+def connect_results(db_path):
+    # Explicitly open in read-only mode
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+@contextmanager
+def open_results(db_path):
+    """Read-only connection that is closed (file handle released) on exit."""
+    with closing(connect_results(db_path)) as conn:
+        yield conn
 
 def get_dataframe(db_path, table_name):
+    with open_results(db_path) as conn:
+        df = pd.read_sql_query(f"SELECT * FROM {_quote(table_name)};", conn)
+    return df
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Covering indexes for the queries below: filter columns first, then the
+# projected ones so SQLite never has to touch the table rows.
+RESULT_INDEXES = {
+    "DisplModelPoints": ["AnalysisKey", "Step", "IdElement", "ParentKey", "Ux", "Uy", "Uz"],
+    "ReactionSumStates": ["AnalysisKey", "Step", "R1", "R2", "R3"],
+}
+
+def _quote(name):
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return f'"{name}"'
+
+def query_records(conn, table, columns, filters=None, step=None, last_step=False, order_by=None):
+    """
+    Run a projected, filtered SELECT on ``table`` and return a list of dicts.
+
+    ``filters`` maps column -> value (equality). ``last_step`` keeps only the
+    rows at ``MAX(Step)`` among the filtered rows, computed by SQLite.
+    """
+    filters = dict(filters or {})
+    conditions = [f"{_quote(col)} = ?" for col in filters]
+    params = list(filters.values())
+    where = " AND ".join(conditions)
+
+    if step is not None:
+        conditions.append('"Step" = ?')
+        params.append(step)
+    elif last_step:
+        subquery = f'SELECT MAX("Step") FROM {_quote(table)}' + (f" WHERE {where}" if where else "")
+        conditions.append(f'"Step" = ({subquery})')
+        params.extend(filters.values())
+
+    sql = f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(table)}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if order_by:
+        sql += " ORDER BY " + ", ".join(_quote(c) for c in order_by)
+
+    cursor = conn.execute(sql, params)
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor]
+
+def ensure_indexes(db_path, indexes=RESULT_INDEXES):
+    """
+    Create the covering indexes on a .Results database. Worth it when the
+    same database is queried several times; failures (read-only or locked
+    file) are logged and ignored.
+    """
     conn = None
     try:
-        # Explicitly open in read-only mode
-        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
-        df = pd.read_sql_query(f"SELECT * FROM {table_name};", conn)
-        df = df.copy()  # fully materialize in memory
+        conn = sqlite3.connect(db_path, timeout=5)
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        for table, columns in indexes.items():
+            if table not in existing:
+                continue
+            name = _quote(f"idx_{table}_{'_'.join(columns[:2])}_covering")
+            cols = ", ".join(_quote(c) for c in columns)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {_quote(table)} ({cols})")
+        conn.commit()
+    except sqlite3.Error as e:
+        logger.warning("Could not create indexes on %s: %s", db_path, e)
     finally:
         if conn is not None:
-            try:
-                conn.close()
-            except Exception:
-                pass
-            del conn
-            gc.collect()     # force cleanup of SQLite internals
-    
-    return df
+            conn.close()
+
+def _query(db_path, *args, conn=None, **kwargs):
+    if conn is not None:
+        return query_records(conn, *args, **kwargs)
+    with open_results(db_path) as conn:
+        return query_records(conn, *args, **kwargs)
 
-def get_model_points_displacement(db_path, analysis_key, id_element=None, step=None, all_steps=False, **kwargs):
+def get_model_points_displacement(db_path, analysis_key, id_element=None, step=None, all_steps=False, conn=None, **kwargs):
     # id_element == Node Key
-    sample = get_dataframe(db_path, "DisplModelPoints")
-    sample = sample[sample['AnalysisKey'] == analysis_key]
-    
+    filters = {"AnalysisKey": analysis_key}
     if id_element:
-        sample = sample[sample['IdElement'] == id_element]
+        filters["IdElement"] = id_element
     
     if not all_steps:
-        if step is None:
-            step = sample['Step'].max()
-        sample = sample[sample['Step'] == step]
-        sample = sample[['IdElement', 'ParentKey', 'Step', 'Ux','Uy','Uz']]
-        try:
-            return {"Displacements": sample.to_dict('records')}
-        except Exception as e:
-            return None
+        records = _query(
+            db_path, "DisplModelPoints", ["IdElement", "ParentKey", "Step", "Ux", "Uy", "Uz"],
+            filters, step=step, last_step=step is None, conn=conn,
+        )
+        return {"Displacements": records}
     else:
-        # Return all steps with reactions
-        sample = sample[['IdElement', 'Step', 'Ux','Uy','Uz']]
-        # Sort by step for clarity (optional)
-        sample = sample.sort_values(by="Step")
-        return {"Displacements": sample.to_dict('records')}
+        # Return all steps, sorted by step
+        records = _query(
+            db_path, "DisplModelPoints", ["IdElement", "Step", "Ux", "Uy", "Uz"],
+            filters, order_by=["Step"], conn=conn,
+        )
+        return {"Displacements": records}
     
 
-def get_reactions(db_path, analysis_key, step=None, all_steps=False, **kwargs):
-    sample = get_dataframe(db_path, "ReactionSumStates")
-    sample = sample[sample['AnalysisKey'] == analysis_key]
+def get_reactions(db_path, analysis_key, step=None, all_steps=False, conn=None, **kwargs):
+    filters = {"AnalysisKey": analysis_key}
 
-    if sample.empty:
-        return {"Reactions": {}}
-    
     if not all_steps:
-        if step is None:
-            step = sample['Step'].max()
-        sample = sample[sample['Step'] == step]
-        sample = sample[['Step', 'R1', 'R2', 'R3']]
-        return {"Reactions": sample.to_dict('records')}
+        records = _query(
+            db_path, "ReactionSumStates", ["Step", "R1", "R2", "R3"],
+            filters, step=step, last_step=step is None, conn=conn,
+        )
     else:
-        # Return all steps with reactions
-        sample = sample[['Step', 'R1', 'R2', 'R3']]
-        # Sort by step for clarity (optional)
-        sample = sample.sort_values(by="Step")
-        return {"Reactions": sample.to_dict('records')}
+        # Return all steps with reactions, sorted by step
+        records = _query(
+            db_path, "ReactionSumStates", ["Step", "R1", "R2", "R3"],
+            filters, order_by=["Step"], conn=conn,
+        )
+
+    if not records:
+        return {"Reactions": {}}
+    return {"Reactions": records}
     
 
 # tables_to_check = [
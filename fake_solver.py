@@ -0,0 +1,193 @@
+import os
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+
+import numpy as np
+
+from modelxml.index import model_index
+from modelxml.session import ModelSession
+from resource_monitor import MB
+from solver_base import SolverRunError, SolverResult, SolverTimeout
+
+logger = logging.getLogger(__name__)
+
+# Tables and columns read by extract_results
+RESULTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS DisplModelPoints (
+    AnalysisKey INTEGER,
+    Step        INTEGER,
+    IdElement   INTEGER,
+    ParentKey   INTEGER,
+    Ux          REAL,
+    Uy          REAL,
+    Uz          REAL
+);
+CREATE TABLE IF NOT EXISTS ReactionSumStates (
+    AnalysisKey INTEGER,
+    Step        INTEGER,
+    R1          REAL,
+    R2          REAL,
+    R3          REAL
+);
+"""
+
+TO_BE_EXECUTED = "NotExecutedToBeExecute"
+EXECUTED = "ExecutedSuccessfully"
+
+# Same format as the solver's ExitDescription, parsed by selectors.analysis_state
+EXIT_DESCRIPTION = (
+    "Collapse mechanism reached: displ = {displ:.4f} cm, F = {F:.3f} kN, "
+    "Load multiplier F/Fo = {multiplier:.2f} %, Fmax = {Fmax:.3f} kN"
+)
+
+
+def _material_factor(root):
+    """Smooth, deterministic function of the numeric material properties."""
+    logs = []
+    for template in model_index(root).elements("Template"):
+        for name, value in template.attrib.items():
+            if name in ("Key", "Name"):
+                continue
+            try:
+                logs.append(np.log1p(abs(float(value))))
+            except ValueError:
+                continue
+    return float(np.mean(logs)) if logs else 1.0
+
+
+class FakeSolver:
+    """
+    Stand-in for SolverHistra.exe, for exercising and load-testing the
+    pipeline without the solver or a licence.
+
+    Every analysis marked to be executed gets ``n_steps`` synthetic steps of
+    model point displacements and reaction sums in the ``.Results``
+    database, and its States are marked executed with an ExitDescription in
+    the solver's format. Results depend smoothly on the material
+    properties, so surrogate models have something to learn.
+
+    The run takes ``duration`` seconds: a number, a callable ``f(rng)`` or,
+    by default, a log-normal draw with median ``seconds`` (environment
+    variable ``FAKE_SOLVER_SECONDS``, default 1) and shape ``sigma``.
+    ``failure_rate`` is the probability of a SolverRunError.
+    """
+    name = "fake"
+
+    def __init__(self, seconds=None, sigma=0.25, duration=None, n_steps=10,
+                 failure_rate=0.0, seed=None):
+        if seconds is None:
+            seconds = float(os.environ.get("FAKE_SOLVER_SECONDS", 1.0))
+        self.seconds = seconds
+        self.sigma = sigma
+        self.duration = duration
+        self.n_steps = n_steps
+        self.failure_rate = failure_rate
+        self.rng = np.random.default_rng(seed)
+        # One instance is shared by the scheduler's worker threads
+        self._rng_lock = threading.Lock()
+
+    def command(self, model_path):
+        return ["fake-solver", "run", str(model_path)]
+
+    def sample_duration(self, rng):
+        if self.duration is None:
+            return float(rng.lognormal(np.log(self.seconds), self.sigma)) if self.seconds > 0 else 0.0
+        if callable(self.duration):
+            return float(self.duration(rng))
+        return float(self.duration)
+
+    def run(self, model_path, timeout_seconds):
+        with self._rng_lock:
+            rng = np.random.default_rng(self.rng.integers(2**63))
+        duration = self.sample_duration(rng)
+        if duration > timeout_seconds:
+            time.sleep(timeout_seconds)
+            raise SolverTimeout(model_path, timeout_seconds)
+        time.sleep(duration)
+
+        if rng.random() < self.failure_rate:
+            raise SolverRunError(model_path, "Fake solver terminated with error code 1")
+
+        executed = []
+        with ModelSession(model_path) as model:
+            model.apply(self._solve, model_path.with_suffix(".Results"), rng, executed)
+            n_elements = sum(1 for _ in model.root.iter())
+        logger.info("Fake solver ran %s on %s in %.2f s", executed, model_path.name, duration)
+
+        # Memory grows with the model, as the solver's does
+        usage = {
+            "duration": duration,
+            "peak_rss_mb": (200 * MB + 2048 * n_elements) / MB,
+            "mean_cpu_percent": 95.0,
+            "peak_cpu_percent": 100.0,
+            "cpu_time": 0.95 * duration,
+        }
+        return SolverResult(f"Executed {', '.join(executed)}", usage)
+
+    def _solve(self, root, results_path, rng, executed):
+        index = model_index(root)
+        points = [
+            (int(mp.get("IdElement")), int(mp.get("ParentKey", mp.get("Key"))))
+            for mp in index.elements("ModelPoint")
+        ]
+        factor = _material_factor(root)
+
+        with closing(sqlite3.connect(results_path)) as conn, conn:
+            conn.executescript(RESULTS_SCHEMA)
+            for analysis in index.elements("Analysis"):
+                states = analysis.find("States")
+                if states is None:
+                    continue
+                to_run = [s for s in states.findall("State") if s.get("State") == TO_BE_EXECUTED]
+                if not to_run:
+                    continue
+                analysis_key = int(analysis.get("Key"))
+                summary = self._write_results(conn, analysis_key, points, factor, analysis.get("Name", ""), rng)
+                for state in to_run:
+                    state.set("State", EXECUTED)
+                    state.set("Exit", "Collapse")
+                    state.set("ExitDescription", EXIT_DESCRIPTION.format(**summary))
+                executed.append(analysis.get("Name"))
+
+    def _write_results(self, conn, analysis_key, points, factor, name, rng):
+        # Per-analysis variation that is stable across runs of the same model
+        bias = 1 + 0.1 * (zlib.crc32(name.encode("utf-8")) % 100) / 100
+        noise = rng.normal(1.0, 0.02)
+        fmax = 50.0 * factor * bias * noise
+        ultimate_displ = 2.0 / (factor * bias)
+
+        steps = np.arange(1, self.n_steps + 1)
+        t = steps / self.n_steps
+        # Hardening then softening load path
+        load = fmax * np.sin(t * np.pi * 0.6) / np.sin(np.pi * 0.6 * 5 / 6)
+        load = np.minimum(load, fmax)
+        displ = ultimate_displ * t ** 1.5
+
+        conn.execute("DELETE FROM DisplModelPoints WHERE AnalysisKey = ?", (analysis_key,))
+        conn.execute("DELETE FROM ReactionSumStates WHERE AnalysisKey = ?", (analysis_key,))
+        conn.executemany(
+            "INSERT INTO DisplModelPoints (AnalysisKey, Step, IdElement, ParentKey, Ux, Uy, Uz) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (analysis_key, int(step), id_element, parent_key,
+                 float(d * (1 + 0.01 * j)), float(0.05 * d), float(-0.3 * d))
+                for step, d in zip(steps, displ)
+                for j, (id_element, parent_key) in enumerate(points)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO ReactionSumStates (AnalysisKey, Step, R1, R2, R3) VALUES (?, ?, ?, ?, ?)",
+            [(analysis_key, int(step), float(f), 0.0, float(-4 * fmax)) for step, f in zip(steps, load)],
+        )
+
+        last_load = float(load[-1])
+        return {
+            "displ": float(displ[-1]),
+            "F": last_load,
+            "multiplier": 100.0 * last_load / fmax,
+            "Fmax": fmax,
+        }
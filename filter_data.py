@@ -1,7 +1,18 @@
 import json
+import itertools
 import numpy as np
 import pandas as pd
 
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Rows per block when searching pairs; without scipy a block holds
+# CHUNK_SIZE x n distances, capped at MAX_BLOCK_VALUES
+CHUNK_SIZE = 65536
+MAX_BLOCK_VALUES = 1 << 23  # 64 MB of float64
+
 # ---- (A) Optional: load/flatten your scenarios_results.json into a table
 def load_scenarios_json(path):
     """
@@ -52,37 +63,81 @@ def _normalize_array(X: np.ndarray, scale: str = "zscore") -> np.ndarray:
     Z[:, mask_const] = 0.0
     return Z
 
-def _find_neighbors(Z: np.ndarray, eps: float) -> list[list[int]]:
-    """Find neighbors within a radius using cKDTree, sklearn, or fallback O(n^2)."""
-    try:
-        from scipy.spatial import cKDTree
-        return cKDTree(Z).query_ball_point(Z, r=eps)
-    except Exception:
-        try:
-            from sklearn.neighbors import NearestNeighbors
-            nn = NearestNeighbors(radius=eps, algorithm="kd_tree").fit(Z)
-            return nn.radius_neighbors(return_distance=False)
-        except Exception:
-            D = np.sqrt(((Z[:, None, :] - Z[None, :, :]) ** 2).sum(axis=2))
-            return [list(np.where(D[i] <= eps)[0]) for i in range(Z.shape[0])]
-
-def _build_clusters(order, neighbors_within):
-    """Cluster points by proximity."""
-    n = len(neighbors_within)
-    kept = np.zeros(n, dtype=bool)
-    removed = np.zeros(n, dtype=bool)
+def _tree_pairs(Z, eps, chunk_size):
+    tree = cKDTree(Z)
+    for start in range(0, len(Z), chunk_size):
+        neighbors = tree.query_ball_point(Z[start:start + chunk_size], r=eps, return_sorted=False, workers=-1)
+        counts = np.fromiter(map(len, neighbors), dtype=np.int64, count=len(neighbors))
+        j = np.fromiter(itertools.chain.from_iterable(neighbors), dtype=np.int64, count=counts.sum())
+        i = np.repeat(np.arange(start, start + len(neighbors)), counts)
+        i, j = i[j > i], j[j > i]
+        yield i, j, np.sqrt(((Z[i] - Z[j]) ** 2).sum(axis=1))
+
+def _brute_force_pairs(Z, eps, chunk_size):
+    """Blocked O(n^2) search: memory stays bounded by MAX_BLOCK_VALUES."""
+    n = len(Z)
+    sq = (Z ** 2).sum(axis=1)
+    step = max(1, min(chunk_size, MAX_BLOCK_VALUES // max(n, 1)))
+    for start in range(0, n, step):
+        block = Z[start:start + step]
+        d2 = sq[start:start + step, None] + sq[None, :] - 2.0 * block @ Z.T
+        i, j = np.nonzero(d2 <= eps ** 2 + 1e-9)
+        i += start
+        i, j = i[j > i], j[j > i]
+        # Exact distances for the candidates (the expansion above cancels badly near 0)
+        d = np.sqrt(((Z[i] - Z[j]) ** 2).sum(axis=1))
+        close = d <= eps
+        yield i[close], j[close], d[close]
+
+def _close_pairs(Z, eps, chunk_size=CHUNK_SIZE):
+    """
+    Yield blocks (i, j, distance) of the row pairs i < j within ``eps``,
+    sorted by (i, j). Rows with NaN have no neighbours.
+    """
+    rows = np.flatnonzero(np.isfinite(Z).all(axis=1))
+    search = _tree_pairs if cKDTree is not None else _brute_force_pairs
+    for i, j, d in search(Z[rows], eps, chunk_size):
+        order = np.lexsort((j, i))
+        yield rows[i[order]], rows[j[order]], d[order]
+
+def _all_pairs(Z, eps):
+    """Every pair i < j within ``eps`` as two arrays."""
+    rows = np.flatnonzero(np.isfinite(Z).all(axis=1))
+    if cKDTree is not None:
+        pairs = cKDTree(Z[rows]).query_pairs(eps, output_type="ndarray")
+        return rows[pairs[:, 0]], rows[pairs[:, 1]]
+    blocks = list(_brute_force_pairs(Z[rows], eps, CHUNK_SIZE)) or [(np.empty(0, dtype=np.int64),) * 2]
+    return rows[np.concatenate([b[0] for b in blocks])], rows[np.concatenate([b[1] for b in blocks])]
+
+def _neighbor_graph(n, i, j):
+    """Sparse (CSR) neighbour lists of n points from their close pairs; each point is its own neighbour."""
+    self_loops = np.arange(n)
+    src = np.concatenate([i, j, self_loops])
+    dst = np.concatenate([j, i, self_loops])
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, dst[np.lexsort((dst, src))]
+
+def _build_clusters(order, indptr, indices):
+    """
+    Cluster points by proximity: in ``order``, a point not yet claimed is
+    kept and claims its neighbours. Points without neighbours are kept
+    outright, so only the (usually few) others go through the greedy pass.
+    """
+    n = len(indptr) - 1
+    kept = np.diff(indptr) == 1
     seen = np.zeros(n, dtype=bool)
-    clusters = []
+    ptr = indptr.tolist()
 
-    for i in order:
+    for i in order[~kept[order]].tolist():
         if seen[i]:
             continue
-        cluster = sorted(set(neighbors_within[i]) | {i})
-        seen[cluster] = True
         kept[i] = True
-        removed[[j for j in cluster if j != i]] = True
-        clusters.append(cluster)
+        seen[indices[ptr[i]:ptr[i + 1]]] = True
 
+    removed = seen & ~kept
+    flat = indices.tolist()
+    clusters = [flat[ptr[i]:ptr[i + 1]] for i in order[kept[order]].tolist()]
     return kept, removed, clusters
 
 def normalized_distance_filter(
@@ -110,19 +165,27 @@ def normalized_distance_filter(
         rng = np.random.default_rng(random_state)
         rng.shuffle(order)
 
-    neighbors_within = _find_neighbors(Z, eps)
-    kept, removed, clusters = _build_clusters(order, neighbors_within)
+    indptr, indices = _neighbor_graph(n, *_all_pairs(Z, eps))
+    kept, removed, clusters = _build_clusters(order, indptr, indices)
     
     df_filtered = df.iloc[kept].copy()
 
     return df_filtered, df.index[kept], df.index[removed], clusters
 
-def normalized_close_pairs(df, cols=None, scale="zscore", eps=0.15):
-    """Return list of (i, j) index pairs where normalized distance <= eps."""
+def iter_close_pairs(df, cols=None, scale="zscore", eps=0.15, chunk_size=CHUNK_SIZE):
+    """
+    Stream the pairs of rows within normalized distance ``eps``, one block
+    of ``chunk_size`` rows at a time: DataFrames with the index labels
+    ``i`` and ``j`` (``i`` first by position) and their ``distance``.
+    """
     if cols is None:
         cols = df.select_dtypes(include=[np.number]).columns.tolist()
     Z = _normalize_array(df[cols].to_numpy(float), scale)
-    neighbors = _find_neighbors(Z, eps)
+    for i, j, d in _close_pairs(Z, eps, chunk_size):
+        yield pd.DataFrame({"i": df.index[i], "j": df.index[j], "distance": d})
 
-    pairs = {(df.index[i], df.index[j]) for i, lst in enumerate(neighbors) for j in lst if j > i}
-    return sorted(pairs)
+def normalized_close_pairs(df, cols=None, scale="zscore", eps=0.15):
+    """Return list of (i, j) index pairs where normalized distance <= eps."""
+    pairs = [pair for block in iter_close_pairs(df, cols, scale, eps)
+             for pair in zip(block["i"].tolist(), block["j"].tolist())]
+    return pairs if df.index.is_monotonic_increasing else sorted(pairs)
@@ -0,0 +1,18 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+
+def json_default(value):
+    """
+    ``json.dumps(..., default=json_default)`` for what scenarios carry besides
+    plain JSON: numpy scalars and arrays, and Mapping views such as
+    ``build_scenarios.ScenarioView``.
+    """
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,129 @@
+import os
+import glob
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+import xml.etree.ElementTree as ET
+
+from modelxml.xmlio import read_xml_tags
+from modelxml.selectors import GEOMETRY_TAGS, ANALYSIS_TAGS
+from modelxml.session import ModelSession
+
+logger = logging.getLogger(__name__)
+
+# Elements whose content changes the mesh. ModelPoint is included because
+# prepare_model adds them to the input before scenarios are meshed.
+MESH_KEY_TAGS = GEOMETRY_TAGS + ("ModelPoint",)
+
+# StartMesh is copied from this analysis, so its settings (attributes and
+# every child but the run-dependent States) drive the mesh run
+MESH_SOURCE_ANALYSIS = "Vert"
+
+
+def _is_mesh_key_tag(tag):
+    # Mesh settings elements (MeshSettings, MeshSize...) wherever they are
+    return tag in MESH_KEY_TAGS or tag in ANALYSIS_TAGS or "Mesh" in tag
+
+
+def geometry_hash(path):
+    """SHA-256 of the canonicalized geometry and mesh settings XML of a model."""
+    root = read_xml_tags(path, _is_mesh_key_tag)
+    digest = hashlib.sha256()
+    for elem in root:
+        if elem.tag in ANALYSIS_TAGS:
+            if elem.get("Name") != MESH_SOURCE_ANALYSIS:
+                continue
+            settings = ET.Element(elem.tag, elem.attrib)
+            settings.extend(child for child in elem if child.tag != "States")
+            elem = settings
+        digest.update(ET.canonicalize(ET.tostring(elem, encoding="unicode")).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MeshCache:
+    """
+    Meshed copies of input models, keyed by ``geometry_hash``.
+
+    The first scenario of a geometry runs StartMesh on a private copy;
+    every later scenario starts from that meshed file. Threads of one
+    process mesh a geometry once; separate processes sharing the folder may
+    both mesh it, each in its own work file, and the first to finish
+    publishes the entry with an atomic rename.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.abspath(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"mesh_{key[:16]}.hrx")
+
+    def meshed_model(self, input_path, mesh_fn, **kwargs):
+        """
+        Return the path of the meshed model for ``input_path``, calling
+        ``mesh_fn(ModelSession, **kwargs)`` on a copy of it on a cache miss.
+        """
+        key = geometry_hash(input_path)
+        cached = self.path_for(key)
+        if os.path.exists(cached):
+            logger.info("Mesh cache hit for %s", os.path.basename(input_path))
+            return cached
+
+        with self._lock_for(key):
+            if os.path.exists(cached):
+                return cached
+
+            logger.info("Mesh cache miss for %s; meshing", os.path.basename(input_path))
+            work = os.path.join(self.cache_dir, f"mesh_{key[:16]}_{os.getpid()}_{uuid.uuid4().hex[:8]}.hrx")
+            work_base = os.path.splitext(work)[0]
+            try:
+                mesh_fn(ModelSession(work, source=input_path), **kwargs)
+                if os.path.exists(cached):
+                    logger.info("Another process meshed %s first; using its entry", os.path.basename(input_path))
+                    return cached
+                # Keep the solver outputs next to the model (e.g. .Results);
+                # the .hrx goes last since its existence marks a complete entry
+                for path in glob.glob(work_base + ".*"):
+                    if path != work:
+                        os.replace(path, os.path.splitext(cached)[0] + os.path.splitext(path)[1])
+                os.replace(work, cached)
+            finally:
+                for path in glob.glob(work_base + ".*"):
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        logger.warning("Could not delete %s: %s", path, e)
+        return cached
+
+    @staticmethod
+    def copy_companions(cached, xml_file):
+        """Copy the files produced by the mesh run (all but the .hrx) next to ``xml_file``."""
+        cached_base, xml_base = os.path.splitext(cached)[0], os.path.splitext(xml_file)[0]
+        for path in glob.glob(cached_base + ".*"):
+            ext = os.path.splitext(path)[1]
+            if ext.lower() != ".hrx":
+                shutil.copyfile(path, xml_base + ext)
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+
+_default_caches = {}
+_default_caches_guard = threading.Lock()
+
+def default_mesh_cache(input_path):
+    """Shared MeshCache in a ``mesh_cache`` folder next to the input model."""
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(input_path)), "mesh_cache")
+    with _default_caches_guard:
+        if cache_dir not in _default_caches:
+            _default_caches[cache_dir] = MeshCache(cache_dir)
+        return _default_caches[cache_dir]
@@ -0,0 +1,112 @@
+import os
+import logging
+import tempfile
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # optional dependency
+    lxml_etree = None
+
+logger = logging.getLogger(__name__)
+
+
+class EtreeBackend:
+    """Standard library ``xml.etree.ElementTree``."""
+    name = "etree"
+
+    def parse(self, path):
+        with open(path, "r", encoding="utf-16", errors="ignore") as f:
+            return ET.fromstring(f.read())
+
+    def write(self, root, path):
+        ET.ElementTree(root).write(path, encoding="utf-16", xml_declaration=True)
+
+
+if lxml_etree is not None:
+    class _Element(lxml_etree.ElementBase):
+        # lxml proxies are not weak-referenceable by default; the model index
+        # cache (modelxml.index) relies on weak references to the root.
+        __slots__ = ("__weakref__",)
+
+
+class LxmlBackend:
+    """lxml (libxml2) parser and serializer."""
+    name = "lxml"
+
+    def _parser(self, **kwargs):
+        # Parsers are cheap and not shared between worker threads
+        parser = lxml_etree.XMLParser(huge_tree=True, **kwargs)
+        parser.set_element_class_lookup(lxml_etree.ElementDefaultClassLookup(element=_Element))
+        return parser
+
+    def parse(self, path):
+        try:
+            return lxml_etree.parse(str(path), self._parser()).getroot()
+        except lxml_etree.XMLSyntaxError:
+            # Same leniency as the stdlib backend for undecodable bytes
+            logger.warning("Strict parse failed for %s; retrying with decode errors ignored", path)
+            with open(path, "r", encoding="utf-16", errors="ignore") as f:
+                data = f.read().encode("utf-8")
+            return lxml_etree.fromstring(data, self._parser(encoding="utf-8"))
+
+    def write(self, root, path):
+        lxml_etree.ElementTree(root).write(str(path), encoding="utf-16", xml_declaration=True)
+
+
+BACKENDS = {"etree": EtreeBackend}
+if lxml_etree is not None:
+    BACKENDS["lxml"] = LxmlBackend
+
+_backend = None
+
+
+def set_backend(name):
+    """Select the XML backend by name ('lxml' or 'etree')."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown or unavailable XML backend '{name}'. Available: {sorted(BACKENDS)}")
+    _backend = BACKENDS[name]()
+    return _backend
+
+
+def get_backend():
+    """Current backend; defaults to lxml when installed, overridable with MODELXML_BACKEND."""
+    if _backend is None:
+        default = "lxml" if "lxml" in BACKENDS else "etree"
+        set_backend(os.environ.get("MODELXML_BACKEND", default))
+    return _backend
+
+
+def canonical_xml(path):
+    """C14N form of a model file, for backend-independent comparison."""
+    with open(path, "r", encoding="utf-16", errors="ignore") as f:
+        text = f.read()
+    # canonicalize() rejects str input that declares a byte encoding
+    if text.startswith("<?xml"):
+        text = text[text.index("?>") + 2:]
+    return ET.canonicalize(text, strip_text=True)
+
+
+def check_backend_parity(path, mutators=()):
+    """
+    Parse ``path`` with every available backend, apply ``mutators`` and write
+    the result. Returns True when all written files are semantically identical.
+    """
+    canonical = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, backend_cls in BACKENDS.items():
+            backend = backend_cls()
+            root = backend.parse(path)
+            for mutator in mutators:
+                mutator(root)
+            out_path = os.path.join(tmp, f"{name}.hrx")
+            backend.write(root, out_path)
+            canonical[name] = canonical_xml(out_path)
+
+    reference = canonical.pop("etree")
+    for name, text in canonical.items():
+        if text != reference:
+            logger.error("Backend '%s' output differs from 'etree' for %s", name, path)
+            return False
+    return True
@@ -0,0 +1,152 @@
+import weakref
+from collections import OrderedDict
+
+from .spatial import NodeLocator
+
+INDEXED_TAGS = ("Node", "Interface", "Quad", "Template", "Analysis", "ModelPoint")
+NAMED_TAGS = ("Template", "Analysis")
+
+_indexes = weakref.WeakKeyDictionary()
+
+# Roots that cannot be weakly referenced (e.g. lxml elements parsed outside
+# modelxml) are indexed by id(); the index holds the root, so the id stays
+# valid, and only the most recently used ones are kept.
+_strong_indexes = OrderedDict()
+MAX_STRONG_INDEXES = 32
+
+
+class ModelIndex:
+    """
+    Key -> element lookup tables for one parsed model.
+
+    All tables are built lazily in a single pass over the tree. Mutations that
+    add elements register them with ``add``; anything that restructures the
+    tree outside ``modelxml.mutations`` must call ``invalidate``.
+    """
+
+    def __init__(self, root):
+        # Weak so the module-level cache does not keep parsed trees alive
+        try:
+            self._root = weakref.ref(root)
+        except TypeError:
+            self._root = lambda: root
+        self._by_key = None
+        self._by_name = None
+        self._elements = None
+        self._model_points = None
+        self._max_model_point_key = 0
+        self._locator = None
+
+    @property
+    def root(self):
+        return self._root()
+
+    def _build(self):
+        by_key = {tag: {} for tag in INDEXED_TAGS}
+        by_name = {tag: {} for tag in NAMED_TAGS}
+        self._by_key, self._by_name = by_key, by_name
+        self._elements = {tag: [] for tag in INDEXED_TAGS}
+        self._model_points = {}
+        self._max_model_point_key = 0
+
+        for elem in self.root.iter():
+            if elem.tag in by_key:
+                self._register(elem)
+
+    def _register(self, elem):
+        tag = elem.tag
+        self._elements[tag].append(elem)
+        key = elem.get("Key")
+        if key is not None:
+            self._by_key[tag].setdefault(key, elem)
+        if tag in self._by_name:
+            name = elem.get("Name")
+            if name is not None:
+                self._by_name[tag].setdefault(name, elem)
+        if tag == "ModelPoint":
+            for attr in ("IdElement", "ElementKey"):
+                value = elem.get(attr)
+                if value is not None:
+                    self._model_points.setdefault(value, elem)
+            if key and key.isdigit():
+                self._max_model_point_key = max(self._max_model_point_key, int(key))
+
+    def _tables(self):
+        if self._by_key is None:
+            self._build()
+        return self._by_key, self._by_name
+
+    def get(self, tag, key):
+        by_key, _ = self._tables()
+        elem = by_key[tag].get(str(key))
+        if elem is not None and elem.get("Key") != str(key):
+            # Key attribute was edited behind our back
+            self._build()
+            elem = self._by_key[tag].get(str(key))
+        return elem
+
+    def by_name(self, tag, name):
+        _, by_name = self._tables()
+        elem = by_name[tag].get(name)
+        if elem is not None and elem.get("Name") != name:
+            self._build()
+            elem = self._by_name[tag].get(name)
+        return elem
+
+    def elements(self, tag):
+        self._tables()
+        return list(self._elements[tag])
+
+    def model_point_for(self, node_key):
+        self._tables()
+        return self._model_points.get(str(node_key))
+
+    def next_model_point_key(self):
+        self._tables()
+        return self._max_model_point_key + 1
+
+    def node_locator(self) -> NodeLocator:
+        """KD-tree over all Node points, built on first use."""
+        if self._locator is None:
+            self._locator = NodeLocator.from_elements(self.elements("Node"))
+        return self._locator
+
+    def add(self, elem):
+        """Register an element appended to the tree after the index was built."""
+        if self._by_key is not None and elem.tag in self._by_key:
+            self._register(elem)
+        if elem.tag == "Node":
+            self._locator = None
+
+    def invalidate(self):
+        self._by_key = self._by_name = self._elements = self._model_points = None
+        self._max_model_point_key = 0
+        self._locator = None
+
+
+def model_index(root) -> ModelIndex:
+    """Return the cached index for ``root``, creating it on first use."""
+    try:
+        index = _indexes.get(root)
+    except TypeError:
+        return _strong_index(root)
+    if index is None:
+        index = _indexes[root] = ModelIndex(root)
+    return index
+
+def _strong_index(root) -> ModelIndex:
+    index = _strong_indexes.get(id(root))
+    if index is None:
+        index = _strong_indexes[id(root)] = ModelIndex(root)
+        while len(_strong_indexes) > MAX_STRONG_INDEXES:
+            _strong_indexes.popitem(last=False)
+    _strong_indexes.move_to_end(id(root))
+    return index
+
+def invalidate_index(root) -> None:
+    try:
+        index = _indexes.get(root)
+    except TypeError:
+        index = _strong_indexes.get(id(root))
+    if index is not None:
+        index.invalidate()
@@ -2,6 +2,7 @@ import logging
 import copy
 import math
 from xml.etree import ElementTree as ET
+from .index import model_index
 from .selectors import geometry, masonry_materials, nodes, model_points_location_map, quads, interfaces, foundation_interfaces
 
 logging.basicConfig(
@@ -13,20 +14,19 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def set_all_analysis_to_not_run(root) -> None:
-    for analysis in root.iter("Analysis"):
+    for analysis in model_index(root).elements("Analysis"):
         states = analysis.find("States")
         if states is None: continue
         for state in states.findall("State"):
             state.set("State", "NotExecutedNotToBeExecuted")
 
 def set_analysis_to_run(root, name) -> None:
-    for analysis in root.iter("Analysis"):
-        if analysis.get("Name") == name:
-            states = analysis.find("States")
-            if states is None: break
-            for state in states.findall("State"):
-                state.set("State", "NotExecutedToBeExecute")
-            break
+    analysis = model_index(root).by_name("Analysis", name)
+    if analysis is None: return
+    states = analysis.find("States")
+    if states is None: return
+    for state in states.findall("State"):
+        state.set("State", "NotExecutedToBeExecute")
 
 def _copy_analysis(root, copy_from):
     analysis = None
@@ -37,14 +37,16 @@ def _copy_analysis(root, copy_from):
         if elem.get("Name") == copy_from:
             analysis = elem
     
-    if not analysis:
+    if analysis is None:
         raise ValueError(f"No '{copy_from}' analysis found in XML")
             
     return last_key, copy.deepcopy(analysis)
 
-def update_node_to_model_point(root, node_key):
+def update_node_to_model_point(root, node_key, index=None):
+    index = index or model_index(root)
+
     # Find the Node with the given Key
-    node = root.find(f".//Node[@Key='{node_key}']")
+    node = index.get("Node", node_key)
     if node is None:
         raise ValueError(f"Node with Key={node_key} not found")
     
@@ -53,21 +55,13 @@ def update_node_to_model_point(root, node_key):
 
     
     # Check if ModelPoint already exists for this Node
-    existing_mp = root.find(f".//ModelPoint[@IdElement='{node_key}']") \
-               or root.find(f".//ModelPoint[@ElementKey='{node_key}']")
-    if existing_mp is not None:
+    if index.model_point_for(node_key) is not None:
         return 
     
-    # Find the max Key among existing ModelPoints
-    model_points = root.findall(".//ModelPoint")
-    existing_keys = [
-        int(mp.get("Key")) for mp in model_points
-        if mp.get("Key") and mp.get("Key").isdigit()
-    ]
-    next_key = max(existing_keys) + 1 if existing_keys else 1
+    next_key = index.next_model_point_key()
     
     # Create the new ModelPoint element
-    model_point = ET.Element("ModelPoint")
+    model_point = root.makeelement("ModelPoint", {})
     
     # Populate auto-generated and node-related fields
     model_point_data = {
@@ -87,11 +81,13 @@ def update_node_to_model_point(root, node_key):
 
     # Append the new ModelPoint to the root (or specific parent if needed)
     root.append(model_point)
+    index.add(model_point)
 
-def set_model_points(root):
-    location_map = model_points_location_map(root)
+def set_model_points(root, monitoring_points=None):
+    index = model_index(root)
+    location_map = model_points_location_map(root, monitoring_points)
     for point in location_map.values():
-        update_node_to_model_point(root, point['Key'])
+        update_node_to_model_point(root, point['Key'], index)
 
 def create_start_mesh(root):
     key, analysis_mesh = _copy_analysis(root, "Vert")
@@ -102,42 +98,49 @@ def create_start_mesh(root):
         state.set("Key", f"{key + 1}")
 
     root.append(analysis_mesh)
+    model_index(root).add(analysis_mesh)
 
 def create_start_mesh_analysis(root):    
-    if 'StartMesh' not in [elem.attrib.get("Name") for elem in root.iter("Analysis")]:
+    index = model_index(root)
+    if index.by_name("Analysis", "StartMesh") is None:
         create_start_mesh(root)
     
     setpairs = {
         "Mult": "0",
     }
     
-    for elem in root.iter("Analysis"):
-        if elem.attrib.get("Name") == 'StartMesh':
-            for k,v in setpairs.items():
-                elem.set(k, v)
-            break
+    elem = index.by_name("Analysis", "StartMesh")
+    for k,v in setpairs.items():
+        elem.set(k, v)
 
 def update_materials(root, materials):
+    index = model_index(root)
     for material in materials:
-        update_material(root, material)
-
-def update_material(root, mat) -> None:
-    for tmpl in root.iter("Template"):
-        if tmpl.get("Name") == mat["Name"]:
-            for k, v in mat.items():
-                if k != "Name":
-                    tmpl.set(k, str(v))
-            return
-    raise KeyError(f"Material '{mat['Name']}' not found.")
-
-def set_material_to_interfaces(root, iface_keys, material_key) -> None:
-    for iface in root.iter("Interface"):
-        k = iface.get("Key")
-        if k and k in iface_keys:
-            iface.set("MaterialKey", material_key)
-            iface.set("IsPropertyModified", "True")
-
-def _get_material_key(root: ET.Element, material_name: str) -> str:
+        update_material(root, material, index)
+
+def update_material(root, mat, index=None) -> None:
+    index = index or model_index(root)
+    tmpl = index.by_name("Template", mat["Name"])
+    if tmpl is None:
+        raise KeyError(f"Material '{mat['Name']}' not found.")
+    for k, v in mat.items():
+        if k != "Name":
+            tmpl.set(k, str(v))
+
+def set_material_to_interfaces(root, iface_keys, material_key, index=None) -> None:
+    index = index or model_index(root)
+    for k in set(iface_keys):
+        iface = index.get("Interface", k)
+        if iface is None: continue
+        iface.set("MaterialKey", material_key)
+        iface.set("IsPropertyModified", "True")
+
+def _get_material_key(root: ET.Element, material_name: str, index=None) -> str:
+    index = index or model_index(root)
+    tmpl = index.by_name("Template", material_name)
+    if tmpl is not None:
+        if "MasonryMaterial" in tmpl.get("TypeOf", "") or "MasonryMaterial" in tmpl.get("PurposeType", ""):
+            return tmpl.get("Key")
     for m in masonry_materials(root):
         if m["Name"] == material_name:
             return m["Key"]
@@ -150,8 +153,11 @@ def update_foundation_interfaces(root, interfaces: dict) -> None:
     # foundation_mk = _get_material_key(root, "Foundation")
     # foundation_quad_keys = [q["Key"] for q in quads(root) if q["MaterialKey"] == foundation_mk]
     # target_ifaces = {i["Key"] for i in restr if i["ParentElementKey2"] in foundation_quad_keys}
+    index = model_index(root)
     found_inter = foundation_interfaces(root)
-    logging.debug(f"Found foundation interfaces: {found_inter}")
+    logging.debug("Found foundation interfaces: %s", {
+        pier: [len(keys) for keys in groups] for pier, groups in found_inter.items()
+    })
     
     for pier, material in interfaces.items():
         logging.debug(f"Processing pier='{pier}', material='{material}'")
@@ -160,6 +166,6 @@ def update_foundation_interfaces(root, interfaces: dict) -> None:
             logging.warning(f"Pier '{pier}' not found in foundation interfaces. Skipping.")
             continue
         
-        target_ifaces_keys = [f_i['Key'] for f_i in found_inter[pier][1]]
-        mat_key = _get_material_key(root, material)
-        set_material_to_interfaces(root, target_ifaces_keys, mat_key)
\ No newline at end of file
+        target_ifaces_keys = found_inter[pier][1]
+        mat_key = _get_material_key(root, material, index)
+        set_material_to_interfaces(root, target_ifaces_keys, mat_key, index)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from .xmlio import mutate_file, read_xml, save_xml
+from .session import ModelSession
 from .mutations import (
     set_model_points,
     set_all_analysis_to_not_run,
@@ -11,8 +12,8 @@ from .mutations import (
 def run_copy_paste(in_path: str, out_path: str | None = None):
     mutate_file(in_path, None, out_path)
 
-def run_set_model_points(in_path: str, out_path: str | None = None):
-    mutate_file(in_path, set_model_points, out_path)
+def run_set_model_points(in_path: str, out_path: str | None = None, monitoring_points: dict | None = None):
+    mutate_file(in_path, lambda r: set_model_points(r, monitoring_points), out_path)
 
 def run_set_all_analyses_off(in_path: str, out_path: str | None = None):
     mutate_file(in_path, set_all_analysis_to_not_run, out_path)
@@ -28,3 +29,9 @@ def run_update_material(in_path: str, materials: list, out_path: str | None = No
 
 def run_update_foundation_ifaces(in_path: str, scenario: dict, out_path: str | None = None):
     mutate_file(in_path, lambda r: update_foundation_interfaces(r, scenario), out_path)
+
+def run_mutations(in_path: str, mutators: list, out_path: str | None = None):
+    """Parse once, apply every mutator in order, write once."""
+    with ModelSession(out_path or in_path, source=in_path) as model:
+        for mutator in mutators:
+            model.apply(mutator)
@@ -1,6 +1,16 @@
-import math
 import re
 
+import numpy as np
+
+from .index import model_index
+from .spatial import parse_points
+
+# Element tags each group of read-only selectors needs (see xmlio.read_xml_tags)
+ANALYSIS_TAGS = ("Analysis",)
+GEOMETRY_TAGS = ("BridgeDefinition", "Abutment", "Pier", "Span", "Elevations")
+MATERIAL_TAGS = ("Template",)
+NODE_TAGS = ("Node",)
+
 def interfaces(root):
     records = []
     for elem in root.iter("Interface"):
@@ -168,33 +178,42 @@ def restrain(root):
             records.append(record)
     return records
 
-def foundation_interfaces(root):
-    geo = geometry(root)
-    inter = interfaces(root)
-
-    restrains_interfaces = [i for i in inter if i['ParentTypeElement1'] == 'Restraint']
-
-    foundation_locations = [
-        (p["Origin"][0], p["B1f"] + p["b2"] + p["B3f"], -(p["H"] + p["Hf"]))
-        for p in geo["Piers"]
-    ]
-
-    foundations_interfaces = {}
+def restraint_interface_centroids(root):
+    """Keys and (n, 3) ``VInt3D1`` centroids of the interfaces attached to restraints."""
+    keys, points = [], []
+    for elem in model_index(root).elements("Interface"):
+        if elem.get("ParentTypeElement1") != "Restraint" or not elem.get("Key"):
+            continue
+        keys.append(elem.get("Key"))
+        points.append(elem.get("VInt3D1"))
+    return np.asarray(keys, dtype=object), parse_points(points)
 
-    for i, (x0, width, z0) in enumerate(foundation_locations):
-        left, bottom, right = [], [], []
-        for inter in restrains_interfaces:
-            x, _, z = map(float, inter["VInt3D1"].split(";"))
-            if x0 - width * 0.55 < x < x0 + width * 0.55:
-                if abs(z - z0) < 1:
-                    bottom.append(inter)
-                elif x < x0:
-                    left.append(inter)
-                elif x > x0:
-                    right.append(inter)
-        foundations_interfaces[f"pier_{i+1}"] = (left, bottom, right)
+def foundation_interfaces(root):
+    """
+    Classify restraint interfaces around each pier foundation.
 
-    return foundations_interfaces
+    Returns ``{"pier_i": (left, bottom, right)}`` where each item is an array
+    of interface keys.
+    """
+    geo = geometry(root)
+    keys, centroids = restraint_interface_centroids(root)
+
+    piers = geo["Piers"]
+    x0 = np.array([p["Origin"][0] for p in piers], dtype=float)[:, None]
+    width = np.array([p["B1f"] + p["b2"] + p["B3f"] for p in piers], dtype=float)[:, None]
+    z0 = np.array([-(p["H"] + p["Hf"]) for p in piers], dtype=float)[:, None]
+
+    # (n_piers, n_interfaces) masks
+    x, z = centroids[:, 0][None, :], centroids[:, 2][None, :]
+    inside = (x0 - width * 0.55 < x) & (x < x0 + width * 0.55)
+    bottom = inside & (np.abs(z - z0) < 1)
+    left = inside & ~bottom & (x < x0)
+    right = inside & ~bottom & (x > x0)
+
+    return {
+        f"pier_{i+1}": (keys[left[i]], keys[bottom[i]], keys[right[i]])
+        for i in range(len(piers))
+    }
 
 def nodes(root):
     records = []
@@ -224,32 +243,18 @@ def nodes(root):
         records.append(node_info)
     return records
 
-def _get_closest_node(nodes, x, y, z):
-    closest_node = None
-    min_distance = float('inf')
-
-    for node in nodes:
-        dx = node['X'] - x
-        dy = node['Y'] - y
-        dz = node['Z'] - z
-        distance = math.sqrt(dx*dx + dy*dy + dz*dz)
-
-        if distance < min_distance:
-            min_distance = distance
-            closest_node = node
-
-    return closest_node
-
-def model_points_location_map(root):
-    node_list = nodes(root)
+def model_points_location_map(root, monitoring_points=None):
+    """
+    Map location names to the closest node. ``monitoring_points`` adds
+    user-defined ``{name: (x, y, z)}`` locations to the default pier tops
+    and arch midspans.
+    """
     geometry_data = geometry(root)
-    location_map = {}
+    targets = {}
 
     for i, pier in enumerate(geometry_data['Piers']):
         x = pier['Origin'][0]
-        node = _get_closest_node(node_list, x, 0, 0)
-        location_name = f"Pier_{i+1}_top"
-        location_map[location_name] = {key: node[key] for key in ["Key", "X", "Y", "Z"]}
+        targets[f"Pier_{i+1}_top"] = (x, 0, 0)
 
     for i, arch in enumerate(geometry_data['Spans']):
         if i == 0:
@@ -260,11 +265,20 @@ def model_points_location_map(root):
             x_pier = geometry_data['Piers'][i-1]['Origin'][0]
             x_pier += geometry_data['Piers'][i-1]['b2'] / 2 
             x_arch = x_pier + arch['L'] / 2
-        
-        node = _get_closest_node(node_list, x_arch, 0, arch['f'])
-        location_name = f"Arch_{i}_middle"
-        location_map[location_name] = {key: node[key] for key in ["Key", "X", "Y", "Z"]}
-    
+        targets[f"Arch_{i}_middle"] = (x_arch, 0, arch['f'])
+
+    if monitoring_points:
+        targets.update(monitoring_points)
+
+    if not targets:
+        return {}
+
+    locator = model_index(root).node_locator()
+    keys, coords, _ = locator.nearest(list(targets.values()))
+
+    location_map = {}
+    for name, key, (x, y, z) in zip(targets, keys, coords):
+        location_map[name] = {"Key": key, "X": float(x), "Y": float(y), "Z": float(z)}
     return location_map
 
 def nodec(root):
@@ -0,0 +1,82 @@
+import logging
+
+from .xmlio import read_xml, save_xml
+
+logger = logging.getLogger(__name__)
+
+
+class ModelSession:
+    """
+    Keep one parsed model in memory and apply mutators to it.
+
+    The file is parsed on first access to ``root`` and written back only on
+    ``flush``. After an external program rewrites the file (e.g. the solver),
+    call ``invalidate`` so the next access re-reads it.
+
+        with ModelSession(xml_file, source=input_path) as model:
+            model.apply(update_materials, materials)
+            model.apply(set_all_analysis_to_not_run)
+            model.flush()
+    """
+
+    def __init__(self, path, source=None):
+        self.path = str(path)
+        self.source = str(source) if source else self.path
+        self._root = None
+        self._dirty = False
+
+    @property
+    def root(self):
+        if self._root is None:
+            logger.debug("Parsing model %s", self.source)
+            self._root = read_xml(self.source)
+            # A copy from another file must be written even without mutations
+            self._dirty = self.source != self.path
+        return self._root
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def apply(self, mutator, *args, **kwargs):
+        """Run ``mutator(root, *args, **kwargs)`` in memory."""
+        mutator(self.root, *args, **kwargs)
+        self._dirty = True
+        return self
+
+    def flush(self):
+        """Write the in-memory model to ``path`` if it has pending changes."""
+        if self._root is None or not self._dirty:
+            return False
+        logger.debug("Writing model %s", self.path)
+        save_xml(self._root, self.path)
+        self.source = self.path
+        self._dirty = False
+        return True
+
+    def run(self, program, *args, **kwargs):
+        """
+        Flush, run ``program(path, *args, **kwargs)`` on the file, then drop
+        the in-memory tree since the program may have rewritten the file.
+        """
+        self.flush()
+        try:
+            return program(self.path, *args, **kwargs)
+        finally:
+            self.invalidate()
+
+    def invalidate(self):
+        """Drop the parsed tree; the next access re-reads ``path`` from disk."""
+        if self._dirty:
+            logger.warning("Discarding unsaved changes to %s", self.path)
+        self._root = None
+        self._dirty = False
+        self.source = self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
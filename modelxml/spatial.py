@@ -0,0 +1,71 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Relative distance difference below which two nodes are equally close
+TIE_RTOL = 1e-12
+
+
+def parse_points(points) -> np.ndarray:
+    """Parse ``"x;y;z"`` strings into an (n, 3) float array in one call."""
+    if not points:
+        return np.empty((0, 3))
+    return np.array(";".join(points).split(";"), dtype=float).reshape(-1, 3)
+
+
+class NodeLocator:
+    """
+    Nearest-node queries over the ``Point`` coordinates of a model.
+
+    Built once per model; every query accepts a batch of points so all
+    monitoring locations are resolved in one vectorized call.
+    """
+
+    def __init__(self, keys, coords):
+        self.keys = np.asarray(keys, dtype=object)
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+        if len(self.keys) != len(self.coords):
+            raise ValueError("keys and coords must have the same length")
+        if len(self.keys) == 0:
+            raise ValueError("Cannot build a NodeLocator without nodes")
+        self._tree = cKDTree(self.coords)
+
+    @classmethod
+    def from_elements(cls, elements):
+        keys, points = [], []
+        for elem in elements:
+            point = elem.get("Point")
+            if point:
+                keys.append(elem.get("Key"))
+                points.append(point)
+        return cls(keys, parse_points(points))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def nearest(self, points):
+        """
+        Return ``(keys, coords, distances)`` of the closest node to each of
+        the (m, 3) query points. Of equidistant nodes the first in document
+        order is returned, as the linear scan this replaces did.
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        if len(self) == 1:
+            distances, idx = self._tree.query(points, k=1)
+            return self.keys[idx], self.coords[idx], distances
+        distances, idx = self._tree.query(points, k=2)
+        distances, second, idx = distances[:, 0], distances[:, 1], idx[:, 0].copy()
+        # cKDTree orders ties arbitrarily; a tie may also involve more than two nodes
+        for i in np.flatnonzero(np.isclose(second, distances, rtol=TIE_RTOL, atol=0)):
+            radius = distances[i] * (1 + TIE_RTOL)
+            candidates = self._tree.query_ball_point(points[i], radius)
+            idx[i] = min(candidates)
+        return self.keys[idx], self.coords[idx], distances
+
+    def k_nearest(self, points, k):
+        """Same as ``nearest`` with (m, k) shaped results."""
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        k = min(int(k), len(self))
+        distances, idx = self._tree.query(points, k=k)
+        distances = distances.reshape(len(points), k)
+        idx = idx.reshape(len(points), k)
+        return self.keys[idx], self.coords[idx], distances
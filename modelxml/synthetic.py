@@ -0,0 +1,190 @@
+import math
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from .backend import EtreeBackend
+
+# Preset sizes for benchmarks; a real bridge model is around "medium"
+SIZES = {
+    "tiny":   dict(n_piers=1, n_nodes=500,     n_interfaces=200,    n_templates=6,  n_analyses=2),
+    "small":  dict(n_piers=2, n_nodes=5_000,   n_interfaces=2_000,  n_templates=8,  n_analyses=3),
+    "medium": dict(n_piers=3, n_nodes=40_000,  n_interfaces=15_000, n_templates=12, n_analyses=4),
+    "large":  dict(n_piers=5, n_nodes=200_000, n_interfaces=80_000, n_templates=20, n_analyses=6),
+}
+
+# Materials the scenarios and scour mutations refer to by name
+BASE_TEMPLATES = ("Masonry", "Foundation", "Damaged", "Foundation_Soil", "Backfill")
+BASE_ANALYSES = ("Vert", "NewAnalysis")
+
+# Pier, foundation and span dimensions [cm]
+SPAN_L = 800.0
+SPAN_F = 300.0
+PIER_H = 500.0
+PIER_B2 = 100.0
+FOUNDATION_HF = 100.0
+FOUNDATION_B = 50.0
+
+
+def _fmt(value):
+    return f"{value:g}"
+
+def _point(x, y, z):
+    return f"{_fmt(x)};{_fmt(y)};{_fmt(z)}"
+
+def _sub(parent, tag, **attrib):
+    return ET.SubElement(parent, tag, {k: str(v) for k, v in attrib.items()})
+
+
+def _bridge_definition(root, n_piers):
+    bridge = _sub(root, "BridgeDefinition", Width=500, Slope=0, InclinationAngle=0, Zlevel=0,
+                  ThicknessBallast=30, ThicknessRiempimento=50)
+    length = SPAN_L * (n_piers + 1) + PIER_B2 * n_piers
+
+    abutments = _sub(bridge, "Abutments")
+    for x in (0.0, length):
+        ab = _sub(abutments, "Abutment", AbutmentKind="Standard", b2=200, w2=500, Kz=0, Hsp1=50, Hsp2=50)
+        _sub(ab, "ReferenceSystem", Origin=_point(x, 0, 0))
+
+    piers, pier_x = _sub(bridge, "Piers"), []
+    for i in range(n_piers):
+        x = (i + 1) * SPAN_L + i * PIER_B2 + PIER_B2 / 2
+        pier_x.append(x)
+        pier = _sub(piers, "Pier", H=_fmt(PIER_H), b2=_fmt(PIER_B2), w2=500, Hsp1=50, Hsp2=50,
+                    Hf=_fmt(FOUNDATION_HF), B1f=_fmt(FOUNDATION_B), B3f=_fmt(FOUNDATION_B),
+                    W1f=50, W3f=50, Kz=0)
+        _sub(pier, "ReferenceSystem", Origin=_point(x, 0, 0))
+
+    spans = _sub(bridge, "Spans")
+    for _ in range(n_piers + 1):
+        _sub(spans, "Span", L=_fmt(SPAN_L), W=500, f=_fmt(SPAN_F), Tb=50, Tt=60)
+
+    elevations = _sub(bridge, "Elevations")
+    for x in [0.0] + pier_x + [length]:
+        _sub(elevations, "Elevation", X=_fmt(x), H1=_fmt(SPAN_F + 100), H2=0, H3=0)
+    return length, pier_x
+
+
+def _nodes_and_quads(root, length, n_nodes, n_quads):
+    """Regular x-z grid of about ``n_nodes`` nodes from the foundations to the deck."""
+    z_min = -(PIER_H + FOUNDATION_HF + 100)
+    z_max = SPAN_F + 100
+    # Aspect-preserving grid
+    nz = max(int(round(math.sqrt(n_nodes * (z_max - z_min) / length))), 2)
+    nx = max(n_nodes // nz, 2)
+    xs = np.linspace(0.0, length, nx)
+    zs = np.linspace(z_min, z_max, nz)
+
+    nodes = _sub(root, "Nodes")
+    for i, x in enumerate(xs):
+        for j, z in enumerate(zs):
+            key = i * nz + j + 1
+            _sub(nodes, "Node", Key=key, Name=key, Point=_point(round(x, 3), 0, round(z, 3)),
+                 IsModelPoint="False", LayerKey=1, IsPropertyModified="False")
+
+    quads = _sub(root, "Quads")
+    n_quads = (nx - 1) * (nz - 1) if n_quads is None else min(n_quads, (nx - 1) * (nz - 1))
+    for q in range(n_quads):
+        i, j = divmod(q, nz - 1)
+        n1 = i * nz + j + 1
+        _sub(quads, "Quad", Key=q + 1, Name=q + 1, MaterialKey=1, LayerKey=1, G=0,
+             NodeKey1=n1, NodeKey2=n1 + nz, NodeKey3=n1 + nz + 1, NodeKey4=n1 + 1)
+    return nx * nz
+
+
+def _interfaces(root, pier_x, length, n_interfaces, n_nodes, rng):
+    """
+    Restraint interfaces along each foundation (bottom and sides, as read by
+    ``selectors.foundation_interfaces``), the rest between quads.
+    """
+    elems = _sub(root, "Interfaces")
+    width = FOUNDATION_B * 2 + PIER_B2
+    z0 = -(PIER_H + FOUNDATION_HF)
+    per_pier = max(n_interfaces // (3 * max(len(pier_x), 1)), 3) if pier_x else 0
+
+    centroids = []
+    for x0 in pier_x:
+        n_bottom = max(per_pier // 3, 1)
+        n_side = max((per_pier - n_bottom) // 2, 1)
+        centroids += [(x, z0) for x in np.linspace(x0 - width / 2, x0 + width / 2, n_bottom)]
+        for side in (-1, 1):
+            centroids += [(x0 + side * width / 2, z) for z in np.linspace(z0 + 5, z0 + FOUNDATION_HF, n_side)]
+
+    for key, (x, z) in enumerate(centroids[:n_interfaces], 1):
+        _sub(elems, "Interface", Key=key, Name=key, NodeKey1=rng.integers(1, n_nodes + 1), NodeKey2="",
+             MaterialKey=2, ParentElementKey1=1, ParentElementKey2="", ParentTypeElement1="Restraint",
+             ParentTypeElement2="Quad", Nspring=4, Face1=1, Face2=3, IsPropertyModified="False",
+             VInt3D1=_point(round(x, 3), 0, round(z, 3)))
+
+    for key in range(len(centroids) + 1, n_interfaces + 1):
+        x, z = rng.uniform(0, length), rng.uniform(z0 + FOUNDATION_HF, SPAN_F)
+        _sub(elems, "Interface", Key=key, Name=key, NodeKey1=rng.integers(1, n_nodes + 1),
+             NodeKey2=rng.integers(1, n_nodes + 1), MaterialKey=1, ParentElementKey1=key,
+             ParentElementKey2=key + 1, ParentTypeElement1="Quad", ParentTypeElement2="Quad",
+             Nspring=4, Face1=2, Face2=4, IsPropertyModified="False",
+             VInt3D1=_point(round(x, 3), 0, round(z, 3)))
+
+
+def _restraints(root, pier_x):
+    elems = _sub(root, "Restraints")
+    for key, x in enumerate(pier_x, 1):
+        _sub(elems, "Restraint", Key=key, Name=f"Foundation {key}", ParentTypeElement="Pier", Type="Fixed",
+             NodeKey1="", NodeKey2="", U1mechBehaviourType="Elastic", U2mechBehaviourType="Elastic",
+             U3mechBehaviourType="Elastic", K1=1e6, K2=1e6, K3=1e6, G=0,
+             Point1=_point(x - 100, 0, -(PIER_H + FOUNDATION_HF)),
+             Point2=_point(x + 100, 0, -(PIER_H + FOUNDATION_HF)))
+
+
+def _templates(root, n_templates, rng):
+    elems = _sub(root, "Templates")
+    names = list(BASE_TEMPLATES[:n_templates])
+    names += [f"Material_{i}" for i in range(len(names) + 1, n_templates + 1)]
+    for key, name in enumerate(names, 1):
+        _sub(elems, "Template", Key=key, Name=name, TypeOf="MasonryMaterial", PurposeType="MasonryMaterial",
+             w=_fmt(round(rng.uniform(15, 25) / 1e6, 9)), Ehor=_fmt(round(rng.uniform(100, 3000), 3)),
+             FtmHor=_fmt(round(rng.uniform(0.005, 0.02), 6)), Gt=0.01,
+             FmHor=_fmt(round(rng.uniform(0.2, 1.0), 4)), Gc=1, Gd=0.5, fvk0d=0.01,
+             FrictionRatioShear=0.4, ShearMaxTensileRatio=1, ShearPlasticStrain=0,
+             DuctilityShear=1, Bcacovic=0, CohesionSlidingHor=0.01, FrictionRatioSlidingHor=0.4)
+
+
+def _analyses(root, n_analyses):
+    names = list(BASE_ANALYSES[:n_analyses])
+    names += [f"Analysis_{i}" for i in range(len(names) + 1, n_analyses + 1)]
+    for key, name in enumerate(names, 1):
+        # Analyses are direct children of the root, as in the solver files
+        analysis = _sub(root, "Analysis", Key=key, Name=name, Mult=1)
+        states = _sub(analysis, "States")
+        _sub(states, "State", Key=key, State="NotExecutedNotToBeExecuted", Fo="100", Exit="Collapse",
+             ExitDescription="Collapse mechanism reached: displ = 1.2000 cm, F = 95.000 kN, "
+                             "Load multiplier F/Fo = 95.00 %, Fmax = 100.000 kN")
+
+
+def synthetic_model(n_piers=2, n_nodes=5_000, n_quads=None, n_interfaces=2_000, n_templates=8,
+                    n_analyses=3, seed=0):
+    """
+    Build a synthetic bridge model with the elements the package reads:
+    BridgeDefinition (Abutment, Pier/ReferenceSystem, Span, Elevations),
+    Node, Quad, Interface (restraint interfaces around every foundation),
+    Restraint, Template and Analysis/States/State.
+
+    ``n_quads`` defaults to one quad per grid cell. The node count is
+    rounded to a full grid. Returns an ``xml.etree.ElementTree`` root.
+    """
+    rng = np.random.default_rng(seed)
+    root = ET.Element("Model", {"Version": "synthetic"})
+    length, pier_x = _bridge_definition(root, n_piers)
+    n_nodes = _nodes_and_quads(root, length, n_nodes, n_quads)
+    _interfaces(root, pier_x, length, n_interfaces, n_nodes, rng)
+    _restraints(root, pier_x)
+    _templates(root, n_templates, rng)
+    _analyses(root, n_analyses)
+    return root
+
+
+def write_synthetic_model(path, size=None, **kwargs):
+    """Write a synthetic model (a preset from SIZES and/or explicit counts) to ``path``."""
+    params = dict(SIZES[size]) if size is not None else {}
+    params.update(kwargs)
+    EtreeBackend().write(synthetic_model(**params), path)
+    return path
@@ -0,0 +1,120 @@
+import json
+import time
+import threading
+import contextvars
+from functools import wraps
+from contextlib import contextmanager
+
+# Attributes attached to every span opened in the current context
+# (e.g. scenario index, analysis name), and the stack of open spans.
+_attributes = contextvars.ContextVar("timing_attributes", default={})
+_stack = contextvars.ContextVar("timing_stack", default=())
+
+_recorder = None
+
+
+class SpanRecorder:
+    """Append finished spans to a JSON-lines file, one object per line."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+
+    def write(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def start_recording(path):
+    """Record spans from every thread to ``path`` until ``stop_recording``."""
+    global _recorder
+    stop_recording()
+    _recorder = SpanRecorder(path)
+    return _recorder
+
+def stop_recording():
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close()
+
+@contextmanager
+def recording(path):
+    start_recording(path)
+    try:
+        yield path
+    finally:
+        stop_recording()
+
+def is_recording():
+    return _recorder is not None
+
+
+@contextmanager
+def span_context(**attributes):
+    """Attach ``attributes`` to all spans opened inside the block (in this thread)."""
+    token = _attributes.set({**_attributes.get(), **attributes})
+    try:
+        yield
+    finally:
+        _attributes.reset(token)
+
+@contextmanager
+def span(stage, **attributes):
+    """
+    Time the block as ``stage``. Nothing is measured unless a recording is
+    active. The record has start/end wall-clock times, the duration, the
+    enclosing span, the thread, the context attributes and ``attributes``.
+    """
+    if _recorder is None:
+        yield
+        return
+
+    stack = _stack.get()
+    token = _stack.set(stack + (stage,))
+    start, t0 = time.time(), time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - t0
+        _stack.reset(token)
+        recorder = _recorder
+        if recorder is not None:
+            recorder.write({
+                "stage": stage,
+                "start": start,
+                "end": start + duration,
+                "duration": duration,
+                "parent": stack[-1] if stack else None,
+                "depth": len(stack),
+                "thread": threading.current_thread().name,
+                "status": status,
+                **_attributes.get(),
+                **attributes,
+            })
+
+def timed(stage):
+    """Decorator form of ``span``."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def load_spans(path):
+    """Spans of a recording as a list of dicts."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -1,14 +1,70 @@
 import xml.etree.ElementTree as ET
 
+from .backend import get_backend
+from .timing import timed
+
+CHUNK_SIZE = 1 << 20
+
+@timed("xml.read")
 def read_xml(file_path):
+    return get_backend().parse(file_path)
+
+class _SubtreeBuilder:
+    """Parser target that only materializes subtrees rooted at ``tags``."""
+
+    def __init__(self, tags):
+        self.match = tags if callable(tags) else set(tags).__contains__
+        self.root = None
+        self._builder = None
+        self._depth = 0
+
+    def start(self, tag, attrib):
+        if self._depth:
+            self._depth += 1
+            self._builder.start(tag, attrib)
+        elif self.root is None:
+            self.root = ET.Element(tag, attrib)
+        elif self.match(tag):
+            self._builder = ET.TreeBuilder()
+            self._builder.start(tag, attrib)
+            self._depth = 1
+
+    def end(self, tag):
+        if not self._depth:
+            return
+        self._builder.end(tag)
+        self._depth -= 1
+        if not self._depth:
+            self.root.append(self._builder.close())
+            self._builder = None
+
+    def data(self, data):
+        if self._depth:
+            self._builder.data(data)
+
+    def close(self):
+        return self.root
+
+@timed("xml.read_tags")
+def read_xml_tags(file_path, tags):
+    """
+    Stream the model and keep only the elements named in ``tags`` (with their
+    subtrees) under a copy of the root element; everything else is dropped
+    while parsing. ``tags`` may also be a predicate on the tag name.
+    Read-only selectors work unchanged on the result.
+    """
+    parser = ET.XMLParser(target=_SubtreeBuilder(tags))
     with open(file_path, "r", encoding="utf-16", errors="ignore") as f:
-        return ET.fromstring(f.read())
+        while chunk := f.read(CHUNK_SIZE):
+            parser.feed(chunk)
+    return parser.close()
 
+@timed("xml.write")
 def save_xml(root, path):
-    ET.ElementTree(root).write(path, encoding="utf-16", xml_declaration=True)
+    get_backend().write(root, path)
 
 def mutate_file(in_path, mutator=None, out_path=None):
     root = read_xml(in_path)
     if mutator:
         mutator(root)  # mutate in place
-    save_xml(root, out_path or in_path)
\ No newline at end of file
+    save_xml(root, out_path or in_path)
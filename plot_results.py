@@ -1,56 +1,132 @@
+import numpy as np
 import pandas as pd
 
 
-def flat_data(data):
-    rows = []
-    
+def _coerce_numeric(values):
+    """float where convertible, original value otherwise (like float() with a fallback)."""
+    col = pd.Series(values, dtype=object)
+    num = pd.to_numeric(col, errors="coerce")
+    failed = num.isna() & col.notna()
+    if not failed.any():
+        return num.astype(float)
+    return num.astype(object).where(~failed, col)
+
+def _material_columns(scenarios, positions, wanted):
+    """Wide frame of '<Material>_<Property>' values, one row per scenario position."""
+    cells = {}
+    for pos, s in enumerate(scenarios):
+        for material in s.get("Materials", []):
+            mat_name = material.get("Name", "Unknown")
+            for prop_name, prop_value in material.items():
+                if prop_name == "Name":
+                    continue
+                # Create column names like "Damaged_Ehor" or "Arches_w"
+                key = f"{mat_name}_{prop_name}"
+                if wanted is not None and key not in wanted:
+                    continue
+                cells.setdefault(key, {})[pos] = prop_value
+
+    n = len(scenarios)
+    data = {}
+    for key, by_pos in cells.items():
+        column = np.full(n, None, dtype=object)
+        column[list(by_pos)] = list(by_pos.values())
+        data[key] = _coerce_numeric(column[positions]).to_numpy()
+    return pd.DataFrame(data, index=pd.RangeIndex(len(positions)))
+
+def _last_reaction(reactions):
+    if isinstance(reactions, list):
+        return reactions[-1] if reactions else None
+    return reactions or None
+
+def flat_data(data, columns=None):
+    """
+    One row per (scenario, analysis) with material parameters, Fmax/Exit,
+    model point displacements (``Ux_/Uy_/Uz_<IdElement>``) and R1..R3.
+
+    ``columns`` restricts the result to those columns (in that order).
+    """
+    wanted = set(columns) if columns is not None else None
+
+    # --- Gather row metadata and long-format records in one pass ---
+    source_index, analyses, fmax, exits, scenario_pos = [], [], [], [], []
+    disp_row, disp_id, disp_ux, disp_uy, disp_uz = [], [], [], [], []
+    react_row, r1, r2, r3 = [], [], [], []
+    scenarios = []
+
     for idx, s in enumerate(data):
         if "Output" not in s or not s["Output"]:
             continue
+        pos = len(scenarios)
+        scenarios.append(s)
 
         for analysis, output_data in s["Output"].items():
             displacements = output_data.get("Displacements", [])
-
-            row = {
-                "_source_index": idx,
-                "Analysis": analysis,
-                "Fmax": output_data.get("Fmax", 0),
-                "Exit": output_data.get("Exit", ""),
-            }
-
-            # Dynamically extract all materials and their properties
-            for material in s.get("Materials", []):
-                mat_name = material.get("Name", "Unknown")
-                for prop_name, prop_value in material.items():
-                    if prop_name == "Name":
-                        continue
-                    # Create column names like "Damaged_Ehor" or "Arches_w"
-                    key = f"{mat_name}_{prop_name}"
-                    try:
-                        row[key] = float(prop_value)
-                    except (ValueError, TypeError):
-                        row[key] = prop_value  # keep non-numeric values as-is
-            
             if not displacements:
                 continue
 
+            row = len(source_index)
+            source_index.append(idx)
+            analyses.append(analysis)
+            fmax.append(output_data.get("Fmax", 0))
+            exits.append(output_data.get("Exit", ""))
+            scenario_pos.append(pos)
+
             for disp in displacements:
-                try:
-                    id_elem = disp.get("IdElement")
-                    row[f"Ux_{id_elem}"] = float(disp.get("Ux", 0))
-                    row[f"Uy_{id_elem}"] = float(disp.get("Uy", 0))
-                    row[f"Uz_{id_elem}"] = float(disp.get("Uz", 0))
-                except (TypeError, ValueError):
-                    continue
-            
-            try:
-                row['R1'] = output_data['Reactions']['R1']
-                row['R2'] = output_data['Reactions']['R2']
-                row['R3'] = output_data['Reactions']['R3']
-            except:
-                pass
-
-            
-            rows.append(row)
-    
-    return pd.DataFrame(rows)
\ No newline at end of file
+                disp_row.append(row)
+                disp_id.append(disp.get("IdElement"))
+                disp_ux.append(disp.get("Ux", 0))
+                disp_uy.append(disp.get("Uy", 0))
+                disp_uz.append(disp.get("Uz", 0))
+
+            reaction = _last_reaction(output_data.get("Reactions"))
+            if isinstance(reaction, dict):
+                react_row.append(row)
+                r1.append(reaction.get("R1"))
+                r2.append(reaction.get("R2"))
+                r3.append(reaction.get("R3"))
+
+    n_rows = len(source_index)
+    index = pd.RangeIndex(n_rows)
+    frames = [pd.DataFrame({
+        "_source_index": np.asarray(source_index, dtype=int),
+        "Analysis": analyses,
+        "Fmax": fmax,
+        "Exit": exits,
+    }, index=index)]
+
+    frames.append(_material_columns(scenarios, np.asarray(scenario_pos, dtype=int), wanted))
+
+    # --- Pivot displacements by IdElement in one operation ---
+    if disp_row:
+        long = pd.DataFrame({
+            "row": disp_row,
+            "id": pd.Index(disp_id, dtype=object).astype(str),
+            "Ux": pd.to_numeric(pd.Series(disp_ux, dtype=object), errors="coerce"),
+            "Uy": pd.to_numeric(pd.Series(disp_uy, dtype=object), errors="coerce"),
+            "Uz": pd.to_numeric(pd.Series(disp_uz, dtype=object), errors="coerce"),
+        })
+        ids = long["id"].unique()
+        labels = [f"{c}_{i}" for i in ids for c in ("Ux", "Uy", "Uz")]
+        if wanted is not None:
+            labels = [label for label in labels if label in wanted]
+            ids = [i for i in ids if any(f"{c}_{i}" in wanted for c in ("Ux", "Uy", "Uz"))]
+            long = long[long["id"].isin(ids)]
+        # Later records for the same element overwrite earlier ones
+        long = long.drop_duplicates(["row", "id"], keep="last")
+        wide = long.pivot(index="row", columns="id", values=["Ux", "Uy", "Uz"])
+        wide.columns = [f"{c}_{i}" for c, i in wide.columns]
+        frames.append(wide.reindex(index=index, columns=labels))
+
+    if react_row:
+        reactions = pd.DataFrame({
+            "R1": pd.to_numeric(pd.Series(r1, dtype=object), errors="coerce").to_numpy(),
+            "R2": pd.to_numeric(pd.Series(r2, dtype=object), errors="coerce").to_numpy(),
+            "R3": pd.to_numeric(pd.Series(r3, dtype=object), errors="coerce").to_numpy(),
+        }, index=pd.Index(react_row))
+        frames.append(reactions.reindex(index))
+
+    df = pd.concat(frames, axis=1)
+    if columns is not None:
+        df = df.reindex(columns=list(columns))
+    return df
@@ -1,16 +1,19 @@
 import logging
-
-from modelxml.ops import (
-    run_copy_paste,
-    run_set_model_points,
-    run_update_material, 
-    run_set_all_analyses_off, 
-    run_set_analysis_on, 
-    run_create_start_mesh_analysis, 
-    run_update_foundation_ifaces
+from contextlib import contextmanager
+
+from modelxml.ops import run_set_model_points
+from modelxml.session import ModelSession
+from modelxml.timing import span, span_context, timed
+from modelxml.mutations import (
+    set_all_analysis_to_not_run,
+    set_analysis_to_run,
+    create_start_mesh_analysis,
+    update_materials,
+    update_foundation_interfaces,
 )
 
-from save import save_scenario_info, save_outputs
+from mesh_cache import default_mesh_cache
+from save import save_scenario_info, save_all_outputs
 
 from run_program import run_program
 
@@ -29,64 +32,122 @@ logger = logging.getLogger(__name__)
 # Functions
 # -------------------------------------------------------------------
 
-def generate_mesh(file, mode="local", timeout_seconds=200, **kwargs):
+@contextmanager
+def solver_slot(slot):
+    """Hold ``slot`` (a semaphore-like solver slot) for a solver run; no-op for None."""
+    if slot is None:
+        yield
+        return
+    with span("solver_slot_wait"):
+        slot.acquire()
+    try:
+        yield
+    finally:
+        slot.release()
+
+@timed("generate_mesh")
+def generate_mesh(model, mode="local", timeout_seconds=200, solver_slots=None, **kwargs):
+    """
+    Add StartMesh to ``model`` and run it. ``solver_slots`` bounds the
+    concurrent solver runs (the scheduler passes its own), so a mesh run
+    counts like any other.
+    """
+    if not isinstance(model, ModelSession):
+        model = ModelSession(model)
+    file = model.path
+
     logger.info("Creating mesh analysis for file: %s", file.split('\\')[-1])
     try:
-        run_create_start_mesh_analysis(file)
-        run_set_all_analyses_off(file)
-        run_set_analysis_on(file, "StartMesh")
+        model.apply(create_start_mesh_analysis)
+        model.apply(set_all_analysis_to_not_run)
+        model.apply(set_analysis_to_run, "StartMesh")
 
         logger.info("Running mesh analysis for file: %s", file.split('\\')[-1])
-        run_program(file, mode, timeout_seconds)
+        with solver_slot(solver_slots):
+            model.run(run_program, mode, timeout_seconds)
 
     except Exception as e:
         logger.exception("Error during mesh generation for %s: %s", file.split('\\')[-1], e)
         raise
     finally:
-        run_set_all_analyses_off(file)
+        model.apply(set_all_analysis_to_not_run)
+        model.flush()
         logger.info("Mesh generation complete for file: %s", file.split('\\')[-1])
 
-def prepare_model(file):
+def prepare_model(file, monitoring_points=None):
     logger.info("Preparing model for file: %s", file.split('\\')[-1])
     try:
-        run_set_model_points(file)
+        run_set_model_points(file, monitoring_points=monitoring_points)
     except Exception as e:
         logger.exception("Error while preparing model for %s: %s", file.split('\\')[-1], e)
         raise
     logger.info("Model preparation complete for file: %s", file.split('\\')[-1])
 
-def pre_processing(input_path, scenario, xml_file, **kwargs):
+@timed("pre_processing")
+def pre_processing(input_path, scenario, xml_file, mesh_cache=None, **kwargs):
+    """
+    Copy the input model, apply the scenario materials and mesh it.
+
+    By default every scenario is meshed. With ``mesh_cache`` (a
+    ``mesh_cache.MeshCache``, or True for a ``mesh_cache`` folder next to
+    the input model) StartMesh only runs once per geometry.
+    """
     index = xml_file.split("_")[-1].split(".")[0]
     logger.info("Starting pre-processing for scenario index: %s", index)
 
-    try:
-        logger.info("Copying input: %s → %s", input_path.split('\\')[-1], xml_file.split('\\')[-1])
-        run_copy_paste(input_path, out_path=xml_file)
-
-        logger.info("Updating materials for index %s", index)
-        run_update_material(xml_file, scenario.get("Materials", []))
-
-        generate_mesh(xml_file, **kwargs)
+    if mesh_cache is True:
+        mesh_cache = default_mesh_cache(input_path)
 
-        save_scenario_info(scenario, xml_file)
+    try:
+        if mesh_cache:
+            with span("mesh_cache"):
+                meshed_path = mesh_cache.meshed_model(input_path, generate_mesh, **kwargs)
+            logger.info("Copying meshed model: %s → %s", meshed_path.split('\\')[-1], xml_file.split('\\')[-1])
+            with span("copy"):
+                model = ModelSession(xml_file, source=meshed_path)
+                model.root  # parse here so the copy, not the material update, is charged for it
+                mesh_cache.copy_companions(meshed_path, xml_file)
+
+            logger.info("Updating materials for index %s", index)
+            with span("update_materials"):
+                model.apply(update_materials, scenario.get("Materials", []))
+                model.flush()
+        else:
+            logger.info("Copying input: %s → %s", input_path.split('\\')[-1], xml_file.split('\\')[-1])
+            model = ModelSession(xml_file, source=input_path)
+
+            logger.info("Updating materials for index %s", index)
+            with span("update_materials"):
+                model.apply(update_materials, scenario.get("Materials", []))
+
+            generate_mesh(model, **kwargs)
+
+        with span("save_scenario_info"):
+            save_scenario_info(scenario, xml_file, root=model.root)
         logger.info("Pre-processing finished for index %s", index)
 
     except Exception as e:
         logger.exception("Pre-processing failed for %s: %s", xml_file, e)
         raise
 
+@timed("processing")
 def processing(xml_file, scenario, mode="local", timeout=360, **kwargs):
     index = xml_file.split("_")[-1].split(".")[0]
     logger.info("Starting processing for index: %s", index)
 
+    model = ModelSession(xml_file)
     for analysis_name, interfaces in scenario["Analysis"].items():
         try:
-            logger.info("Updating foundation interfaces for index %s", index)
-            run_update_foundation_ifaces(xml_file, interfaces)
-            
-            logger.info("Running analysis '%s' for index %s", analysis_name, index)
-            run_set_analysis_on(xml_file, analysis_name)
-            run_program(xml_file, mode, timeout)
+            with span_context(analysis=analysis_name):
+                logger.info("Updating foundation interfaces for index %s", index)
+                with span("update_foundation_interfaces"):
+                    model.apply(update_foundation_interfaces, interfaces)
+
+                logger.info("Running analysis '%s' for index %s", analysis_name, index)
+                model.apply(set_analysis_to_run, analysis_name)
+                result = model.run(run_program, mode, timeout)
+                # Per-run resource peaks, kept for capacity planning
+                scenario.setdefault("Resources", {})[analysis_name] = getattr(result, "usage", {})
         
         except Exception as e:
             logger.exception("Processing failed for %s - %s: %s", index, analysis_name, e)
@@ -94,15 +155,16 @@ def processing(xml_file, scenario, mode="local", timeout=360, **kwargs):
 
     logger.info("Processing complete for index: %s", index)
 
+@timed("pos_processing")
 def pos_processing(scenario, db_path, xml_file, **kwargs):
     logger.info("Starting post-processing for file: %s", xml_file.split('\\')[-1])
 
-    for analysis_name, interfaces in scenario["Analysis"].items():
-        try:
-            logger.info("Saving outputs for analysis '%s'", analysis_name)
-            save_outputs(scenario, analysis_name, db_path, xml_file, **kwargs)
-        except Exception as e:
-            logger.exception("Post-processing failed for %s - %s: %s", xml_file, analysis_name, e)
-            raise
+    analyses = list(scenario["Analysis"])
+    try:
+        logger.info("Saving outputs for analyses %s", analyses)
+        save_all_outputs(scenario, db_path, xml_file, analyses, **kwargs)
+    except Exception as e:
+        logger.exception("Post-processing failed for %s - %s: %s", xml_file, analyses, e)
+        raise
 
     logger.info("Post-processing complete for file: %s", xml_file.split('\\')[-1])
\ No newline at end of file
@@ -0,0 +1,300 @@
+import os
+import time
+import signal
+import logging
+import threading
+import subprocess
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:  # optional dependency
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 ** 2
+
+
+class ProcessMonitor:
+    """
+    Sample CPU and resident memory of a process and its children in a
+    background thread. Without psutil only the duration is measured.
+
+        with ProcessMonitor(proc.pid) as monitor:
+            proc.wait()
+        monitor.usage  # {"duration": ..., "peak_rss_mb": ..., ...}
+
+    With ``cmdline`` the monitored process is the one, other than ``pid``,
+    whose command line contains it: e.g. a solver started by the PsExec
+    service for the PsExec client ``pid``. It is looked up until it appears.
+    """
+
+    def __init__(self, pid, interval=0.5, cmdline=None):
+        self.pid = pid
+        self.interval = interval
+        self.cmdline = cmdline
+        self._root_pid = pid if cmdline is None else None
+        self.usage = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._procs = {}
+        self._peak_rss = 0
+        self._cpu_samples = []
+        self._cpu_time = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def start(self):
+        self._start = time.monotonic()
+        if psutil is not None:
+            self._thread = threading.Thread(target=self._loop, name=f"monitor-{self.pid}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.usage = {"duration": time.monotonic() - self._start}
+        if psutil is not None:
+            cpu = np.asarray(self._cpu_samples or [0.0])
+            self.usage.update({
+                "peak_rss_mb": self._peak_rss / MB,
+                "mean_cpu_percent": float(cpu.mean()),
+                "peak_cpu_percent": float(cpu.max()),
+                "cpu_time": sum(self._cpu_time.values()),
+            })
+        return self.usage
+
+    def _find_root(self):
+        found = [proc for proc in find_processes(self.cmdline) if proc.pid != self.pid]
+        if found:
+            self._root_pid = found[0].pid
+            self._procs[self._root_pid] = found[0]
+        return self._root_pid
+
+    def _processes(self):
+        if self._root_pid is None and self._find_root() is None:
+            return []
+        try:
+            root = self._procs.get(self._root_pid) or psutil.Process(self._root_pid)
+            found = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return list(self._procs.values())
+        # Reuse Process objects: cpu_percent() measures since the previous call
+        for proc in found:
+            self._procs.setdefault(proc.pid, proc)
+        return [self._procs[proc.pid] for proc in found]
+
+    def _sample(self):
+        rss = cpu = 0.0
+        for proc in self._processes():
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    cpu += proc.cpu_percent()
+                    times = proc.cpu_times()
+                    self._cpu_time[proc.pid] = times.user + times.system
+            except psutil.Error:
+                continue
+        self._peak_rss = max(self._peak_rss, rss)
+        self._cpu_samples.append(cpu)
+
+    def _loop(self):
+        while True:
+            self._sample()
+            if self._stop.wait(self.interval):
+                return
+
+
+def find_processes(cmdline_part):
+    """Processes whose command line contains ``cmdline_part`` (empty without psutil)."""
+    if psutil is None:
+        return []
+    found = []
+    for proc in psutil.process_iter(["cmdline"]):
+        try:
+            if any(cmdline_part in arg for arg in proc.info["cmdline"] or ()):
+                found.append(proc)
+        except psutil.Error:
+            continue
+    return found
+
+
+def kill_process_tree(pid, grace=3.0):
+    """
+    Terminate ``pid`` and all its descendants, killing whatever is still
+    alive after ``grace`` seconds. Returns the pids that were signalled.
+    Without psutil ``taskkill /PID <pid> /T`` is used on Windows, and the
+    process group is killed elsewhere (start the process with
+    ``start_new_session=True``).
+    """
+    if psutil is None:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"], capture_output=True)
+        else:
+            try:
+                os.killpg(os.getpgid(pid), signal.SIGKILL)
+            except OSError:
+                return []
+        return [pid]
+
+    try:
+        parent = psutil.Process(pid)
+        procs = parent.children(recursive=True) + [parent]
+    except psutil.NoSuchProcess:
+        return []
+    for proc in procs:
+        try:
+            proc.terminate()
+        except psutil.Error:
+            pass
+    _, alive = psutil.wait_procs(procs, timeout=grace)
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.Error:
+            pass
+    psutil.wait_procs(alive, timeout=grace)
+    return [proc.pid for proc in procs]
+
+
+class AdaptiveLimiter:
+    """
+    Semaphore whose limit follows the machine's load: every ``interval``
+    seconds the limit drops by one when system CPU or memory use is above
+    its budget (percent) and the current limit would not fit in it, and
+    rises by one when all slots are busy and there is room under both
+    budgets for another solver.
+
+    What a solver takes comes from finished runs (``observe``): the 90th
+    percentile of their peak RSS and the median of their mean CPU. Load not
+    caused by the running solvers is what remains, so a machine kept busy by
+    the solvers the limiter let in settles at the limit that fits the
+    budget instead of stepping down to ``min_workers``.
+
+    Without psutil the limit stays at ``start`` (``max_workers`` by default).
+    """
+
+    def __init__(self, max_workers=4, min_workers=1, start=None, cpu_budget=85.0, memory_budget=80.0,
+                 interval=5.0, headroom=10.0):
+        self.max_workers = max_workers
+        self.min_workers = min_workers
+        self.cpu_budget = cpu_budget
+        self.memory_budget = memory_budget
+        self.interval = interval
+        self.headroom = headroom
+        self.limit = max(min(start or max_workers, max_workers), min_workers)
+        self.active = 0
+        self.history = []
+        self._peaks = []
+        self._cpu = []
+        self._cond = threading.Condition()
+        self._closed = threading.Event()
+        self._thread = None
+        if psutil is None:
+            logger.warning("psutil is not installed; solver concurrency stays at %d", self.limit)
+        else:
+            psutil.cpu_percent()  # prime: the first call has no reference
+            self._thread = threading.Thread(target=self._loop, name="adaptive-limiter", daemon=True)
+            self._thread.start()
+
+    # Semaphore interface
+    def acquire(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+        return True
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def close(self):
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def observe(self, usage):
+        """Record the resource usage of a finished solver run."""
+        if not usage:
+            return
+        with self._cond:
+            if usage.get("peak_rss_mb"):
+                self._peaks.append(usage["peak_rss_mb"])
+            if usage.get("mean_cpu_percent"):
+                self._cpu.append(usage["mean_cpu_percent"])
+
+    def solver_memory_mb(self):
+        with self._cond:
+            return float(np.percentile(self._peaks, 90)) if self._peaks else None
+
+    def solver_cpu_percent(self):
+        """System CPU [%] of one solver (process CPU is per core)."""
+        with self._cond:
+            if not self._cpu:
+                return None
+            cores = (psutil.cpu_count() if psutil is not None else None) or 1
+            return float(np.median(self._cpu)) / cores
+
+    def _fit(self, load, budget, per_solver):
+        """Solvers that fit under ``budget`` next to the load that is not theirs (None if unknown)."""
+        if not per_solver:
+            return None
+        other = max(load - self.active * per_solver, 0.0)
+        return int((budget - other) // per_solver)
+
+    def _set_limit(self, limit, reason):
+        with self._cond:
+            if limit == self.limit:
+                return
+            logger.info("Solver concurrency %d -> %d (%s)", self.limit, limit, reason)
+            self.limit = limit
+            self._cond.notify_all()
+
+    def adjust(self, cpu, memory):
+        """One control step from system CPU and memory use [%]."""
+        total_mb = psutil.virtual_memory().total / MB if psutil is not None else None
+        solver_mb = self.solver_memory_mb()
+        solver_pct = 100.0 * solver_mb / total_mb if solver_mb and total_mb else 0.0
+        solver_cpu = self.solver_cpu_percent()
+
+        with self._cond:
+            self.history.append({"time": time.time(), "cpu": cpu, "memory": memory,
+                                 "limit": self.limit, "active": self.active})
+            if not solver_cpu and self.active:
+                # No finished run yet: the running solvers account for the load
+                solver_cpu = cpu / self.active
+
+            if cpu > self.cpu_budget or memory > self.memory_budget:
+                fits = [fit for fit in (self._fit(cpu, self.cpu_budget, solver_cpu),
+                                        self._fit(memory, self.memory_budget, solver_pct))
+                        if fit is not None]
+                fit = min(fits) if fits else self.limit - 1
+                if self.limit > max(fit, self.min_workers):
+                    self._set_limit(self.limit - 1,
+                                    f"cpu {cpu:.0f}%, memory {memory:.0f}% over budget; {fit} solvers fit")
+            elif (self.active >= self.limit
+                  and cpu < self.cpu_budget - self.headroom
+                  and memory + solver_pct < self.memory_budget):
+                self._set_limit(min(self.limit + 1, self.max_workers),
+                                f"cpu {cpu:.0f}%, memory {memory:.0f}% with {solver_pct:.0f}% per solver")
+
+    def _loop(self):
+        while not self._closed.wait(self.interval):
+            self.adjust(psutil.cpu_percent(), psutil.virtual_memory().percent)
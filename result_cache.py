@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections.abc import Mapping
+from contextlib import closing, contextmanager
+
+from json_utils import json_default
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    data        BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    last_used   REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used);
+"""
+
+# What a run adds to a scenario: pre-processing info, outputs and resource use
+RESULT_KEYS = ("Geometry", "Materials", "Model_Points", "Output", "Resources")
+
+_model_hashes = {}
+_model_hashes_guard = threading.Lock()
+
+
+def model_hash(path):
+    """SHA-256 of a model file, remembered while its size and mtime do not change."""
+    stat = os.stat(path)
+    memo = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _model_hashes_guard:
+        if memo in _model_hashes:
+            return _model_hashes[memo]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    with _model_hashes_guard:
+        _model_hashes[memo] = digest.hexdigest()
+    return _model_hashes[memo]
+
+
+def _canonical(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, Mapping):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    try:
+        return float(value)  # numpy scalars
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def scenario_input_key(model, scenario, solver="local"):
+    """
+    Content address of what reaches the solver for ``scenario``: the base
+    model hash, the material updates, the foundation interfaces of each
+    analysis and the solver backend. Must be taken before pre-processing,
+    which replaces ``Materials`` with the model's full material list.
+    """
+    materials = sorted((_canonical(m) for m in scenario.get("Materials", [])),
+                       key=lambda m: str(m.get("Name")))
+    analysis = scenario.get("Analysis", {})
+    if not isinstance(analysis, Mapping):
+        analysis = {name: None for name in analysis}
+    payload = {
+        "model": model,
+        "materials": materials,
+        "analysis": _canonical(analysis),
+        "solver": getattr(solver, "name", solver),
+    }
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed cache of scenario results in SQLite, so an identical
+    model (a re-run after a crash, an overlapping parameter set) is not
+    solved twice. Entries are compressed JSON of the ``RESULT_KEYS`` of a
+    finished scenario; the least recently used ones are evicted once the
+    cache exceeds ``max_bytes`` (compressed) or ``max_entries``.
+
+        cache = ResultCache("result_cache.db")
+        key = cache.key(input_path, scenario, mode)
+        if not cache.restore(key, scenario):
+            ...run the scenario...
+            cache.put(key, scenario)
+    """
+
+    def __init__(self, path, max_bytes=2 * 1024 ** 3, max_entries=None):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def key(self, input_path, scenario, solver="local"):
+        return scenario_input_key(model_hash(input_path), scenario, solver)
+
+    def get(self, key):
+        """Cached results for ``key`` (a dict of RESULT_KEYS), or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE entries SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def restore(self, key, scenario):
+        """Attach the cached results to ``scenario``; False on a miss."""
+        cached = self.get(key)
+        if cached is None:
+            return False
+        scenario.update(cached)
+        return True
+
+    def put(self, key, scenario):
+        """Store the results of a finished scenario (nothing without an ``Output``)."""
+        if not scenario.get("Output"):
+            return False
+        data = {k: scenario[k] for k in RESULT_KEYS if k in scenario}
+        blob = zlib.compress(json.dumps(data, default=json_default).encode("utf-8"))
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, data, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            self._evict(conn)
+        return True
+
+    def _evict(self, conn):
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        excess_entries = count - self.max_entries if self.max_entries is not None else 0
+        excess_bytes = total - self.max_bytes if self.max_bytes is not None else 0
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            victims.append((key,))
+            excess_entries -= 1
+            excess_bytes -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        logger.info("Result cache: evicted %d least recently used entries", len(victims))
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, size, hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM entries"
+            ).fetchone()
+        return {"entries": entries, "bytes": size, "hits": hits}
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+
+def default_result_cache(input_path):
+    """ResultCache in ``result_cache.db`` next to the input model."""
+    return ResultCache(os.path.join(os.path.dirname(os.path.abspath(input_path)), "result_cache.db"))
@@ -0,0 +1,311 @@
+import json
+import sqlite3
+import datetime
+from collections.abc import Mapping
+from contextlib import closing, contextmanager
+
+import numpy as np
+import pandas as pd
+
+from json_utils import json_default
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign    TEXT,
+    created_at  TEXT NOT NULL,
+    metadata    TEXT
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id),
+    name        TEXT NOT NULL,
+    material    TEXT NOT NULL,
+    property    TEXT NOT NULL,
+    value       REAL,
+    text        TEXT,
+    PRIMARY KEY (scenario_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outputs (
+    scenario_id      INTEGER NOT NULL REFERENCES scenarios(id),
+    analysis         TEXT NOT NULL,
+    State            TEXT,
+    Exit             TEXT,
+    ExitDescription  TEXT,
+    Fo               REAL,
+    displ            REAL,
+    F                REAL,
+    Load_multiplier  REAL,
+    Fmax             REAL,
+    PRIMARY KEY (scenario_id, analysis)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS displacements (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id),
+    analysis    TEXT NOT NULL,
+    IdElement   INTEGER,
+    ParentKey   INTEGER,
+    Step        INTEGER,
+    Ux          REAL,
+    Uy          REAL,
+    Uz          REAL
+);
+CREATE TABLE IF NOT EXISTS reactions (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios(id),
+    analysis    TEXT NOT NULL,
+    Step        INTEGER,
+    R1          REAL,
+    R2          REAL,
+    R3          REAL
+);
+CREATE INDEX IF NOT EXISTS idx_parameters_name ON parameters (name, scenario_id);
+CREATE INDEX IF NOT EXISTS idx_scenarios_campaign ON scenarios (campaign);
+CREATE INDEX IF NOT EXISTS idx_displacements_scenario ON displacements (scenario_id, analysis);
+CREATE INDEX IF NOT EXISTS idx_reactions_scenario ON reactions (scenario_id, analysis);
+"""
+
+OUTPUT_TEXT_FIELDS = ["State", "Exit", "ExitDescription"]
+OUTPUT_NUMERIC_FIELDS = ["Fo", "displ", "F", "Load_multiplier", "Fmax"]
+DISPLACEMENT_FIELDS = ["IdElement", "ParentKey", "Step", "Ux", "Uy", "Uz"]
+REACTION_FIELDS = ["Step", "R1", "R2", "R3"]
+
+# Scenario keys stored in their own tables; everything else goes to metadata
+_TABLE_KEYS = ("Materials", "Output")
+
+# Longer IN (...) filters go through a temporary table: SQLite caps the
+# number of bound parameters (999 before 3.32, 32766 since)
+MAX_IN_VALUES = 500
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _placeholders(values):
+    return ", ".join("?" for _ in values)
+
+
+class ResultsStore:
+    """
+    Append-only SQLite store of finished scenarios.
+
+    Each scenario gets one row in ``scenarios``; its per-analysis scalar
+    outputs, displacements and reactions go to typed tables, so analyses can
+    read just the columns and rows they need instead of re-parsing a JSON
+    file. Material parameters (``<Material>_<Property>``) are stored one row
+    per parameter, since every campaign varies a different set of them, and
+    the remaining keys (Geometry, Model_Points, ...) are kept as JSON
+    ``metadata``, which is only read back whole.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Short-lived connections keep the store usable from worker threads
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, scenarios, campaign=None):
+        """Append finished scenarios in a single transaction; returns their ids."""
+        if isinstance(scenarios, Mapping):
+            scenarios = [scenarios]
+        created_at = datetime.datetime.now().isoformat(timespec="seconds")
+        ids = []
+        with self._connect() as conn:
+            for scenario in scenarios:
+                metadata = {k: v for k, v in scenario.items() if k not in _TABLE_KEYS}
+                cursor = conn.execute(
+                    "INSERT INTO scenarios (campaign, created_at, metadata) VALUES (?, ?, ?)",
+                    (campaign, created_at, json.dumps(metadata, default=json_default)),
+                )
+                scenario_id = cursor.lastrowid
+                self._insert_parameters(conn, scenario_id, scenario.get("Materials", []))
+                for analysis, output in (scenario.get("Output") or {}).items():
+                    self._insert_output(conn, scenario_id, analysis, output or {})
+                ids.append(scenario_id)
+        return ids
+
+    def _insert_parameters(self, conn, scenario_id, materials):
+        rows = {}
+        for material in materials:
+            mat_name = material.get("Name", "Unknown")
+            for prop_name, prop_value in material.items():
+                if prop_name == "Name":
+                    continue
+                value = _to_float(prop_value)
+                text = None if value is not None or prop_value is None else str(prop_value)
+                rows[f"{mat_name}_{prop_name}"] = (mat_name, prop_name, value, text)
+        conn.executemany(
+            "INSERT OR REPLACE INTO parameters (scenario_id, name, material, property, value, text) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(scenario_id, name) + row for name, row in rows.items()],
+        )
+
+    def _insert_output(self, conn, scenario_id, analysis, output):
+        fields = OUTPUT_TEXT_FIELDS + OUTPUT_NUMERIC_FIELDS
+        values = [output.get(f) for f in OUTPUT_TEXT_FIELDS]
+        values += [_to_float(output.get(f)) for f in OUTPUT_NUMERIC_FIELDS]
+        conn.execute(
+            f"INSERT OR REPLACE INTO outputs (scenario_id, analysis, {', '.join(fields)}) "
+            f"VALUES (?, ?, {_placeholders(fields)})",
+            [scenario_id, analysis] + values,
+        )
+
+        displacements = output.get("Displacements") or []
+        conn.executemany(
+            f"INSERT INTO displacements (scenario_id, analysis, {', '.join(DISPLACEMENT_FIELDS)}) "
+            f"VALUES (?, ?, {_placeholders(DISPLACEMENT_FIELDS)})",
+            [[scenario_id, analysis] + [d.get(f) for f in DISPLACEMENT_FIELDS] for d in displacements],
+        )
+
+        reactions = output.get("Reactions") or []
+        if isinstance(reactions, dict):
+            reactions = [reactions]
+        conn.executemany(
+            f"INSERT INTO reactions (scenario_id, analysis, {', '.join(REACTION_FIELDS)}) "
+            f"VALUES (?, ?, {_placeholders(REACTION_FIELDS)})",
+            [[scenario_id, analysis] + [r.get(f) for f in REACTION_FIELDS] for r in reactions],
+        )
+
+    def import_json(self, path, campaign=None):
+        """One-off migration of a ``scenarios_results.json`` list."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        return self.append(data, campaign=campaign)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
+
+    def scenario_ids(self, campaign=None, after=None):
+        """Ids in insertion order; ``after`` keeps only ids greater than it (rows added since)."""
+        conditions, params = [], []
+        if campaign is not None:
+            conditions.append("campaign = ?")
+            params.append(campaign)
+        if after is not None:
+            conditions.append("id > ?")
+            params.append(after)
+        sql = "SELECT id FROM scenarios"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(sql + " ORDER BY id", params)]
+
+    def _select(self, sql, filters):
+        conditions, params, tables = [], [], {}
+        for column, values in filters:
+            if values is None:
+                continue
+            if isinstance(values, (str, int, np.integer)):
+                values = [values]
+            values = [v.item() if isinstance(v, np.generic) else v for v in values]
+            if len(values) > MAX_IN_VALUES:
+                table = f"filter_{len(tables)}"
+                tables[table] = values
+                conditions.append(f"{column} IN (SELECT value FROM temp.{table})")
+            else:
+                conditions.append(f"{column} IN ({_placeholders(values)})")
+                params.extend(values)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        with self._connect() as conn:
+            # Temporary tables live as long as this connection
+            for table, values in tables.items():
+                conn.execute(f"CREATE TEMP TABLE {table} (value PRIMARY KEY)")
+                conn.executemany(f"INSERT OR IGNORE INTO temp.{table} VALUES (?)", [(v,) for v in values])
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def parameters(self, columns=None, scenario_ids=None):
+        """Wide frame of numeric parameters indexed by scenario id."""
+        long = self._select(
+            "SELECT scenario_id, name, value FROM parameters",
+            [("name", columns), ("scenario_id", scenario_ids)],
+        )
+        wide = long.pivot(index="scenario_id", columns="name", values="value")
+        wide.columns.name = None
+        if columns is not None:
+            wide = wide.reindex(columns=list(columns))
+        return wide
+
+    def outputs(self, columns=None, analysis=None, scenario_ids=None):
+        """Scalar outputs, one row per (scenario_id, analysis)."""
+        allowed = OUTPUT_TEXT_FIELDS + OUTPUT_NUMERIC_FIELDS
+        columns = list(columns) if columns is not None else allowed
+        unknown = set(columns) - set(allowed)
+        if unknown:
+            raise KeyError(f"Unknown output column(s): {sorted(unknown)}")
+        return self._select(
+            f"SELECT scenario_id, analysis, {', '.join(columns)} FROM outputs",
+            [("analysis", analysis), ("scenario_id", scenario_ids)],
+        )
+
+    def displacements(self, analysis=None, id_elements=None, scenario_ids=None):
+        return self._select(
+            f"SELECT scenario_id, analysis, {', '.join(DISPLACEMENT_FIELDS)} FROM displacements",
+            [("analysis", analysis), ("IdElement", id_elements), ("scenario_id", scenario_ids)],
+        )
+
+    def reactions(self, analysis=None, scenario_ids=None):
+        return self._select(
+            f"SELECT scenario_id, analysis, {', '.join(REACTION_FIELDS)} FROM reactions",
+            [("analysis", analysis), ("scenario_id", scenario_ids)],
+        )
+
+    def load_scenarios(self, scenario_ids=None):
+        """
+        Rebuild scenario dicts in the ``scenarios_results.json`` layout
+        (parameters come back as floats), e.g. for ``plot_results.flat_data``.
+        """
+        meta = self._select("SELECT id AS scenario_id, metadata FROM scenarios", [("id", scenario_ids)])
+        meta = meta.sort_values("scenario_id")
+        params = self._select(
+            "SELECT scenario_id, material, property, value, text FROM parameters",
+            [("scenario_id", scenario_ids)],
+        )
+        outputs = self.outputs(scenario_ids=scenario_ids)
+        displ = self.displacements(scenario_ids=scenario_ids)
+        reac = self.reactions(scenario_ids=scenario_ids)
+
+        scenarios = {}
+        for row in meta.itertuples(index=False):
+            scenario = json.loads(row.metadata) if row.metadata else {}
+            scenario["Materials"] = []
+            scenarios[row.scenario_id] = scenario
+
+        materials = {}
+        for row in params.itertuples(index=False):
+            material = materials.setdefault((row.scenario_id, row.material), {"Name": row.material})
+            material[row.property] = row.value if pd.isna(row.text) else row.text
+        for (scenario_id, _), material in materials.items():
+            scenarios[scenario_id]["Materials"].append(material)
+
+        for row in outputs.to_dict("records"):
+            output = {k: v for k, v in row.items() if k not in ("scenario_id", "analysis")}
+            output["Displacements"] = []
+            output["Reactions"] = {}
+            scenarios[row["scenario_id"]].setdefault("Output", {})[row["analysis"]] = output
+        for row in displ.to_dict("records"):
+            output = scenarios[row.pop("scenario_id")]["Output"][row.pop("analysis")]
+            output["Displacements"].append(row)
+        for row in reac.to_dict("records"):
+            output = scenarios[row.pop("scenario_id")]["Output"][row.pop("analysis")]
+            if not output["Reactions"]:
+                output["Reactions"] = []
+            output["Reactions"].append(row)
+
+        return list(scenarios.values())
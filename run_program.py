@@ -1,73 +1,155 @@
+import os
+import time
 import subprocess
+from pathlib import Path
 
-EXE_PATH = r"C:\Program Files\Gruppo Sismica\HiStrA Bridges 2024.1.1\SolverHistra.exe"
+from modelxml.timing import span
+from resource_monitor import ProcessMonitor, find_processes, kill_process_tree
+from solver_base import SolverRunError, SolverResult, SolverTimeout
+from fake_solver import FakeSolver
 
-class SolverRunError(Exception):
-    """Raised when the solver fails to execute properly."""
-    def __init__(self, file_path: str, message: str):
-        super().__init__(message)
-        self.file_path = file_path
+EXE_PATH = os.environ.get(
+    "HISTRA_SOLVER_EXE",
+    r"C:\Program Files\Gruppo Sismica\HiStrA Bridges 2024.1.1\SolverHistra.exe",
+)
+PSEXEC_PATH = os.environ.get(
+    "HISTRA_PSEXEC_EXE",
+    r"C:\Users\mbonatte\Documents\Coding\histra-automation\PSTools\PsExec.exe",
+)
 
+def wait_for_release(path, timeout=10.0):
+    """
+    Block until no other process holds ``path`` open for writing (the solver
+    keeps its files locked for a moment after exiting on Windows). Returns
+    False if the file is still locked after ``timeout`` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while True:
+        try:
+            with open(path, "r+b"):
+                return True
+        except FileNotFoundError:
+            return True
+        except PermissionError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
 
-from pathlib import Path
-PSEXEC_PATH = r"C:\Users\mbonatte\Documents\Coding\histra-automation\PSTools\PsExec.exe"
-def run_program(model_path, mode="psexec", timeout_seconds=600):
-    model_path = Path(model_path)
-    if not model_path.exists():
-        raise FileNotFoundError(f"Model not found: {model_path}")
-    
-    if mode == "psexec":
-        cmd = [
-            PSEXEC_PATH,
+
+# -------------------------------------------------------------------
+# Solver backends
+# -------------------------------------------------------------------
+
+class LocalSolver:
+    """SolverHistra.exe started directly."""
+    name = "local"
+
+    def __init__(self, exe_path=None):
+        self.exe_path = exe_path or EXE_PATH
+
+    def command(self, model_path):
+        return [self.exe_path, "run", str(model_path), "-CloseWithoutAsk", "true"]
+
+    def run(self, model_path, timeout_seconds):
+        cmd = self.command(model_path)
+        try:
+            # A new process group/session per run, so a timeout kills only this run
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                    start_new_session=os.name != "nt")
+            with self.monitor(proc, model_path) as monitor:
+                try:
+                    stdout, stderr = proc.communicate(timeout=timeout_seconds)
+                except subprocess.TimeoutExpired:
+                    print(f"⏰ Timeout: {model_path} exceeded {timeout_seconds} seconds. Killing...")
+                    killed = self.kill(proc, model_path)
+                    raise SolverTimeout(model_path, timeout_seconds, killed)
+            if proc.returncode:
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+            # The solver has exited; wait until it has released its files
+            wait_for_release(model_path)
+            wait_for_release(model_path.with_suffix(".Results"))
+            return SolverResult(stdout.strip(), monitor.usage)
+
+        except subprocess.CalledProcessError as e:
+            print("❌ Solver returned an error.")
+            print(f"Model path:\n", model_path)
+            print("STDOUT:\n", e.stdout)
+            print("STDERR:\n", e.stderr)
+            if "with error code 1" in e.stderr:
+                raise SolverRunError(
+                    model_path,
+                    e.stderr,
+                )
+            if "StackOverflowException" in e.stderr:
+                raise SolverRunError(
+                    model_path,
+                    e.stderr,
+                )
+            raise
+
+    def monitor(self, proc, model_path):
+        """ProcessMonitor of the solver process of this run."""
+        return ProcessMonitor(proc.pid)
+
+    def kill(self, proc, model_path):
+        """Kill the process tree of this run only; returns the killed pids."""
+        killed = kill_process_tree(proc.pid)
+        try:
+            proc.communicate(timeout=10)
+        except subprocess.TimeoutExpired:
+            pass
+        return killed
+
+
+class PsExecSolver(LocalSolver):
+    """SolverHistra.exe started through PsExec in the interactive session."""
+    name = "psexec"
+
+    def __init__(self, exe_path=None, psexec_path=None):
+        super().__init__(exe_path)
+        self.psexec_path = psexec_path or PSEXEC_PATH
+
+    def command(self, model_path):
+        return [
+            self.psexec_path,
             "-accepteula",
             "-nobanner",
             "-i", "1",
             "-h",
-            EXE_PATH,
-            "run",
-            str(model_path),
-            "-CloseWithoutAsk", "true",
-        ]
-    elif mode == "local":
-        cmd = [
-            EXE_PATH,
-            "run",
-            str(model_path),
-            "-CloseWithoutAsk", "true",
-        ]
-    else:
-        raise ValueError(f"Invalid mode '{mode}'. Must be 'psexec' or 'local'.")
-
-
-
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout_seconds,
-            check=True
-        )
-        return result.stdout.strip()
-
-    except subprocess.TimeoutExpired:
-        print(f"⏰ Timeout: {model_path} exceeded {timeout_seconds} seconds. Killing...")
-        subprocess.run(["taskkill", "/IM", "SolverHistra.exe", "/F"], capture_output=True)
-        raise
-
-    except subprocess.CalledProcessError as e:
-        print("❌ Solver returned an error.")
-        print(f"Model path:\n", model_path)
-        print("STDOUT:\n", e.stdout)
-        print("STDERR:\n", e.stderr)
-        if "with error code 1" in e.stderr:
-            raise SolverRunError(
-                model_path,
-                e.stderr,
-            )
-        if "StackOverflowException" in e.stderr:
-            raise SolverRunError(
-                model_path,
-                e.stderr,
-            )
-        raise
\ No newline at end of file
+        ] + super().command(model_path)
+
+    def monitor(self, proc, model_path):
+        # proc is the PsExec client: measure the solver it had started instead
+        return ProcessMonitor(proc.pid, cmdline=str(model_path))
+
+    def kill(self, proc, model_path):
+        # The solver is started by the PsExec service, not as a child of
+        # PsExec.exe: find it by the model path on its command line.
+        killed = []
+        for solver in find_processes(str(model_path)):
+            if solver.pid != proc.pid:
+                killed += kill_process_tree(solver.pid)
+        return killed + super().kill(proc, model_path)
+
+
+SOLVERS = {"local": LocalSolver, "psexec": PsExecSolver, "fake": FakeSolver}
+
+def get_solver(mode):
+    """Solver backend for ``mode``: a name in SOLVERS or a backend instance."""
+    if not isinstance(mode, str):
+        return mode
+    if mode not in SOLVERS:
+        raise ValueError(f"Invalid mode '{mode}'. Must be one of {sorted(SOLVERS)}.")
+    return SOLVERS[mode]()
+
+
+def run_program(model_path, mode="psexec", timeout_seconds=600):
+    model_path = Path(model_path)
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model not found: {model_path}")
+
+    solver = get_solver(mode)
+    with span("solver", solver=solver.name, model=model_path.name):
+        return solver.run(model_path, timeout_seconds)
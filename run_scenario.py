@@ -1,11 +1,12 @@
 import os
-import time
 import glob
 import traceback
 
-from run_program import SolverRunError
+from modelxml.timing import timed, span_context
+from run_program import SolverRunError, wait_for_release
 from processing_steps import pre_processing, processing, pos_processing
 
+@timed("cleanup")
 def delete_model_copies(file_path):
     """Delete all files that match '*_copy.*' in the file directory."""
     directory = os.path.dirname(file_path)
@@ -14,49 +15,64 @@ def delete_model_copies(file_path):
     
     for path in glob.glob(pattern):
         try:
+            wait_for_release(path)
             os.remove(path)
         except Exception as e:
             print(f"[WARN] Could not delete {path}: {e}")
 
-def restart_scenario(input_path, scenario, i, retries_left=2):
+def scenario_paths(input_path, i):
+    """Model copy and results database used by scenario ``i``."""
+    xml_file = input_path.replace(".hrx", f"_copy_{i+1}.hrx")
+    db_path = input_path.replace(".hrx", f"_copy_{i+1}.Results")
+    return xml_file, db_path
+
+def restart_scenario(input_path, scenario, i, retries_left=2, **kwargs):
     """Retry a failed scenario, deleting old copies first."""
     if retries_left <= 0:
         print(f"[ERROR] Scenario {i+1} failed permanently after retries.")
         return
     print(f"[INFO] Restarting scenario {i+1}... ({retries_left} retries left)")
-    xml_file = input_path.replace(".hrx", f"_copy_{i+1}.hrx")
+    xml_file, _ = scenario_paths(input_path, i)
     delete_model_copies(xml_file)
-    time.sleep(1)
 
     try:
-        run_scenario(input_path, scenario, i)
+        run_scenario(input_path, scenario, i, **kwargs)
     except SolverRunError:
-        restart_scenario(input_path, scenario, i, retries_left=retries_left-1)
+        restart_scenario(input_path, scenario, i, retries_left=retries_left-1, **kwargs)
 
-def run_scenario(input_path, scenario, i, mode='local', timeout=360, **kwargs):
-    """Run a single scenario."""
-    xml_file = input_path.replace(".hrx", f"_copy_{i+1}.hrx")
-    db_path = input_path.replace(".hrx", f"_copy_{i+1}.Results")
-    
-    try:
-        pre_processing(input_path, scenario, xml_file, **kwargs)
-        time.sleep(0.5)
+def run_scenario(input_path, scenario, i, mode='local', timeout=360, cache=None, cache_key=None, **kwargs):
+    """
+    Run a single scenario. With a ``result_cache.ResultCache`` identical
+    solver inputs are not solved again: the cached results are attached.
+    Pass the ``cache_key`` of the original inputs when running a scenario
+    again, since pre-processing replaces its ``Materials``.
+    """
+    xml_file, db_path = scenario_paths(input_path, i)
+
+    with span_context(scenario=i + 1):
+        if cache is not None:
+            key = cache_key or cache.key(input_path, scenario, mode)
+            if cache.restore(key, scenario):
+                print(f"[CACHE] Scenario {i+1} has the same inputs as a cached run; results reused.\n")
+                return
+        try:
+            pre_processing(input_path, scenario, xml_file, mode=mode, **kwargs)
         
-        processing(xml_file, scenario, mode, timeout, **kwargs)
-        time.sleep(1)
+            processing(xml_file, scenario, mode, timeout, **kwargs)
         
-        pos_processing(scenario, db_path, xml_file, **kwargs)
-        time.sleep(1)
+            pos_processing(scenario, db_path, xml_file, **kwargs)
+
+            if cache is not None:
+                cache.put(key, scenario)
         
-        print(f"[SUCCESS] Scenario {i+1} finished successfully and saved.\n")
+            print(f"[SUCCESS] Scenario {i+1} finished successfully and saved.\n")
     
-    except SolverRunError as e:
-        print(f"[ERROR] SolverRunError in scenario {i+1}: {e}")
-        # restart_scenario(input_path, scenario, i)
-    except Exception as e:
-        print(f"[FATAL] Unexpected error in scenario {i+1}: {e}")
-        traceback.print_exc()
-    finally:
-        time.sleep(1)
-        print(f"[CLEANUP] Deleting temporary files for scenario {i+1}")
-        delete_model_copies(xml_file)
\ No newline at end of file
+        except SolverRunError as e:
+            print(f"[ERROR] SolverRunError in scenario {i+1}: {e}")
+            # restart_scenario(input_path, scenario, i)
+        except Exception as e:
+            print(f"[FATAL] Unexpected error in scenario {i+1}: {e}")
+            traceback.print_exc()
+        finally:
+            print(f"[CLEANUP] Deleting temporary files for scenario {i+1}")
+            delete_model_copies(xml_file)
\ No newline at end of file
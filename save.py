@@ -1,20 +1,54 @@
-from modelxml.xmlio import read_xml
-from modelxml.selectors import geometry, model_points_location_map, masonry_materials, analysis_state, analysis_key
+from modelxml.xmlio import read_xml_tags
+from modelxml.timing import span
+from modelxml.selectors import (
+    geometry, model_points_location_map, masonry_materials, analysis_state, analysis_key,
+    ANALYSIS_TAGS, GEOMETRY_TAGS, MATERIAL_TAGS, NODE_TAGS,
+)
 
-from extract_results import get_model_points_displacement, get_reactions
+from extract_results import get_model_points_displacement, get_reactions, open_results, ensure_indexes
 
-def save_scenario_info(scenario, file):
-    root = read_xml(file)
+def save_scenario_info(scenario, file, root=None):
+    if root is None:
+        root = read_xml_tags(file, GEOMETRY_TAGS + MATERIAL_TAGS + NODE_TAGS)
     scenario['Geometry'] = geometry(root)
     scenario['Materials'] = masonry_materials(root)
     scenario['Model_Points'] = model_points_location_map(root)
 
 
 def save_outputs(scenario, analysis, db_path, xml_file, **kwargs):
-    xml_root = read_xml(xml_file)
+    xml_root = read_xml_tags(xml_file, ANALYSIS_TAGS)
     anls_key = int(analysis_key(xml_root, analysis))
     if 'Output' not in scenario:
         scenario['Output'] = {}
     scenario['Output'][analysis] = get_model_points_displacement(db_path, anls_key, **kwargs)
     scenario['Output'][analysis].update(get_reactions(db_path, anls_key, **kwargs))
-    scenario['Output'][analysis].update(analysis_state(xml_root, analysis))
\ No newline at end of file
+    scenario['Output'][analysis].update(analysis_state(xml_root, analysis))
+
+
+def save_all_outputs(scenario, db_path, xml_file, analyses=None, indexes=False, **kwargs):
+    """
+    Batched ``save_outputs`` for several analyses: the model is parsed once
+    and the results database opened once for the whole scenario.
+
+    ``indexes=True`` first adds covering indexes to the (solver-written)
+    .Results file. For the 2-4 queries of a scenario that is slower than
+    scanning: 0.9 s instead of 0.5 s on 2M DisplModelPoints rows, and the
+    file nearly doubles, so it is only worth it for repeated queries.
+    """
+    if analyses is None:
+        analyses = list(scenario["Analysis"])
+    xml_root = read_xml_tags(xml_file, ANALYSIS_TAGS)
+    if indexes:
+        with span("ensure_indexes"):
+            ensure_indexes(db_path)
+
+    outputs = scenario.setdefault('Output', {})
+    with open_results(db_path) as conn:
+        for analysis in analyses:
+            with span("extract", analysis=analysis):
+                anls_key = int(analysis_key(xml_root, analysis))
+                output = get_model_points_displacement(db_path, anls_key, conn=conn, **kwargs)
+                output.update(get_reactions(db_path, anls_key, conn=conn, **kwargs))
+                output.update(analysis_state(xml_root, analysis))
+                outputs[analysis] = output
+    return outputs
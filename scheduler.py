@@ -0,0 +1,482 @@
+import os
+import time
+import heapq
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+from modelxml.timing import span, span_context, recording, is_recording
+from processing_steps import prepare_model, pre_processing, processing, pos_processing, solver_slot
+from run_scenario import scenario_paths, delete_model_copies
+from campaign_journal import CampaignJournal
+from resource_monitor import AdaptiveLimiter
+from result_cache import ResultCache, default_result_cache
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("prepared", "solved", "finished")
+
+
+class ScenarioCancelled(Exception):
+    """Raised inside a job when it is cancelled between stages."""
+
+
+class ScenarioJob:
+    """
+    Handle for one submitted scenario.
+
+    ``events[stage]`` is set when the stage completes; ``finished`` is also
+    set when the job fails or is cancelled, so waiting on it never hangs.
+    """
+
+    def __init__(self, index, scenario):
+        self.index = index
+        self.scenario = scenario
+        self.events = {stage: threading.Event() for stage in STAGES}
+        self.stage = None
+        self.error = None
+        self.attempts = 0
+        self.future = None
+        # ResultCache key of the submitted inputs (set by the scheduler)
+        self.cache_key = None
+        self._cancel = threading.Event()
+        # Set by the scheduler to wake its retry queue
+        self._on_cancel = None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def ok(self):
+        return self.stage == "finished" and self.error is None
+
+    def cancel(self):
+        """Cancel before the next stage starts (a running solver is not interrupted)."""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.events["finished"].set()
+        if self._on_cancel is not None:
+            self._on_cancel()
+
+    def wait(self, stage="finished", timeout=None):
+        return self.events[stage].wait(timeout)
+
+    def _check_cancelled(self):
+        if self.cancelled:
+            raise ScenarioCancelled(f"Scenario {self.index + 1} cancelled")
+
+    def _complete(self, stage):
+        self.stage = stage
+        self.events[stage].set()
+
+    def __repr__(self):
+        return f"ScenarioJob(index={self.index}, stage={self.stage!r}, error={self.error!r})"
+
+
+class ScenarioScheduler:
+    """
+    Run scenarios with bounded concurrency.
+
+    At most ``max_solvers`` scenarios are in the solver stage (``processing``)
+    at once. ``prefetch`` extra workers pre-process the next scenarios while
+    the solver slots are busy, so pre-processing of scenario N+1 overlaps the
+    solver run of scenario N. A StartMesh run during pre-processing takes a
+    solver slot too, so no more than ``max_solvers`` solvers ever run.
+
+    With a ``campaign_journal.CampaignJournal`` every stage is recorded on
+    disk, failed scenarios are retried with the journal's backoff until its
+    ``max_attempts`` is reached, and a scenario that was solved before a
+    crash is only post-processed (if its model copy and results survived).
+    A scenario waiting for its next attempt sits in a delayed queue and
+    holds no worker.
+
+    ``adaptive`` (True or a ``resource_monitor.AdaptiveLimiter``) makes the
+    number of solver slots follow CPU and memory use, between 1 and
+    ``max_solvers`` for True.
+
+    With a ``result_cache.ResultCache`` a scenario whose solver inputs were
+    solved before gets the cached results without pre-processing or a
+    solver run, and every finished scenario is added to the cache.
+
+        with ScenarioScheduler(input_path, max_solvers=3) as scheduler:
+            jobs = scheduler.map(scenarios)
+    """
+
+    def __init__(self, input_path, max_solvers=3, prefetch=1, mode="local", timeout=360,
+                 on_stage=None, journal=None, adaptive=None, cache=None, **kwargs):
+        self.input_path = input_path
+        self.journal = journal
+        self.cache = cache
+        self.mode = mode
+        self.timeout = timeout
+        self.kwargs = kwargs
+        self.on_stage = on_stage
+        self.limiter = None
+        self._owns_limiter = adaptive is True
+        if adaptive is True:
+            # Start at half the ceiling and let the controller ramp up
+            adaptive = AdaptiveLimiter(max_workers=max_solvers, start=max(max_solvers // 2, 1))
+        if adaptive:
+            self.limiter = adaptive
+            self._solver_slots = adaptive
+            max_solvers = adaptive.max_workers
+        else:
+            self._solver_slots = threading.BoundedSemaphore(max_solvers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_solvers + max(prefetch, 0),
+            thread_name_prefix="scenario",
+        )
+        self.jobs = []
+        # Jobs waiting for their next attempt: heap of (due, seq, job)
+        self._retries = []
+        self._retry_seq = 0
+        self._retry_cond = threading.Condition()
+        self._retry_thread = None
+        self._closing = False
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def submit(self, scenario, index=None):
+        index = len(self.jobs) if index is None else index
+        job = ScenarioJob(index, scenario)
+        job._on_cancel = self._wake_retries
+        if self.cache is not None:
+            job.cache_key = self._cache_key(job)
+        self.jobs.append(job)
+        self._queue(job)
+        return job
+
+    def _cache_key(self, job):
+        """
+        Cache key of the job's inputs, taken once: pre-processing replaces
+        ``Materials``, so a retry or a resumed run would hash something else.
+        """
+        inputs = job.scenario
+        if self.journal is not None:
+            try:
+                inputs = self.journal.entry(job.index)["inputs"]
+            except KeyError:
+                pass
+        with span("result_cache"):
+            return self.cache.key(self.input_path, inputs, self.mode)
+
+    def _queue(self, job):
+        """Start ``job`` now, or through the retry queue once the journal's backoff has passed."""
+        delay = self.journal.retry_delay(job.index) if self.journal is not None else 0.0
+        if delay <= 0:
+            job.future = self._executor.submit(self._run, job)
+            return
+        logger.info("Scenario %s: next attempt in %.0f s", job.index + 1, delay)
+        with self._retry_cond:
+            heapq.heappush(self._retries, (time.monotonic() + delay, self._retry_seq, job))
+            self._retry_seq += 1
+            if self._retry_thread is None:
+                self._retry_thread = threading.Thread(target=self._retry_loop, name="scenario-retry",
+                                                      daemon=True)
+                self._retry_thread.start()
+            self._retry_cond.notify()
+
+    def _wake_retries(self):
+        with self._retry_cond:
+            self._retry_cond.notify()
+
+    def _retry_loop(self):
+        with self._retry_cond:
+            while True:
+                # Cancelled jobs leave the queue at once
+                cancelled = [entry for entry in self._retries if entry[2].cancelled]
+                if cancelled:
+                    self._retries = [entry for entry in self._retries if not entry[2].cancelled]
+                    heapq.heapify(self._retries)
+                    for _, _, job in cancelled:
+                        self._drop(job, ScenarioCancelled(f"Scenario {job.index + 1} cancelled"))
+                if not self._retries:
+                    if self._closing:
+                        self._retry_thread = None
+                        return
+                    self._retry_cond.wait()
+                    continue
+                due, _, job = self._retries[0]
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    self._retry_cond.wait(remaining)
+                    continue
+                heapq.heappop(self._retries)
+                try:
+                    job.future = self._executor.submit(self._run, job)
+                except RuntimeError as e:
+                    # The executor was shut down without waiting
+                    self._drop(job, e)
+
+    def _drop(self, job, error):
+        """Finish a job from the retry queue without running it again."""
+        job.error = error
+        if isinstance(error, ScenarioCancelled):
+            logger.warning("Scenario %s cancelled", job.index + 1)
+        else:
+            logger.error("Scenario %s not retried: %s", job.index + 1, error)
+        job.events["finished"].set()
+
+    def map(self, scenarios, wait=True):
+        jobs = [self.submit(scenario, i) for i, scenario in enumerate(scenarios)]
+        if wait:
+            self.wait(jobs)
+        return jobs
+
+    def wait(self, jobs=None, timeout=None):
+        """Wait until every job is finished, failed or cancelled."""
+        for job in jobs if jobs is not None else list(self.jobs):
+            job.wait("finished", timeout)
+
+    def cancel(self):
+        for job in self.jobs:
+            job.cancel()
+
+    def shutdown(self, wait=True, cancel=False):
+        if cancel:
+            self.cancel()
+        if wait:
+            # Retries are submitted to the executor, so it must outlive them
+            self.wait()
+        with self._retry_cond:
+            self._closing = True
+            self._retry_cond.notify()
+        self._executor.shutdown(wait=wait, cancel_futures=cancel)
+        if self._owns_limiter:
+            self.limiter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Ctrl+C in the notebook cancels everything that has not started
+        self.shutdown(wait=True, cancel=exc_type is not None)
+        return False
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _can_resume(self, job, xml_file, db_path):
+        if self.journal is None:
+            return False
+        entry = self.journal.entry(job.index)
+        if entry["stage"] != "solved" or not (os.path.exists(xml_file) and os.path.exists(db_path)):
+            return False
+        # Inputs and pre-processing info (Geometry, Materials, ...) of the solved run
+        job.scenario.update(entry["scenario"])
+        return True
+
+    def _attempt(self, job, xml_file, db_path):
+        job.attempts += 1
+        with span_context(attempt=job.attempts):
+            self._run_stages(job, xml_file, db_path)
+
+    def _run_stages(self, job, xml_file, db_path):
+        scenario = job.scenario
+        if self.journal is not None:
+            self.journal.start(job.index, xml_file, db_path)
+
+        if self._can_resume(job, xml_file, db_path):
+            logger.info("Scenario %s was solved before; resuming at post-processing", job.index + 1)
+            job._complete("solved")
+        else:
+            if job.cache_key is not None:
+                with span("result_cache"):
+                    hit = self.cache.restore(job.cache_key, scenario)
+                if hit:
+                    logger.info("Scenario %s: same solver inputs as a cached run; reusing its results",
+                                job.index + 1)
+                    job._complete("prepared")
+                    job._complete("solved")
+                    self._notify(job, "finished")
+                    return
+
+            delete_model_copies(xml_file)
+            job._check_cancelled()
+            pre_processing(self.input_path, scenario, xml_file, mode=self.mode,
+                           solver_slots=self._solver_slots, **self.kwargs)
+            self._notify(job, "prepared")
+
+            with solver_slot(self._solver_slots):
+                job._check_cancelled()
+                processing(xml_file, scenario, self.mode, self.timeout, **self.kwargs)
+            if self.limiter is not None:
+                for usage in scenario.get("Resources", {}).values():
+                    self.limiter.observe(usage)
+            self._notify(job, "solved")
+
+        pos_processing(scenario, db_path, xml_file, **self.kwargs)
+        if job.cache_key is not None:
+            self.cache.put(job.cache_key, scenario)
+        self._notify(job, "finished")
+
+    def _run(self, job):
+        with span_context(scenario=job.index + 1):
+            return self._run_job(job)
+
+    def _run_job(self, job):
+        xml_file, db_path = scenario_paths(self.input_path, job.index)
+        retry = False
+        try:
+            job._check_cancelled()
+            self._attempt(job, xml_file, db_path)
+            job.error = None
+            logger.info("Scenario %s finished successfully", job.index + 1)
+
+        except (ScenarioCancelled, CancelledError) as e:
+            job.error = e
+            if self.journal is not None:
+                self.journal.interrupt(job.index)
+            logger.warning("Scenario %s cancelled", job.index + 1)
+        except Exception as e:
+            job.error = e
+            retry = self.journal is not None and self.journal.fail(job.index, e)
+            if retry:
+                logger.warning("Scenario %s attempt %d failed: %s; retrying",
+                               job.index + 1, job.attempts, e)
+            else:
+                logger.exception("Scenario %s failed: %s", job.index + 1, e)
+        finally:
+            # A solved but not post-processed scenario keeps its files so a
+            # restarted campaign can resume it
+            if self.journal is None or job.stage != "solved":
+                delete_model_copies(xml_file)
+            if retry:
+                try:
+                    self._queue(job)
+                except RuntimeError as e:
+                    self._drop(job, e)
+            else:
+                job.events["finished"].set()
+        return job
+
+    def _notify(self, job, stage):
+        job._complete(stage)
+        if self.journal is not None:
+            # Stored at every stage: pre-processing fills in the model info and
+            # processing the Resources, both needed to resume at post-processing
+            self.journal.record(job.index, stage, job.scenario)
+        if self.on_stage is not None:
+            try:
+                self.on_stage(job, stage)
+            except Exception:
+                logger.exception("on_stage callback failed for scenario %s", job.index + 1)
+
+
+def default_timings_path(input_path):
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return f"{os.path.splitext(input_path)[0]}_timings_{stamp}.jsonl"
+
+
+def _screen_scenarios(screen, scenarios, todo):
+    """
+    Drop near-duplicates from ``todo``. History matches get the stored
+    outputs now; returns the remaining indices and {index: index of the
+    scenario it repeats} for the batch matches.
+    """
+    todo = list(todo)
+    with span("screening"):
+        result = screen.screen([scenarios[i] for i in todo])
+    copies = {}
+    for row in result.matches.itertuples(index=False):
+        i = todo[row.proposal]
+        if row.source == "batch":
+            copies[i] = todo[row.match]
+        elif row.proposal in result.reused:
+            scenarios[i]["Output"] = result.reused[row.proposal].get("Output", {})
+    skipped = {todo[p] for p in result.matches["proposal"]}
+    if skipped:
+        logger.info("Screening skipped %d near-duplicate scenarios: %s",
+                    len(skipped), sorted(i + 1 for i in skipped))
+    return [i for i in todo if i not in skipped], copies
+
+
+def _chain_callbacks(*callbacks):
+    """One ``on_stage`` callback calling each of ``callbacks`` (None entries are ignored)."""
+    callbacks = [callback for callback in callbacks if callback is not None]
+    if len(callbacks) <= 1:
+        return callbacks[0] if callbacks else None
+
+    def on_stage(job, stage):
+        for callback in callbacks:
+            callback(job, stage)
+    return on_stage
+
+
+def run_campaign(input_path, scenarios=None, max_workers=3, timeout=360, mode="local", journal=None,
+                 timings=True, screen=None, cache=None, **kwargs):
+    """
+    Prepare the input model and run every scenario through a ScenarioScheduler.
+
+    ``journal`` (a CampaignJournal or a path) makes the campaign resumable:
+    scenarios finished in an earlier session are not run again and get their
+    stored outputs back. ``scenarios`` may be omitted to rerun the journal's own.
+
+    ``adaptive=True`` treats ``max_workers`` as a ceiling and adapts the
+    number of concurrent solvers to CPU and memory use.
+
+    Stage timings (``modelxml.timing`` spans) are written to ``timings``: a
+    path, True for ``<input>_timings_<time>.jsonl``, or False for none. See
+    ``timing_report`` for the summary.
+
+    ``screen`` (a ``screening.ScenarioScreen``) skips scenarios that nearly
+    repeat an executed one, which get its stored outputs instead, or an
+    earlier scenario of this campaign, which they copy once it has run.
+    Scenarios finished by this campaign join the screen's history as they
+    arrive.
+
+    ``cache`` (a ``result_cache.ResultCache``, a path, or True for
+    ``result_cache.db`` next to the input) reuses the results of scenarios
+    with exactly the same solver inputs instead of solving them again.
+    """
+    if timings and not is_recording():
+        path = default_timings_path(input_path) if timings is True else timings
+        logger.info("Recording stage timings to %s", path)
+        with recording(path):
+            return run_campaign(input_path, scenarios, max_workers, timeout, mode, journal,
+                                timings=False, screen=screen, cache=cache, **kwargs)
+
+    if journal is not None and not isinstance(journal, CampaignJournal):
+        journal = CampaignJournal(journal)
+    if cache is True:
+        cache = default_result_cache(input_path)
+    elif cache is not None and not isinstance(cache, ResultCache):
+        cache = ResultCache(cache)
+    if scenarios is None:
+        if journal is None:
+            raise ValueError("scenarios are required without a journal")
+        scenarios = journal.inputs()
+
+    todo = range(len(scenarios))
+    if journal is not None:
+        journal.register(scenarios)
+        todo = journal.todo()
+        finished = journal.scenarios()
+        for i, scenario in enumerate(scenarios):
+            if i not in todo and "Output" in finished[i]:
+                scenario.update(finished[i])
+        logger.info("Journal %s: %s; running %d scenarios", journal.path, journal.summary(), len(todo))
+
+    copies = {}
+    if screen is not None:
+        todo, copies = _screen_scenarios(screen, scenarios, todo)
+        kwargs["on_stage"] = _chain_callbacks(kwargs.get("on_stage"), screen.on_stage)
+
+    with span("prepare_model"):
+        prepare_model(input_path)
+    with ScenarioScheduler(input_path, max_solvers=max_workers, mode=mode, timeout=timeout,
+                           journal=journal, cache=cache, **kwargs) as scheduler:
+        jobs = [scheduler.submit(scenarios[i], i) for i in todo]
+        scheduler.wait(jobs)
+    for i, original in copies.items():
+        if "Output" in scenarios[original]:
+            scenarios[i]["Output"] = scenarios[original]["Output"]
+    failed = [job for job in jobs if not job.ok]
+    if failed:
+        logger.warning("%d of %d scenarios did not finish: %s",
+                       len(failed), len(jobs), [job.index + 1 for job in failed])
+    return jobs
@@ -0,0 +1,234 @@
+import logging
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from build_scenarios import ScenarioSet, scenarios_to_matrix, to_unit
+
+logger = logging.getLogger(__name__)
+
+
+class ScreeningResult:
+    """
+    Outcome of ``ScenarioScreen.screen``:
+
+    - ``run``: the scenarios still worth solving
+    - ``matches``: one row per near-duplicate proposal (``proposal`` index,
+      ``source`` "history" or "batch", ``match`` store id / proposal index,
+      ``distance``)
+    - ``reused``: proposal index -> stored scenario (with its ``Output``) for
+      the history matches, when the screen knows the results store
+    """
+
+    def __init__(self, run, matches, reused):
+        self.run = run
+        self.matches = matches
+        self.reused = reused
+
+    def __repr__(self):
+        counts = self.matches["source"].value_counts().to_dict() if len(self.matches) else {}
+        return f"ScreeningResult(run={len(self.run)}, duplicates={counts})"
+
+
+class ScenarioScreen:
+    """
+    Pre-submission screening of proposed scenarios against the executed
+    history: proposals within ``eps`` of an executed scenario, or of an
+    earlier proposal of the same batch, are dropped (or flagged) before any
+    solver time is spent on them.
+
+    Distances are Euclidean in the unit cube of ``param_ranges`` (the
+    ``<Material>_<Property>`` keys), a fixed scale so that points added
+    later stay comparable; ``filter_data`` normalizes by the data instead.
+
+    History points live in a KD-tree plus a buffer of recent additions
+    with a small KD-tree of its own, built when the buffer is next queried.
+    The main tree is rebuilt only when the buffer outgrows
+    ``rebuild_fraction`` of it, so adding results as they arrive stays
+    cheap with 100k+ points.
+
+        screen = ScenarioScreen.from_store(store, param_ranges, eps=0.01)
+        result = screen.screen(build_scenarios(param_ranges, 500, "NewAnalysis"))
+        run_campaign(input_path, result.run)
+        screen.sync()  # after store.append(...)
+    """
+
+    def __init__(self, param_ranges, eps=0.01, store=None, rebuild_fraction=0.1, min_buffer=1024):
+        self.param_ranges = param_ranges
+        self.keys = list(param_ranges)
+        self.eps = eps
+        self.store = store
+        self.rebuild_fraction = rebuild_fraction
+        self.min_buffer = min_buffer
+        self._points = np.empty((0, len(self.keys)))
+        self._refs = np.empty(0, dtype=object)
+        self._tree = None
+        self._n_tree = 0
+        self._buffer_tree = None
+        self._last_id = None
+        # on_stage is called from the scheduler's worker threads
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_store(cls, store, param_ranges, eps=0.01, **kwargs):
+        """A screen holding every scenario in ``store`` (a ``ResultsStore`` or a path)."""
+        if not hasattr(store, "parameters"):
+            from results_store import ResultsStore
+            store = ResultsStore(store)
+        screen = cls(param_ranges, eps, store=store, **kwargs)
+        screen.sync()
+        return screen
+
+    def __len__(self):
+        return len(self._points)
+
+    # ------------------------------------------------------------------
+    # History
+    # ------------------------------------------------------------------
+
+    def add(self, X, refs=None):
+        """
+        Add executed parameter rows (``param_ranges`` order). ``refs`` are
+        what a match returns: store ids, or the scenario dicts themselves.
+        Rows with missing parameters cannot be compared and are skipped.
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, len(self.keys))
+        refs = [int(r) if isinstance(r, np.integer) else r for r in refs] if refs is not None else [None] * len(X)
+        refs = np.asarray(refs, dtype=object)
+        ok = np.isfinite(X).all(axis=1)
+        if not ok.all():
+            logger.debug("Skipping %d history rows with missing parameters", int((~ok).sum()))
+        with self._lock:
+            self._points = np.vstack([self._points, to_unit(self.param_ranges, X[ok])])
+            self._refs = np.concatenate([self._refs, refs[ok]])
+            self._buffer_tree = None
+            if len(self._points) - self._n_tree > max(self.min_buffer, self.rebuild_fraction * self._n_tree):
+                self._rebuild()
+        return int(ok.sum())
+
+    def add_scenarios(self, scenarios, ids=None):
+        """Add executed scenarios, e.g. with the ids returned by ``ResultsStore.append``."""
+        if isinstance(scenarios, Mapping):
+            scenarios = [scenarios]
+        return self.add(scenarios_to_matrix(scenarios, self.keys), ids if ids is not None else scenarios)
+
+    def sync(self, chunk_size=10000):
+        """Add the scenarios appended to the store since the last sync."""
+        if self._last_id is None:
+            params = self.store.parameters(self.keys)
+        else:
+            ids = self.store.scenario_ids(after=self._last_id)
+            params = pd.concat([self.store.parameters(self.keys, scenario_ids=ids[i:i + chunk_size])
+                                for i in range(0, len(ids), chunk_size)]) if ids else None
+        if params is None or params.empty:
+            return 0
+        params = params.sort_index()
+        self._last_id = int(params.index.max())
+        return self.add(params.to_numpy(dtype=float), params.index.to_numpy())
+
+    def on_stage(self, job, stage):
+        """``ScenarioScheduler`` callback: finished scenarios join the history at once."""
+        if stage == "finished" and job.ok:
+            self.add_scenarios(job.scenario)
+
+    def _rebuild(self):
+        self._tree = cKDTree(self._points) if len(self._points) else None
+        self._n_tree = len(self._points)
+        self._buffer_tree = None
+
+    def _snapshot(self):
+        """The main tree, its size and the buffer's tree, consistent with each other."""
+        with self._lock:
+            if self._buffer_tree is None and len(self._points) > self._n_tree:
+                self._buffer_tree = cKDTree(self._points[self._n_tree:])
+            return self._tree, self._n_tree, self._buffer_tree
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def nearest(self, X, unit=False):
+        """Distance to, and position of, the nearest history point within ``eps`` (inf / -1 if none)."""
+        Z = np.atleast_2d(X) if unit else to_unit(self.param_ranges, np.atleast_2d(X))
+        tree, n_tree, buffer_tree = self._snapshot()
+        distance = np.full(len(Z), np.inf)
+        position = np.full(len(Z), -1)
+        if tree is not None:
+            distance, position = tree.query(Z, distance_upper_bound=self.eps)
+            position = np.where(np.isfinite(distance), position, -1)
+        if buffer_tree is not None:
+            d, k = buffer_tree.query(Z, distance_upper_bound=self.eps)
+            closer = d < distance
+            distance = np.where(closer, d, distance)
+            position = np.where(closer, n_tree + k, position)
+        return distance, position
+
+    def screen(self, scenarios, drop=True):
+        """
+        Check proposed scenarios against the history and against each other
+        (the first of a group of close proposals is kept). With ``drop=False``
+        every scenario stays in ``run`` and duplicates get a ``Duplicate_of``
+        entry instead. Returns a ScreeningResult.
+        """
+        Z = to_unit(self.param_ranges, scenarios_to_matrix(scenarios, self.keys))
+        comparable = np.isfinite(Z).all(axis=1)
+        rows = []
+
+        # Against the executed history
+        distance = np.full(len(Z), np.inf)
+        position = np.full(len(Z), -1)
+        if comparable.any():
+            distance[comparable], position[comparable] = self.nearest(Z[comparable], unit=True)
+        in_history = position >= 0
+        for i in np.flatnonzero(in_history):
+            rows.append({"proposal": int(i), "source": "history", "match": self._refs[position[i]],
+                         "distance": distance[i]})
+
+        # Within the batch: pairs sorted by the later proposal, so the
+        # earlier one's fate is settled when the later one is checked
+        duplicate = in_history.copy()
+        candidates = np.flatnonzero(comparable & ~in_history)
+        if len(candidates) > 1:
+            pairs = cKDTree(Z[candidates]).query_pairs(self.eps, output_type="ndarray")
+            pairs = candidates[pairs[np.lexsort((pairs[:, 0], pairs[:, 1]))]] if len(pairs) else pairs
+            for i, j in pairs:
+                if not duplicate[i] and not duplicate[j]:
+                    duplicate[j] = True
+                    rows.append({"proposal": int(j), "source": "batch", "match": int(i),
+                                 "distance": float(np.linalg.norm(Z[i] - Z[j]))})
+
+        matches = pd.DataFrame(rows, columns=["proposal", "source", "match", "distance"])
+        matches = matches.sort_values("proposal", ignore_index=True)
+        reused = self._reused(matches)
+
+        if drop:
+            if isinstance(scenarios, ScenarioSet):
+                run = scenarios[~duplicate]
+            else:
+                run = [s for s, dup in zip(scenarios, duplicate) if not dup]
+        else:
+            run = list(scenarios)
+            for row in matches.itertuples(index=False):
+                scenarios[row.proposal]["Duplicate_of"] = {
+                    "source": row.source,
+                    "match": None if isinstance(row.match, Mapping) else row.match,
+                    "distance": float(row.distance),
+                }
+        logger.info("Screened %d scenarios: %d match the history, %d repeat the batch",
+                    len(scenarios), int(in_history.sum()), int(duplicate.sum() - in_history.sum()))
+        return ScreeningResult(run, matches, reused)
+
+    def _reused(self, matches):
+        history = matches[matches["source"] == "history"]
+        reused = {row.proposal: row.match for row in history.itertuples(index=False)
+                  if isinstance(row.match, Mapping)}
+        store_ids = {row.proposal: int(row.match) for row in history.itertuples(index=False)
+                     if isinstance(row.match, (int, np.integer))}
+        if store_ids and self.store is not None:
+            ids = sorted(set(store_ids.values()))
+            stored = dict(zip(ids, self.store.load_scenarios(ids)))
+            reused.update({proposal: stored[i] for proposal, i in store_ids.items()})
+        return reused
@@ -0,0 +1,30 @@
+"""Exceptions and result type shared by the solver backends (run_program, fake_solver)."""
+
+
+class SolverRunError(Exception):
+    """Raised when the solver fails to execute properly."""
+    def __init__(self, file_path: str, message: str):
+        super().__init__(message)
+        self.file_path = file_path
+
+
+class SolverTimeout(SolverRunError):
+    """Raised when a solver run exceeds its timeout; only that run's processes were killed."""
+    def __init__(self, file_path: str, timeout_seconds: float, killed=()):
+        super().__init__(file_path, f"{file_path} exceeded {timeout_seconds} seconds")
+        self.timeout_seconds = timeout_seconds
+        self.killed = list(killed)
+
+
+class SolverResult:
+    """Solver output and the run's resource usage (see resource_monitor.ProcessMonitor)."""
+
+    def __init__(self, stdout="", usage=None):
+        self.stdout = stdout
+        self.usage = usage or {}
+
+    def __str__(self):
+        return self.stdout
+
+    def __repr__(self):
+        return f"SolverResult(usage={self.usage!r})"
@@ -0,0 +1,72 @@
+"""
+Shared fixtures: a synthetic bridge model (``modelxml.synthetic``) and the
+fake solver (``fake_solver``), so pipeline tests run in seconds without
+SolverHistra.exe.
+"""
+import shutil
+import threading
+from pathlib import Path
+
+import pytest
+
+from fake_solver import FakeSolver
+from modelxml.synthetic import write_synthetic_model
+
+
+class RecordingSolver(FakeSolver):
+    """FakeSolver that records its runs and the most runs it had at once."""
+
+    def __init__(self, seconds=0.0, fail=None, **kwargs):
+        super().__init__(seconds=seconds, sigma=0.0, **kwargs)
+        # fail(model_name, call_number) -> True makes that run fail
+        self.fail = fail
+        self.runs = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def run(self, model_path, timeout_seconds):
+        name = Path(model_path).name
+        with self._lock:
+            calls = sum(1 for run in self.runs if run == name)
+            self.runs.append(name)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            if self.fail is not None and self.fail(name, calls):
+                from solver_base import SolverRunError
+                raise SolverRunError(model_path, "Fake solver terminated with error code 1")
+            return super().run(model_path, timeout_seconds)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture(scope="session")
+def tiny_model(tmp_path_factory):
+    return write_synthetic_model(tmp_path_factory.mktemp("models") / "tiny.hrx", "tiny")
+
+
+@pytest.fixture
+def model_path(tmp_path, tiny_model):
+    """A fresh copy of the tiny synthetic model (scenario copies are written next to it)."""
+    path = tmp_path / "bridge.hrx"
+    shutil.copyfile(tiny_model, path)
+    return str(path)
+
+
+@pytest.fixture
+def solver():
+    return RecordingSolver()
+
+
+@pytest.fixture
+def make_scenarios():
+    """``make_scenarios(n)``: scenarios on the synthetic model with distinct Masonry stiffness."""
+    def make(n, analysis="Vert", start=0):
+        return [
+            {"Materials": [{"Name": "Masonry", "Ehor": 1000.0 + 100 * i, "FtmHor": 0.01}],
+             "Analysis": {analysis: {"pier_1": "Damaged"}}}
+            for i in range(start, start + n)
+        ]
+    return make
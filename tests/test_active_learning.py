@@ -0,0 +1,71 @@
+"""
+SequentialDesign proposes new scenarios where the surrogate is least
+certain, and run_active_learning drives batches through the fake solver.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from active_learning import SequentialDesign, run_active_learning
+from build_scenarios import scenarios_to_matrix
+
+# A few points cannot pin down every kernel hyperparameter
+pytestmark = [pytest.mark.filterwarnings("ignore:The optimal value found"),
+              pytest.mark.filterwarnings("ignore:lbfgs failed to converge")]
+
+PARAM_RANGES = {"Masonry_Ehor": (500.0, 3000.0), "Masonry_FtmHor": (0.005, 0.02)}
+
+
+def _finish(scenarios):
+    """Attach an analytic Fmax in place of a solver run."""
+    for scenario in scenarios:
+        ehor, ftm = scenarios_to_matrix([scenario], list(PARAM_RANGES))[0]
+        scenario["Output"] = {"Vert": {"Fmax": ehor / 1000 + 200 * ftm}}
+    return scenarios
+
+
+def test_tell_skips_scenarios_without_a_target():
+    design = SequentialDesign(PARAM_RANGES, "Vert", seed=0)
+    batch = design.initial(6)
+    _finish(batch[:5])
+
+    assert design.tell(batch) == 5
+    assert design.X.shape == (5, 2)
+    assert design.y[0] == batch[0]["Output"]["Vert"]["Fmax"]
+
+
+def test_ask_proposes_distinct_points_away_from_the_data():
+    design = SequentialDesign(PARAM_RANGES, "Vert", batch_size=3, n_candidates=500, seed=0)
+    design.tell(_finish(design.initial(8)))
+
+    batch = design.ask()
+
+    assert len(batch) == 3
+    X = scenarios_to_matrix(batch, design.keys)
+    assert len(np.unique(X, axis=0)) == 3
+    _, std = design.predict(X)
+    _, std_known = design.predict(design.X)
+    assert std.min() > std_known.max()
+    assert design.score() > 0.9
+
+
+def test_run_active_learning_on_the_fake_solver(model_path, solver):
+    def prepare(scenario):
+        scenario["Analysis"] = {"Vert": {"pier_1": "Damaged"}}
+
+    scenarios, design = run_active_learning(model_path, PARAM_RANGES, "Vert", max_workers=2, n_initial=4,
+                                            max_scenarios=6, prepare=prepare, mode=solver, timings=False,
+                                            seed=0)
+
+    assert len(scenarios) == 6
+    assert all(scenario["Output"]["Vert"]["Fmax"] > 0 for scenario in scenarios)
+    assert [entry["n_scenarios"] for entry in design.history] == [4, 6]
+    assert len(design.y) == 6
+
+
+def test_run_active_learning_rejects_unprepared_scenarios(model_path, solver):
+    with pytest.raises(ValueError, match="prepare"):
+        run_active_learning(model_path, PARAM_RANGES, "Vert", max_workers=2, n_initial=4, mode=solver,
+                            timings=False, seed=0)
+    assert solver.runs == []
@@ -0,0 +1,40 @@
+"""
+The lxml and etree backends must write the same model: round-trip a
+synthetic model through both, with and without the pre-processing
+mutations, and compare the canonical .hrx output.
+
+    python -m pytest tests
+"""
+import pytest
+
+from modelxml import mutations
+from modelxml.backend import BACKENDS, check_backend_parity
+from modelxml.synthetic import write_synthetic_model
+
+pytestmark = pytest.mark.skipif("lxml" not in BACKENDS, reason="lxml is not installed")
+
+MUTATORS = {
+    "none": [],
+    "pre_processing": [
+        lambda root: mutations.update_materials(root, [{"Name": "Masonry", "Ehor": 1500.5},
+                                                       {"Name": "Damaged", "FtmHor": 0.001}]),
+        lambda root: mutations.update_foundation_interfaces(root, {"pier_1": "Damaged"}),
+        mutations.set_all_analysis_to_not_run,
+        lambda root: mutations.set_analysis_to_run(root, "Vert"),
+        mutations.set_model_points,
+    ],
+    "start_mesh": [
+        mutations.create_start_mesh_analysis,
+        lambda root: mutations.set_analysis_to_run(root, "StartMesh"),
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    return write_synthetic_model(tmp_path_factory.mktemp("parity") / "tiny.hrx", "tiny")
+
+
+@pytest.mark.parametrize("case", list(MUTATORS))
+def test_backends_write_identical_models(model_path, case):
+    assert check_backend_parity(model_path, MUTATORS[case])
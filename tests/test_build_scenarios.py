@@ -0,0 +1,86 @@
+"""
+Design engines of build_scenarios: stratification, correlations (and their
+repair), log ranges and the Sobol power-of-2 warning.
+"""
+import logging
+
+import numpy as np
+import pytest
+from scipy.stats import spearmanr
+
+from build_scenarios import correlation_matrix, min_distance, sample_parameters, to_unit
+
+PARAM_RANGES = {
+    "Masonry_Ehor": (500.0, 3000.0),
+    "Masonry_FtmHor": (0.005, 0.02),
+    "Damaged_Ehor": (10.0, 1000.0, "log"),
+}
+CORRELATIONS = {("Masonry_Ehor", "Masonry_FtmHor"): 0.7}
+
+
+def _one_point_per_stratum(unit):
+    n = len(unit)
+    strata = np.floor(unit * n).astype(int)
+    return all(sorted(column) == list(range(n)) for column in strata.T)
+
+
+@pytest.mark.parametrize("method", ["lhs", "maximin", "iman-conover"])
+@pytest.mark.parametrize("correlations", [None, CORRELATIONS])
+def test_latin_hypercube_engines_stay_stratified(method, correlations):
+    sample = sample_parameters(PARAM_RANGES, 64, correlations, seed=0, method=method)
+    assert sample.shape == (64, 3)
+    unit = to_unit(PARAM_RANGES, sample)
+    assert ((unit >= 0) & (unit <= 1)).all()
+    if method != "lhs" or correlations is None:  # the copula bends the strata
+        assert _one_point_per_stratum(unit)
+
+
+@pytest.mark.parametrize("method", ["lhs", "sobol", "maximin", "iman-conover"])
+def test_engines_induce_the_rank_correlation(method):
+    sample = sample_parameters(PARAM_RANGES, 256, CORRELATIONS, seed=1, method=method)
+    rho = spearmanr(sample).statistic
+    assert rho[0, 1] == pytest.approx(0.7, abs=0.06)
+    assert abs(rho[0, 2]) < 0.15
+
+
+def test_maximin_keeps_its_spread_with_correlations():
+    maximin = sample_parameters(PARAM_RANGES, 100, CORRELATIONS, seed=2, method="maximin")
+    iman_conover = sample_parameters(PARAM_RANGES, 100, CORRELATIONS, seed=2, method="iman-conover")
+
+    assert min_distance(to_unit(PARAM_RANGES, maximin)) > 1.5 * min_distance(to_unit(PARAM_RANGES, iman_conover))
+    assert not np.allclose(spearmanr(maximin).statistic, spearmanr(iman_conover).statistic)
+
+
+def test_sobol_warns_when_not_a_power_of_two(caplog):
+    with caplog.at_level(logging.WARNING, logger="build_scenarios"):
+        sample_parameters(PARAM_RANGES, 64, seed=0, method="sobol")
+    assert not caplog.records
+    with caplog.at_level(logging.WARNING, logger="build_scenarios"):
+        assert len(sample_parameters(PARAM_RANGES, 50, seed=0, method="sobol")) == 50
+    assert "powers of 2" in caplog.text
+
+
+def test_log_ranges_are_log_uniform():
+    sample = sample_parameters(PARAM_RANGES, 1000, seed=0)
+    damaged = sample[:, 2]
+    assert damaged.min() >= 10.0 and damaged.max() <= 1000.0
+    assert np.median(damaged) == pytest.approx(100.0, rel=0.1)
+
+
+def test_inconsistent_correlations_are_repaired(caplog):
+    keys = ["a_x", "b_x", "c_x"]
+    correlations = {("a_x", "b_x"): 0.9, ("b_x", "c_x"): 0.9, ("a_x", "c_x"): -0.9}
+    with caplog.at_level(logging.WARNING, logger="build_scenarios"):
+        corr = correlation_matrix(keys, correlations)
+    assert "nearest correlation matrix" in caplog.text
+    assert np.allclose(np.diag(corr), 1.0)
+    assert np.linalg.eigvalsh(corr).min() > 0
+
+
+def test_invalid_inputs_are_rejected():
+    with pytest.raises(ValueError):
+        sample_parameters(PARAM_RANGES, 10, method="grid")
+    with pytest.raises(KeyError):
+        correlation_matrix(list(PARAM_RANGES), {("Masonry_Ehor", "Unknown"): 0.5})
+    with pytest.raises(ValueError):
+        correlation_matrix(list(PARAM_RANGES), {("Masonry_Ehor", "Masonry_FtmHor"): 1.5})
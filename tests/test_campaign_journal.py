@@ -0,0 +1,73 @@
+"""
+A campaign restarted with its journal does not solve finished scenarios
+again, and resumes a scenario solved before a crash at post-processing.
+"""
+import pytest
+
+import scheduler
+from campaign_journal import CampaignJournal
+from scheduler import run_campaign
+
+from conftest import RecordingSolver
+
+
+def test_restarted_campaign_skips_finished_scenarios(model_path, tmp_path, solver, make_scenarios):
+    journal_path = tmp_path / "journal.db"
+    first = run_campaign(model_path, make_scenarios(3), max_workers=2, mode=solver, journal=journal_path,
+                         timings=False)
+    assert all(job.ok for job in first)
+    solved = len(solver.runs)
+
+    scenarios = make_scenarios(3)
+    again = run_campaign(model_path, scenarios, max_workers=2, mode=solver, journal=journal_path,
+                         timings=False)
+
+    assert again == []
+    assert len(solver.runs) == solved
+    assert all(scenario["Output"]["Vert"]["Fmax"] > 0 for scenario in scenarios)
+
+
+def test_journal_rejects_a_different_campaign(tmp_path, make_scenarios):
+    journal = CampaignJournal(tmp_path / "journal.db")
+    journal.register(make_scenarios(2))
+    with pytest.raises(ValueError):
+        journal.register(make_scenarios(2, start=5))
+
+
+def test_scenario_solved_before_a_crash_resumes_at_post_processing(model_path, tmp_path, make_scenarios,
+                                                                   monkeypatch):
+    journal_path = tmp_path / "journal.db"
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("kernel died")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(scheduler, "pos_processing", crash)
+        jobs = run_campaign(model_path, make_scenarios(1), mode=RecordingSolver(),
+                            journal=CampaignJournal(journal_path, max_attempts=1, backoff=0),
+                            timings=False)
+    assert not jobs[0].ok
+    assert CampaignJournal(journal_path).entry(0)["stage"] == "solved"
+
+    solver = RecordingSolver()
+    scenarios = None  # the journal's own
+    jobs = run_campaign(model_path, scenarios, mode=solver,
+                        journal=CampaignJournal(journal_path, max_attempts=2), timings=False)
+
+    assert jobs[0].ok
+    assert solver.runs == []
+    scenario = jobs[0].scenario
+    assert scenario["Output"]["Vert"]["Fmax"] > 0
+    # The solver's resource use was journaled with the solved stage
+    assert "Vert" in scenario["Resources"]
+
+
+def test_failed_scenario_is_retried_until_max_attempts(model_path, tmp_path, make_scenarios):
+    solver = RecordingSolver(failure_rate=1.0)
+    journal = CampaignJournal(tmp_path / "journal.db", max_attempts=3, backoff=0.01)
+    jobs = run_campaign(model_path, make_scenarios(1), mode=solver, journal=journal, timings=False)
+
+    assert not jobs[0].ok
+    assert jobs[0].attempts == 3
+    assert journal.summary()["exhausted"] == 1
+    assert journal.todo() == []
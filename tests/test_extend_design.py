@@ -0,0 +1,47 @@
+"""
+Extending an executed design: new points keep away from the executed ones,
+and a maximin extension of a Latin Hypercube stays one.
+"""
+import numpy as np
+import pytest
+
+from build_scenarios import (
+    build_scenarios, extend_design, extend_scenarios, min_distance, sample_parameters,
+    scenarios_to_matrix, to_unit,
+)
+
+PARAM_RANGES = {
+    "Masonry_Ehor": (500.0, 3000.0),
+    "Masonry_FtmHor": (0.005, 0.02),
+    "Damaged_Ehor": (10.0, 1000.0, "log"),
+}
+
+
+def _one_point_per_stratum(unit):
+    n = len(unit)
+    strata = np.floor(unit * n).astype(int)
+    return all(sorted(column) == list(range(n)) for column in strata.T)
+
+
+@pytest.mark.parametrize("method", ["maximin", "sobol", "halton"])
+def test_extension_keeps_away_from_the_executed_points(method):
+    existing = sample_parameters(PARAM_RANGES, 20, seed=0)
+    new = extend_design(PARAM_RANGES, existing, 20, method=method, seed=1)
+    independent = sample_parameters(PARAM_RANGES, 20, seed=1)
+
+    old = to_unit(PARAM_RANGES, existing)
+    assert new.shape == (20, 3)
+    assert min_distance(to_unit(PARAM_RANGES, new), old) > min_distance(to_unit(PARAM_RANGES, independent), old)
+
+
+def test_maximin_extension_completes_the_latin_hypercube():
+    existing = sample_parameters(PARAM_RANGES, 16, seed=0)
+    new = extend_design(PARAM_RANGES, existing, 16, method="maximin", seed=1)
+    assert _one_point_per_stratum(to_unit(PARAM_RANGES, np.vstack([existing, new])))
+
+
+def test_extend_scenarios_reads_executed_scenarios():
+    executed = build_scenarios(PARAM_RANGES, 10, "Vert", seed=0)
+    new = extend_scenarios(PARAM_RANGES, executed, 5, "Vert", seed=1)
+    assert len(new) == 5
+    assert np.isfinite(scenarios_to_matrix(new, list(PARAM_RANGES))).all()
@@ -0,0 +1,83 @@
+"""
+The SQL pushdown in extract_results returns the same records as the
+SELECT * + pandas filtering it replaced, on a .Results database written by
+the fake solver.
+"""
+import pytest
+
+from extract_results import get_dataframe, get_model_points_displacement, get_reactions, open_results
+from fake_solver import FakeSolver
+from modelxml import mutations
+from modelxml.selectors import analysis_key
+from modelxml.session import ModelSession
+
+
+@pytest.fixture(scope="module")
+def results(tmp_path_factory, tiny_model):
+    path = tmp_path_factory.mktemp("extract") / "bridge.hrx"
+    with ModelSession(path, source=tiny_model) as model:
+        model.apply(mutations.set_model_points)
+        model.apply(mutations.set_all_analysis_to_not_run)
+        model.apply(mutations.set_analysis_to_run, "Vert")
+        model.apply(mutations.set_analysis_to_run, "NewAnalysis")
+    FakeSolver(seconds=0, n_steps=7, seed=0).run(path, 60)
+    root = ModelSession(path).root
+    keys = {name: int(analysis_key(root, name)) for name in ("Vert", "NewAnalysis")}
+    return str(path.with_suffix(".Results")), keys
+
+
+# The pandas implementation the SQL queries replaced
+def _pandas_displacements(db_path, key, id_element=None, step=None, all_steps=False):
+    sample = get_dataframe(db_path, "DisplModelPoints")
+    sample = sample[sample["AnalysisKey"] == key]
+    if id_element:
+        sample = sample[sample["IdElement"] == id_element]
+    if all_steps:
+        return sample[["IdElement", "Step", "Ux", "Uy", "Uz"]].sort_values(by="Step", kind="stable").to_dict("records")
+    if step is None:
+        step = sample["Step"].max()
+    sample = sample[sample["Step"] == step]
+    return sample[["IdElement", "ParentKey", "Step", "Ux", "Uy", "Uz"]].to_dict("records")
+
+def _pandas_reactions(db_path, key, step=None, all_steps=False):
+    sample = get_dataframe(db_path, "ReactionSumStates")
+    sample = sample[sample["AnalysisKey"] == key]
+    if sample.empty:
+        return {}
+    if all_steps:
+        return sample[["Step", "R1", "R2", "R3"]].sort_values(by="Step", kind="stable").to_dict("records")
+    if step is None:
+        step = sample["Step"].max()
+    return sample[sample["Step"] == step][["Step", "R1", "R2", "R3"]].to_dict("records")
+
+
+@pytest.mark.parametrize("analysis", ["Vert", "NewAnalysis"])
+@pytest.mark.parametrize("options", [{}, {"step": 3}, {"all_steps": True}])
+def test_displacements_match_pandas(results, analysis, options):
+    db_path, keys = results
+    records = get_model_points_displacement(db_path, keys[analysis], **options)["Displacements"]
+    assert records
+    assert records == _pandas_displacements(db_path, keys[analysis], **options)
+
+
+def test_displacements_of_one_model_point(results):
+    db_path, keys = results
+    id_element = get_model_points_displacement(db_path, keys["Vert"])["Displacements"][0]["IdElement"]
+    records = get_model_points_displacement(db_path, keys["Vert"], id_element=id_element)["Displacements"]
+    assert records == _pandas_displacements(db_path, keys["Vert"], id_element=id_element)
+    assert len(records) == 1
+
+
+@pytest.mark.parametrize("options", [{}, {"step": 2}, {"all_steps": True}])
+def test_reactions_match_pandas(results, options):
+    db_path, keys = results
+    records = get_reactions(db_path, keys["Vert"], **options)["Reactions"]
+    assert records == _pandas_reactions(db_path, keys["Vert"], **options)
+
+
+def test_shared_connection_and_unknown_analysis(results):
+    db_path, keys = results
+    with open_results(db_path) as conn:
+        shared = get_reactions(db_path, keys["Vert"], conn=conn)
+        assert get_reactions(db_path, 9999, conn=conn) == {"Reactions": {}}
+    assert shared == get_reactions(db_path, keys["Vert"])
@@ -0,0 +1,87 @@
+"""
+normalized_distance_filter and normalized_close_pairs give the same
+clusters and pairs as the per-point neighbour lists they replaced, with
+and without scipy.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.spatial import cKDTree
+
+import filter_data
+from filter_data import _normalize_array, normalized_close_pairs, normalized_distance_filter
+
+
+def _reference_filter(df, cols, scale, eps, keep="first", random_state=None):
+    """The query_ball_point + greedy loop implementation."""
+    Z = _normalize_array(df[cols].to_numpy(dtype=float), scale)
+    n = len(Z)
+    order = np.arange(n)
+    if keep == "random":
+        np.random.default_rng(random_state).shuffle(order)
+    neighbors = cKDTree(Z).query_ball_point(Z, r=eps)
+    kept, removed, seen = np.zeros(n, bool), np.zeros(n, bool), np.zeros(n, bool)
+    clusters = []
+    for i in order:
+        if seen[i]:
+            continue
+        cluster = sorted(set(neighbors[i]) | {i})
+        seen[cluster] = True
+        kept[i] = True
+        removed[[j for j in cluster if j != i]] = True
+        clusters.append(cluster)
+    return df.index[kept], df.index[removed], clusters
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    X = rng.random((400, 4))
+    # Near-duplicates and chains of close points
+    X[200:260] = X[:60] + rng.normal(0, 0.002, (60, 4))
+    X[260:280] = X[:20] + 0.015
+    frame = pd.DataFrame(X, columns=["Masonry_Ehor", "Masonry_w", "Damaged_Ehor", "Fmax"])
+    frame.index = frame.index * 10 + 7  # labels differ from positions
+    return frame
+
+
+@pytest.fixture(params=["scipy", "brute force"])
+def backend(request, monkeypatch):
+    if request.param == "brute force":
+        monkeypatch.setattr(filter_data, "cKDTree", None)
+    return request.param
+
+
+@pytest.mark.parametrize("scale", ["zscore", "minmax"])
+@pytest.mark.parametrize("keep", ["first", "random"])
+def test_filter_matches_the_reference(df, backend, scale, keep):
+    cols = list(df.columns[:3])
+    eps = 0.05 if scale == "zscore" else 0.02
+    filtered, kept, removed, clusters = normalized_distance_filter(
+        df, cols=cols, scale=scale, eps=eps, keep=keep, random_state=3)
+
+    ref_kept, ref_removed, ref_clusters = _reference_filter(df, cols, scale, eps, keep, 3)
+    assert kept.tolist() == ref_kept.tolist()
+    assert removed.tolist() == ref_removed.tolist()
+    assert [list(c) for c in clusters] == ref_clusters
+    assert len(removed) > 0
+    assert filtered.index.tolist() == kept.tolist()
+
+
+def test_close_pairs_match_brute_force(df, backend):
+    cols = list(df.columns[:3])
+    Z = _normalize_array(df[cols].to_numpy(float), "minmax")
+    d = np.sqrt(((Z[:, None] - Z[None]) ** 2).sum(axis=2))
+    i, j = np.nonzero(np.triu(d <= 0.02, k=1))
+    expected = sorted(zip(df.index[i].tolist(), df.index[j].tolist()))
+
+    assert normalized_close_pairs(df, cols, scale="minmax", eps=0.02) == expected
+
+
+def test_rows_with_missing_values_have_no_neighbours(df, backend):
+    df = df.copy()
+    df.iloc[200, 0] = np.nan  # a near-duplicate of row 0
+    _, kept, removed, _ = normalized_distance_filter(df, cols=list(df.columns[:3]), eps=0.05)
+
+    assert df.index[200] in kept
+    assert df.index[200] not in removed
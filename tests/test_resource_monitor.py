@@ -0,0 +1,33 @@
+"""
+ProcessMonitor measures the solver process, also when it is started on
+behalf of a launcher (PsExec) rather than as its child.
+"""
+import sys
+import subprocess
+
+import pytest
+
+pytest.importorskip("psutil")
+
+from resource_monitor import ProcessMonitor
+
+BUSY = "import sys, time\nend = time.time() + 1.5\nwhile time.time() < end: pass"
+IDLE = "import time; time.sleep(1.5)"
+
+
+def test_monitor_follows_the_process_matching_the_command_line(tmp_path):
+    marker = str(tmp_path / "bridge_copy_1.hrx")
+    launcher = subprocess.Popen([sys.executable, "-c", IDLE, marker])
+    solver = subprocess.Popen([sys.executable, "-c", BUSY, marker])
+    try:
+        with ProcessMonitor(launcher.pid, interval=0.1, cmdline=marker) as monitor:
+            solver.wait()
+        with ProcessMonitor(launcher.pid, interval=0.1) as idle:
+            launcher.wait()
+    finally:
+        launcher.kill()
+        solver.kill()
+
+    assert monitor.usage["cpu_time"] > 0.5
+    assert monitor.usage["mean_cpu_percent"] > 30
+    assert idle.usage["cpu_time"] < 0.5
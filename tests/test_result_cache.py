@@ -0,0 +1,110 @@
+"""
+ResultCache: identical solver inputs are solved once, and the least
+recently used entries are evicted first.
+"""
+import itertools
+
+import pytest
+
+import result_cache
+import scheduler
+from campaign_journal import CampaignJournal
+from result_cache import ResultCache, scenario_input_key
+from scheduler import run_campaign
+
+from conftest import RecordingSolver
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time.time() for the cache, so LRU order is deterministic."""
+    ticks = itertools.count(1000.0)
+    monkeypatch.setattr(result_cache.time, "time", lambda: next(ticks))
+
+
+def _finished(i):
+    return {"Materials": [{"Name": "Masonry", "Ehor": float(i)}], "Analysis": {"Vert": {}},
+            "Output": {"Vert": {"Fmax": float(i)}}}
+
+
+def test_identical_inputs_are_solved_once(model_path, tmp_path, solver, make_scenarios):
+    cache = ResultCache(tmp_path / "cache.db")
+    first = make_scenarios(2)
+    run_campaign(model_path, first, mode=solver, cache=cache, timings=False)
+    solved = len(solver.runs)
+
+    again = make_scenarios(3)
+    jobs = run_campaign(model_path, again, mode=solver, cache=cache, timings=False)
+
+    assert all(job.ok for job in jobs)
+    # Only the new third scenario reached the solver (StartMesh and Vert)
+    assert len(solver.runs) == solved + 2
+    assert [s["Output"] for s in again[:2]] == [s["Output"] for s in first]
+    assert cache.stats()["hits"] == 2
+
+
+def test_retried_and_resumed_scenarios_are_cached_under_their_inputs(model_path, tmp_path, make_scenarios,
+                                                                    monkeypatch):
+    cache = ResultCache(tmp_path / "cache.db")
+    # The first Vert run fails after pre-processing has rewritten Materials
+    flaky = RecordingSolver(fail=lambda name, calls: name == "bridge_copy_1.hrx" and calls == 1)
+    jobs = run_campaign(model_path, make_scenarios(1), mode=flaky, cache=cache, timings=False,
+                        journal=CampaignJournal(tmp_path / "retry.db", backoff=0))
+    assert jobs[0].ok and jobs[0].attempts == 2
+
+    # A scenario solved before a crash is cached when it is resumed
+    journal_path = tmp_path / "resume.db"
+    with monkeypatch.context() as patch:
+        patch.setattr(scheduler, "pos_processing", lambda *args, **kwargs: 1 / 0)
+        run_campaign(model_path, make_scenarios(1, start=1), mode=RecordingSolver(), timings=False,
+                     journal=CampaignJournal(journal_path, max_attempts=1, backoff=0))
+    run_campaign(model_path, None, mode=RecordingSolver(), cache=cache, timings=False,
+                 journal=CampaignJournal(journal_path, max_attempts=2))
+
+    solver = RecordingSolver()
+    jobs = run_campaign(model_path, make_scenarios(2), mode=solver, cache=cache, timings=False)
+
+    assert all(job.ok for job in jobs)
+    assert solver.runs == []
+    assert cache.stats()["hits"] == 2
+
+
+def test_key_follows_the_solver_inputs():
+    scenario = _finished(1)
+    key = scenario_input_key("model", scenario)
+    assert key == scenario_input_key("model", dict(scenario, Output={}))
+    assert key != scenario_input_key("other model", scenario)
+    assert key != scenario_input_key("model", _finished(2))
+    assert key != scenario_input_key("model", scenario, solver="fake")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = ResultCache(tmp_path / "cache.db", max_entries=2)
+    cache.put("a", _finished(1))
+    cache.put("b", _finished(2))
+    assert cache.get("a")["Output"]["Vert"]["Fmax"] == 1.0  # "a" is now more recent than "b"
+
+    cache.put("c", _finished(3))
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_size_budget_evicts_until_it_fits(tmp_path, clock):
+    cache = ResultCache(tmp_path / "cache.db")
+    for key in "abc":
+        cache.put(key, _finished(ord(key)))
+    cache.max_bytes = cache.stats()["bytes"] * 2 // 3
+
+    cache.put("d", _finished(4))
+
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("d") is not None
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_unfinished_scenarios_are_not_cached(tmp_path):
+    cache = ResultCache(tmp_path / "cache.db")
+    assert not cache.put("a", {"Materials": [], "Analysis": {"Vert": {}}})
+    assert len(cache) == 0
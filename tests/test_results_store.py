@@ -0,0 +1,92 @@
+"""
+ResultsStore round trip: scenarios finished on the fake solver come back
+from the store as they went in (numbers as floats), and the columnar reads
+agree with them.
+"""
+import json
+import sqlite3
+
+import pytest
+
+from results_store import ResultsStore, OUTPUT_NUMERIC_FIELDS
+from scheduler import run_campaign
+
+
+@pytest.fixture
+def finished(model_path, solver, make_scenarios):
+    scenarios = make_scenarios(3)
+    jobs = run_campaign(model_path, scenarios, mode=solver, timings=False)
+    assert all(job.ok for job in jobs)
+    return json.loads(json.dumps(scenarios))
+
+
+def _numeric(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def test_scenarios_round_trip(tmp_path, finished):
+    store = ResultsStore(tmp_path / "results.db")
+    ids = store.append(finished, campaign="test")
+    loaded = store.load_scenarios()
+
+    assert len(store) == 3 and store.scenario_ids(campaign="test") == ids
+    for original, back in zip(finished, loaded):
+        for key in ("Analysis", "Geometry", "Model_Points", "Resources"):
+            assert back[key] == original[key]
+
+        materials = {m["Name"]: {k: _numeric(v) for k, v in m.items()} for m in original["Materials"]}
+        assert {m["Name"]: m for m in back["Materials"]} == materials
+
+        output, stored = original["Output"]["Vert"], back["Output"]["Vert"]
+        assert stored["Displacements"] == output["Displacements"]
+        assert stored["Reactions"] == output["Reactions"]
+        for field in ("State", "Exit", "ExitDescription"):
+            assert stored[field] == output[field]
+        for field in OUTPUT_NUMERIC_FIELDS:
+            assert stored[field] == pytest.approx(_numeric(output[field]))
+
+
+def test_columnar_reads_match_the_scenarios(tmp_path, finished):
+    store = ResultsStore(tmp_path / "results.db")
+    ids = store.append(finished)
+
+    params = store.parameters(["Masonry_Ehor", "Damaged_Ehor"])
+    assert params.index.tolist() == ids
+    assert params["Masonry_Ehor"].tolist() == [1000.0, 1100.0, 1200.0]
+
+    outputs = store.outputs(["Fmax"], analysis="Vert")
+    assert outputs["Fmax"].tolist() == pytest.approx([s["Output"]["Vert"]["Fmax"] for s in finished])
+
+    displ = store.displacements(analysis="Vert", scenario_ids=ids[1])
+    assert len(displ) == len(finished[1]["Output"]["Vert"]["Displacements"])
+
+
+def test_append_only_history(tmp_path, finished):
+    store = ResultsStore(tmp_path / "results.db")
+    first = store.append(finished[:2])
+    second = store.append(finished[2])
+
+    assert store.scenario_ids(after=first[-1]) == second
+    assert len(store.load_scenarios(first)) == 2
+
+
+def test_long_id_lists_do_not_hit_the_parameter_limit(tmp_path, finished, monkeypatch):
+    # The limit of SQLite builds before 3.32 (32766 since, more in some builds)
+    connect = sqlite3.connect
+
+    def limited(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", limited)
+    store = ResultsStore(tmp_path / "results.db")
+    ids = store.append(finished)
+    many = list(range(ids[-1] + 1, ids[-1] + 2000)) + ids
+
+    assert store.parameters(scenario_ids=many).index.tolist() == ids
+    assert len(store.outputs(analysis=["Vert"] * 600, scenario_ids=many)) == 3
+    assert len(store.load_scenarios(many)) == 3
@@ -0,0 +1,32 @@
+"""
+ScenarioSet: the array-backed scenarios read like build_scenarios' dicts,
+share attached outputs between subsets, and work without parameters.
+"""
+import numpy as np
+
+from build_scenarios import ScenarioSet, build_scenario_set, build_scenarios, scenarios_to_matrix
+
+PARAM_RANGES = {
+    "Masonry_Ehor": (500.0, 3000.0),
+    "Masonry_FtmHor": (0.005, 0.02),
+    "Damaged_Ehor": (10.0, 1000.0, "log"),
+}
+
+
+def test_scenario_set_matches_build_scenarios():
+    scenarios = build_scenarios(PARAM_RANGES, 20, "Vert", seed=4)
+    scenario_set = build_scenario_set(PARAM_RANGES, 20, "Vert", seed=4)
+
+    assert scenario_set.to_list() == scenarios
+    subset = scenario_set[5:10]
+    subset[0]["Output"] = {"Vert": {"Fmax": 1.0}}
+    assert scenario_set[5]["Output"] == {"Vert": {"Fmax": 1.0}}
+    assert np.array_equal(subset.matrix(), scenarios_to_matrix(scenarios[5:10], list(PARAM_RANGES)))
+
+
+def test_scenario_set_without_parameters():
+    scenario_set = build_scenario_set({}, 3, "Vert")
+    assert len(scenario_set) == 3
+    assert scenario_set.matrix().shape == (3, 0)
+    assert [s["Analysis"] for s in scenario_set] == [["Vert"]] * 3
+    assert len(ScenarioSet.from_scenarios(build_scenarios({}, 2, "Vert"), [])) == 2
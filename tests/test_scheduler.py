@@ -0,0 +1,116 @@
+"""
+ScenarioScheduler behaviour on the fake solver: outputs, the bound on
+concurrent solver runs, pre-processing overlapping solver runs,
+cancellation and retries.
+"""
+import time
+import threading
+
+from campaign_journal import CampaignJournal
+from mesh_cache import MeshCache
+from processing_steps import prepare_model
+from scheduler import ScenarioScheduler
+
+from conftest import RecordingSolver
+
+
+def _stage_times(times, lock):
+    def on_stage(job, stage):
+        with lock:
+            times[job.index, stage] = time.monotonic()
+    return on_stage
+
+
+def test_scenarios_finish_with_outputs(model_path, solver, make_scenarios):
+    prepare_model(model_path)  # adds the monitoring points
+    scenarios = make_scenarios(3)
+    with ScenarioScheduler(model_path, max_solvers=2, mode=solver) as scheduler:
+        jobs = scheduler.map(scenarios)
+
+    assert all(job.ok for job in jobs)
+    for scenario in scenarios:
+        output = scenario["Output"]["Vert"]
+        assert output["State"] == "ExecutedSuccessfully"
+        assert output["Fmax"] > 0
+        assert output["Displacements"] and output["Reactions"]
+        assert "Vert" in scenario["Resources"]
+
+
+def test_solver_runs_never_exceed_the_solver_slots(model_path, make_scenarios):
+    solver = RecordingSolver(seconds=0.05)
+    with ScenarioScheduler(model_path, max_solvers=2, prefetch=3, mode=solver) as scheduler:
+        jobs = scheduler.map(make_scenarios(6))
+
+    assert all(job.ok for job in jobs)
+    # A StartMesh and a Vert run per scenario, both counted against the slots
+    assert len(solver.runs) == 12
+    assert solver.peak == 2
+
+
+def test_pre_processing_overlaps_the_solver_run(model_path, tmp_path, make_scenarios):
+    times, lock = {}, threading.Lock()
+    solver = RecordingSolver(seconds=0.3)
+    with ScenarioScheduler(model_path, max_solvers=1, prefetch=1, mode=solver,
+                           mesh_cache=MeshCache(tmp_path / "mesh"),
+                           on_stage=_stage_times(times, lock)) as scheduler:
+        jobs = scheduler.map(make_scenarios(2))
+
+    assert all(job.ok for job in jobs)
+    assert solver.peak == 1
+    # Scenario 2 was prepared while scenario 1 held the only solver slot
+    assert times[1, "prepared"] < times[0, "solved"]
+
+
+def test_cancel_stops_scenarios_that_have_not_started(model_path, make_scenarios):
+    solver = RecordingSolver(seconds=0.2)
+    scheduler = ScenarioScheduler(model_path, max_solvers=1, prefetch=0, mode=solver)
+    jobs = [scheduler.submit(scenario) for scenario in make_scenarios(4)]
+    assert jobs[0].wait("prepared", timeout=30)
+    scheduler.shutdown(cancel=True)
+
+    assert all(job.events["finished"].is_set() for job in jobs)
+    assert not any(job.ok for job in jobs[1:])
+    assert all(job.cancelled for job in jobs)
+    # Scenarios 2-4 never reached the solver
+    assert all(run == "bridge_copy_1.hrx" for run in solver.runs)
+
+
+def test_failed_attempt_waits_for_its_retry_without_holding_a_worker(model_path, tmp_path, make_scenarios):
+    times, lock = {}, threading.Lock()
+    # The first run of scenario 1 (its StartMesh) fails
+    solver = RecordingSolver(fail=lambda name, calls: name == "bridge_copy_1.hrx" and calls == 0)
+    journal = CampaignJournal(tmp_path / "journal.db", max_attempts=2, backoff=0.5)
+    scenarios = make_scenarios(2)
+    journal.register(scenarios)
+
+    # A single worker: a blocking backoff would delay scenario 2 behind the retry
+    with ScenarioScheduler(model_path, max_solvers=1, prefetch=0, mode=solver, journal=journal,
+                           on_stage=_stage_times(times, lock)) as scheduler:
+        jobs = scheduler.map(scenarios)
+
+    assert all(job.ok for job in jobs)
+    assert [job.attempts for job in jobs] == [2, 1]
+    assert times[1, "finished"] < times[0, "finished"]
+    assert journal.summary()["done"] == 2
+
+
+def test_cancel_ends_a_scenario_waiting_for_its_retry(model_path, tmp_path, make_scenarios):
+    solver = RecordingSolver(failure_rate=1.0)
+    journal = CampaignJournal(tmp_path / "journal.db", max_attempts=3, backoff=60)
+    scenarios = make_scenarios(1)
+    journal.register(scenarios)
+
+    scheduler = ScenarioScheduler(model_path, max_solvers=1, mode=solver, journal=journal)
+    job = scheduler.submit(scenarios[0], 0)
+    deadline = time.monotonic() + 30
+    while not scheduler._retries and time.monotonic() < deadline:
+        time.sleep(0.01)
+    start = time.monotonic()
+    job.cancel()
+
+    assert job.wait(timeout=5)
+    assert time.monotonic() - start < 5
+    assert job.cancelled and not job.ok
+    scheduler.shutdown()
+    # The attempt that failed still counts; the scenario stays retryable
+    assert journal.todo() == [0]
@@ -0,0 +1,115 @@
+"""
+ScenarioScreen: near-duplicates of the executed history or of the same
+batch are not solved, and scenarios finished by a campaign join the
+history as they arrive.
+"""
+import numpy as np
+import pytest
+
+from build_scenarios import ScenarioSet, build_scenarios
+from results_store import ResultsStore
+from scheduler import run_campaign
+from screening import ScenarioScreen
+
+from conftest import RecordingSolver
+
+PARAM_RANGES = {"Masonry_Ehor": (500.0, 3000.0), "Masonry_FtmHor": (0.005, 0.02)}
+
+
+def _scenario(ehor, ftm=0.01):
+    return {"Materials": [{"Name": "Masonry", "Ehor": ehor, "FtmHor": ftm}], "Analysis": {"Vert": {}}}
+
+
+def test_screen_drops_history_and_batch_duplicates():
+    screen = ScenarioScreen(PARAM_RANGES, eps=0.01)
+    screen.add_scenarios([_scenario(1000.0)])
+    proposals = [_scenario(1001.0), _scenario(2000.0), _scenario(2001.0), _scenario(2500.0)]
+
+    result = screen.screen(proposals)
+
+    assert result.run == [proposals[1], proposals[3]]
+    assert result.matches[["proposal", "source"]].values.tolist() == [[0, "history"], [2, "batch"]]
+    assert result.matches["match"].iloc[1] == 1
+    # A history match of an in-memory scenario hands back that scenario
+    assert result.reused[0]["Materials"][0]["Ehor"] == 1000.0
+
+
+def test_screen_flags_instead_of_dropping():
+    screen = ScenarioScreen(PARAM_RANGES, eps=0.01)
+    proposals = [_scenario(2000.0), _scenario(2001.0)]
+    result = screen.screen(proposals, drop=False)
+
+    assert len(result.run) == 2
+    assert proposals[1]["Duplicate_of"]["source"] == "batch"
+
+
+def test_screen_accepts_scenario_sets():
+    candidates = ScenarioSet.from_scenarios(build_scenarios(PARAM_RANGES, 50, "Vert", seed=0), list(PARAM_RANGES))
+    screen = ScenarioScreen(PARAM_RANGES, eps=0.01)
+    screen.add(candidates.matrix()[:10])
+
+    result = screen.screen(candidates)
+
+    assert isinstance(result.run, ScenarioSet)
+    assert len(result.run) == 40
+
+
+def test_history_rebuilds_keep_every_point():
+    screen = ScenarioScreen(PARAM_RANGES, eps=1e-6, min_buffer=4)
+    X = build_scenarios(PARAM_RANGES, 30, "Vert", seed=1)
+    for scenario in X:
+        screen.add_scenarios(scenario)
+
+    assert len(screen) == 30
+    assert screen._n_tree > 0
+    assert len(screen.screen(X).run) == 0
+
+
+def test_nearest_searches_the_tree_and_the_buffer():
+    rng = np.random.default_rng(0)
+    screen = ScenarioScreen(PARAM_RANGES, eps=0.05, min_buffer=200)
+    lower, upper = np.array([[500.0, 0.005]]), np.array([[3000.0, 0.02]])
+    history = lower + rng.random((300, 2)) * (upper - lower)
+    screen.add(history[:250])  # rebuilds the tree
+    screen.add(history[250:])  # stays in the buffer
+    assert screen._n_tree == 250
+
+    Z = rng.random((500, 2))
+    distance, position = screen.nearest(Z, unit=True)
+
+    d = np.sqrt(((Z[:, None] - screen._points[None]) ** 2).sum(axis=2))
+    close = d.min(axis=1) <= 0.05
+    assert close.any() and (position[close] >= 250).any()
+    assert (position[close] == d[close].argmin(axis=1)).all()
+    assert np.allclose(distance[close], d[close].min(axis=1))
+    assert (position[~close] == -1).all() and np.isinf(distance[~close]).all()
+
+
+def test_campaign_skips_stored_duplicates_and_grows_the_history(model_path, tmp_path, solver):
+    store = ResultsStore(tmp_path / "results.db")
+    executed = [_scenario(1000.0)]
+    run_campaign(model_path, executed, mode=solver, timings=False)
+    store.append(executed)
+    screen = ScenarioScreen.from_store(store, PARAM_RANGES, eps=0.01)
+    runs = len(solver.runs)
+
+    scenarios = [_scenario(1000.5), _scenario(2000.0), _scenario(2000.5), _scenario(2800.0)]
+    jobs = run_campaign(model_path, scenarios, mode=solver, screen=screen, timings=False)
+
+    # Only scenarios 2 and 4 were solved: 1 repeats the store, 3 repeats 2
+    assert sorted(job.index for job in jobs) == [1, 3]
+    assert len(solver.runs) == runs + 4
+    assert scenarios[0]["Output"]["Vert"]["Fmax"] == pytest.approx(executed[0]["Output"]["Vert"]["Fmax"])
+    assert scenarios[2]["Output"] == scenarios[1]["Output"]
+    # Both finished scenarios joined the history as they arrived
+    assert len(screen) == 3
+    assert len(screen.screen([_scenario(2800.5)]).run) == 0
+
+
+def test_failed_scenarios_do_not_join_the_history(model_path):
+    screen = ScenarioScreen(PARAM_RANGES, eps=0.01)
+    jobs = run_campaign(model_path, [_scenario(1000.0)], mode=RecordingSolver(failure_rate=1.0),
+                        screen=screen, timings=False)
+
+    assert not jobs[0].ok
+    assert len(screen) == 0
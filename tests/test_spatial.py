@@ -0,0 +1,32 @@
+"""
+NodeLocator picks the same node as the linear scan it replaced, including
+between equidistant nodes of a regular mesh (first in document order).
+"""
+import numpy as np
+
+from modelxml.spatial import NodeLocator
+
+
+def _linear_scan(coords, point):
+    best, best_distance = None, float("inf")
+    for i, node in enumerate(coords):
+        distance = np.sqrt(((node - point) ** 2).sum())
+        if distance < best_distance:
+            best, best_distance = i, distance
+    return best
+
+
+def test_ties_go_to_the_first_node_in_document_order():
+    # Large enough for equidistant nodes to fall in different tree leaves
+    grid = np.array([(x, 0.0, z) for x in range(20) for z in range(20)], dtype=float)
+    coords = grid[np.random.default_rng(0).permutation(len(grid))]
+    locator = NodeLocator(np.arange(len(coords)), coords)
+    # Cell centres (4-way ties), edge midpoints (2-way ties) and nodes
+    queries = np.array([(x + 0.5, 0, z + 0.5) for x in range(19) for z in range(19)]
+                       + [(x, 0, z + 0.5) for x in range(20) for z in range(19)]
+                       + [(x, 0, x) for x in range(20)])
+
+    keys, _, distances = locator.nearest(queries)
+
+    assert keys.tolist() == [_linear_scan(coords, q) for q in queries]
+    assert np.allclose(distances, np.r_[np.full(361, np.sqrt(0.5)), np.full(380, 0.5), np.zeros(20)])
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from modelxml.timing import load_spans
+
+PERCENTILES = (50, 90, 99)
+
+
+def load_timings(path):
+    """Spans recorded by ``modelxml.timing`` as a DataFrame."""
+    df = pd.DataFrame(load_spans(path))
+    for column in ("scenario", "attempt", "analysis"):
+        if column not in df:
+            df[column] = np.nan
+    return df
+
+def _percentiles(durations):
+    values = np.percentile(durations, PERCENTILES) if len(durations) else [np.nan] * len(PERCENTILES)
+    return dict(zip((f"p{p}" for p in PERCENTILES), values))
+
+def stage_summary(df):
+    """Count, total and duration percentiles per stage [s], largest total first."""
+    rows = []
+    for stage, group in df.groupby("stage"):
+        durations = group["duration"].to_numpy()
+        rows.append({
+            "stage": stage,
+            "count": len(durations),
+            "total": durations.sum(),
+            "mean": durations.mean(),
+            **_percentiles(durations),
+            "max": durations.max(),
+            "failed": int((group["status"] != "ok").sum()),
+        })
+    return pd.DataFrame(rows).set_index("stage").sort_values("total", ascending=False)
+
+def _max_concurrency(starts, ends):
+    events = np.concatenate([np.stack([starts, np.ones_like(starts)], 1),
+                             np.stack([ends, -np.ones_like(ends)], 1)])
+    # Ends before starts at the same instant
+    events = events[np.lexsort((events[:, 1], events[:, 0]))]
+    return int(np.cumsum(events[:, 1]).max()) if len(events) else 0
+
+def solver_utilization(df, n_solvers=None):
+    """
+    How busy the solver slots were. Scenario runs (inside ``processing``)
+    and StartMesh runs both occupy slots; mesh runs are also reported
+    separately. ``n_solvers`` defaults to the highest concurrency observed.
+    """
+    wall = df["end"].max() - df["start"].min() if len(df) else 0.0
+    solver = df[df["stage"] == "solver"]
+    slotted = solver[solver["parent"] == "processing"]
+    busy = solver["duration"].sum()
+    max_concurrency = _max_concurrency(solver["start"].to_numpy(), solver["end"].to_numpy())
+    slots = n_solvers or max_concurrency or 1
+    wait = df.loc[df["stage"] == "solver_slot_wait", "duration"]
+    return {
+        "wall": wall,
+        "solver_busy": busy,
+        "solver_runs": len(slotted),
+        "mesh_solver_busy": solver.loc[solver["parent"] != "processing", "duration"].sum(),
+        "slots": slots,
+        "max_concurrency": max_concurrency,
+        "mean_concurrency": busy / wall if wall else np.nan,
+        "utilization": busy / (wall * slots) if wall else np.nan,
+        "slot_wait_total": wait.sum(),
+        "slot_wait_p90": np.percentile(wait, 90) if len(wait) else np.nan,
+    }
+
+def stage_gaps(df):
+    """
+    Idle time between consecutive top-level stages of each scenario (time in
+    no recorded stage: scheduling, journal writes, retry backoff).
+    """
+    top = df[(df["depth"] == 0) & df["scenario"].notna()].sort_values("start")
+    rows = []
+    for scenario, group in top.groupby("scenario"):
+        stages, starts, ends = group["stage"].tolist(), group["start"].to_numpy(), group["end"].to_numpy()
+        for k in range(1, len(stages)):
+            rows.append({
+                "scenario": scenario,
+                "transition": f"{stages[k - 1]} -> {stages[k]}",
+                "gap": max(starts[k] - ends[k - 1], 0.0),
+            })
+    return pd.DataFrame(rows, columns=["scenario", "transition", "gap"])
+
+def gap_summary(gaps):
+    rows = []
+    for transition, group in gaps.groupby("transition"):
+        values = group["gap"].to_numpy()
+        rows.append({"transition": transition, "count": len(values), "total": values.sum(), **_percentiles(values)})
+    return pd.DataFrame(rows).set_index("transition") if rows else pd.DataFrame()
+
+
+def timing_report(path, n_solvers=None):
+    """Stage percentiles, solver utilization and inter-stage idle time of a campaign recording."""
+    df = load_timings(path)
+    gaps = stage_gaps(df)
+    return {
+        "stages": stage_summary(df),
+        "solver": solver_utilization(df, n_solvers),
+        "gaps": gap_summary(gaps),
+        "spans": df,
+    }
+
+def print_timing_report(path, n_solvers=None):
+    report = timing_report(path, n_solvers)
+    solver = report["solver"]
+    with pd.option_context("display.float_format", "{:.3f}".format, "display.width", 160,
+                           "display.max_columns", None):
+        print("=== Stages [s] ===")
+        print(report["stages"])
+        print("\n=== Solver ===")
+        print(f"wall {solver['wall']:.1f} s, {solver['solver_runs']} runs, "
+              f"busy {solver['solver_busy']:.1f} s on {solver['slots']} slots "
+              f"-> utilization {solver['utilization']:.1%} (mean concurrency {solver['mean_concurrency']:.2f}, "
+              f"max {solver['max_concurrency']})")
+        print(f"mesh runs {solver['mesh_solver_busy']:.1f} s; waiting for a slot {solver['slot_wait_total']:.1f} s "
+              f"(p90 {solver['slot_wait_p90']:.2f} s)")
+        if not report["gaps"].empty:
+            print("\n=== Idle between stages [s] ===")
+            print(report["gaps"])
+    return report